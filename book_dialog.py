@@ -4,6 +4,8 @@ import re
 from PyQt5 import QtWidgets, QtGui, QtCore
 
 from item_manager import ItemSelectionDialog  # Importujeme ItemSelectionDialog
+from image_store import ImageNameResolver
+from reference_data import ReferenceData
 import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -129,6 +131,9 @@ class BookDialog(QtWidgets.QDialog):
         try:
             cursor.execute(insert_query, params)
             self.connection.commit()
+            # Nový item musí hned najít ItemManager i výběr položek, obrázek se dohledá znovu
+            ImageNameResolver.instance().invalidate(new_item_name)
+            ReferenceData.instance().refresh_items(self.connection, [new_item_name])
             self.item_code = new_item_name
             self.item_edit.setText(self.item_code)
             QtWidgets.QMessageBox.information(self, "Úspěch", f"Nový item '{new_item_name}' byl vytvořen.")
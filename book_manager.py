@@ -7,7 +7,9 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from book_dialog import BookDialog
 from item_manager import ItemDialog
-from image_utils import get_item_image_label
+from image_utils import get_item_image_label, prefetch_item_images
+from image_store import DEFAULT_CACHE_DIR
+from table_delegates import ActionButtonsDelegate, action_item, EDIT_COLOR, COPY_COLOR, DELETE_COLOR
 
 class BookManager(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -16,7 +18,7 @@ class BookManager(QtWidgets.QDialog):
         self.setWindowTitle("Správa Knih")
         self.setGeometry(100, 100, 1000, 600)
         self.load_stylesheet(os.path.join(BASE_DIR, "stylesheet.qss"))
-        self.cache_dir = 'cache'  # Adresář pro cache obrázků
+        self.cache_dir = DEFAULT_CACHE_DIR  # Adresář pro cache obrázků
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.init_ui()
@@ -62,6 +64,14 @@ class BookManager(QtWidgets.QDialog):
         self.table.setHorizontalHeaderLabels(['Obrázek', 'ID', 'Item', 'Název', 'Autor', 'PDF URL', 'Akce'])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
         self.table.setSortingEnabled(True)
+        # Tlačítka akcí kreslí delegát; buňka nese (id, item, pdf_url) knihy
+        self.action_delegate = ActionButtonsDelegate([
+            ("Otevřít PDF", "#f0ad4e", lambda book: self.open_pdf(book[2])),
+            ("Upravit", EDIT_COLOR, lambda book: self.edit_book_by_id(book[0])),
+            ("Upravit Item", COPY_COLOR, lambda book: self.edit_item_by_name(book[1])),
+            ("Smazat", DELETE_COLOR, lambda book: self.delete_book_by_id(book[0])),
+        ], self.table)
+        self.table.setItemDelegateForColumn(6, self.action_delegate)
         layout.addWidget(self.table)
 
         # Tlačítka
@@ -105,6 +115,8 @@ class BookManager(QtWidgets.QDialog):
         """
         cursor.execute(query, params)
         books = cursor.fetchall()
+        # Názvy obrázků pro všechny řádky dohledáme jedním dotazem
+        prefetch_item_images([b['item'] for b in books], self.connection)
         self.table.setRowCount(0)
         for row_number, book in enumerate(books):
             self.table.insertRow(row_number)
@@ -140,8 +152,7 @@ class BookManager(QtWidgets.QDialog):
             self.table.setItem(row_number, 5, pdf_url_item)
 
             # Akce
-            action_widget = self.create_action_buttons(book['id'], book['item'], book['pdf_url'])
-            self.table.setCellWidget(row_number, 6, action_widget)
+            self.table.setItem(row_number, 6, action_item((book['id'], book['item'], book['pdf_url'])))
 
             # Nastavíme výšku řádku
             self.table.setRowHeight(row_number, 64)
@@ -150,38 +161,6 @@ class BookManager(QtWidgets.QDialog):
         self.table.setColumnWidth(5, 200)
         self.table.setColumnWidth(6, 200)
 
-    def create_action_buttons(self, book_id, item_name, pdf_url):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Otevřít PDF
-        open_pdf_button = QtWidgets.QPushButton("Otevřít PDF")
-        open_pdf_button.setStyleSheet("background-color: #f0ad4e; color: white;")
-        open_pdf_button.clicked.connect(lambda _, url=pdf_url: self.open_pdf(url))
-        h_layout.addWidget(open_pdf_button)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, bid=book_id: self.edit_book_by_id(bid))
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Upravit Item
-        edit_item_button = QtWidgets.QPushButton("Upravit Item")
-        edit_item_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        edit_item_button.clicked.connect(lambda _, name=item_name: self.edit_item_by_name(name))
-        h_layout.addWidget(edit_item_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, bid=book_id: self.delete_book_by_id(bid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def open_pdf(self, pdf_url):
         if pdf_url:
             webbrowser.open(pdf_url)
@@ -211,10 +190,14 @@ class BookManager(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat tuto knihu?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM books WHERE id = %s", (book_id,))
-            self.connection.commit()
-            self.load_books()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM books WHERE id = %s", (book_id,))
+                self.connection.commit()
+                self.load_books()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 1)  # Sloupec 1 je ID
@@ -0,0 +1,146 @@
+# cache_warmer.py
+# Hromadné předstažení obrázků všech itemů do cache (z příkazové řádky i z editoru).
+#
+# Použití:  python cache_warmer.py [--workers 8] [--cache-dir cache]
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import mysql.connector
+from PyQt5 import QtCore
+
+from downloader import HttpDownloader, DownloadError
+from image_store import ImageNameResolver, DiskImageCache, DEFAULT_CACHE_DIR
+from image_utils import THUMBNAIL_SIZES, make_thumbnails, thumbnail_path
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(BASE_DIR, 'config.json')
+DEFAULT_WORKERS = 8
+
+
+def load_all_item_images(connection):
+    """Jedním dotazem načte item -> název obrázku pro všechny itemy s obrázkem."""
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("SELECT item, image FROM items WHERE image IS NOT NULL AND image != ''")
+    item_images = {row['item']: row['image'] for row in cursor.fetchall()}
+    # Rovnou tím naplníme i resolver, ať ho tabulky v editoru nemusí dotazovat
+    ImageNameResolver.instance().remember(item_images)
+    return item_images
+
+
+def warm_image(disk_cache, downloader, image_file, item_name):
+    """Zajistí obrázek a jeho náhledy v cache. Vrací 'cached', 'downloaded' nebo 'failed'."""
+    was_cached = disk_cache.path_for_image(image_file) is not None
+    try:
+        path = disk_cache.fetch(image_file, downloader, item_name, revalidate=False)
+        if not all(os.path.exists(thumbnail_path(path, size)) for size in THUMBNAIL_SIZES):
+            make_thumbnails(path)
+    except DownloadError as e:
+        print(f"Error downloading {image_file}: {e}")
+        return 'failed'
+    except Exception as e:
+        # Např. plný disk nebo chybějící práva; jeden obrázek nesmí ukončit celý běh
+        print(f"Error caching {image_file}: {e}")
+        return 'failed'
+    return 'cached' if was_cached else 'downloaded'
+
+
+def warm_image_cache(item_images, cache_dir=DEFAULT_CACHE_DIR, workers=DEFAULT_WORKERS,
+                     progress=None, is_cancelled=None):
+    """Paralelně stáhne chybějící obrázky a vytvoří náhledy.
+
+    `progress(done, total)` se volá po každém obrázku (z worker threadů),
+    `is_cancelled()` umožní běh přerušit. Vrací slovník se statistikou.
+    """
+    disk_cache = DiskImageCache.instance(cache_dir)
+    downloader = HttpDownloader(max_connections=workers)
+    # Více itemů může sdílet jeden obrázek, stahujeme každý soubor jen jednou
+    images = {}
+    for item_name, image_file in item_images.items():
+        images.setdefault(image_file, item_name)
+
+    counts = {'cached': 0, 'downloaded': 0, 'failed': 0}
+    total = len(images)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(warm_image, disk_cache, downloader, image_file, item_name)
+                   for image_file, item_name in images.items()]
+        for done, future in enumerate(as_completed(futures), start=1):
+            counts[future.result()] += 1
+            if progress:
+                progress(done, total)
+            if is_cancelled and is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+                break
+    disk_cache.save()
+    downloader.close()
+
+    stats = dict(counts)
+    stats['total'] = total
+    stats['seconds'] = time.monotonic() - started
+    stats['download'] = downloader.stats()
+    stats['report'] = (f"Obrázků: {total}, staženo: {counts['downloaded']}, "
+                       f"už v cache: {counts['cached']}, chyby: {counts['failed']}, "
+                       f"celkem {stats['seconds']:.1f} s. {downloader.report()}")
+    return stats
+
+
+class CacheWarmThread(QtCore.QThread):
+    """Spustí warm_image_cache mimo GUI thread a hlásí průběh signálem."""
+    progress = QtCore.pyqtSignal(int, int)
+    finished_with_stats = QtCore.pyqtSignal(dict)
+
+    def __init__(self, item_images, cache_dir=DEFAULT_CACHE_DIR, workers=DEFAULT_WORKERS, parent=None):
+        super().__init__(parent)
+        self.item_images = item_images
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        stats = warm_image_cache(self.item_images, self.cache_dir, self.workers,
+                                 progress=self.progress.emit, is_cancelled=lambda: self.cancelled)
+        self.finished_with_stats.emit(stats)
+
+
+def make_progress_printer(every=50):
+    started = time.monotonic()
+
+    def print_progress(done, total):
+        if done == total or done % every == 0:
+            elapsed = time.monotonic() - started
+            print(f"[{done}/{total}] {done / elapsed if elapsed else 0.0:.1f} obrázků/s")
+    return print_progress
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Předstáhne obrázky všech itemů do cache.")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="počet paralelních stahování")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="adresář cache (stejný jako v editoru)")
+    args = parser.parse_args()
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    print("Connecting to database...")
+    try:
+        connection = mysql.connector.connect(
+            host=config['mysql']['host'],
+            user=config['mysql']['user'],
+            password=config['mysql']['password'],
+            database=config['mysql']['database']
+        )
+    except mysql.connector.Error as err:
+        print(f"Error connecting to database: {err}")
+        sys.exit(1)
+
+    item_images = load_all_item_images(connection)
+    print(f"Nalezeno {len(item_images)} itemů s obrázkem.")
+    stats = warm_image_cache(item_images, args.cache_dir, args.workers, progress=make_progress_printer())
+    print(stats['report'])
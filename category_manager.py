@@ -1,6 +1,8 @@
 
 from PyQt5 import QtWidgets, QtGui, QtCore
+import mysql.connector
 import os
+from reference_data import ReferenceData
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 class CategoryManagerDialog(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -50,15 +52,13 @@ class CategoryManagerDialog(QtWidgets.QDialog):
         self.setLayout(layout)
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT ID, name FROM recipes_category ORDER BY name")
-        categories = cursor.fetchall()
+        categories = ReferenceData.instance().rows(self.connection, 'recipe_categories')
         self.table.setRowCount(0)
-        for row_number, category in enumerate(categories):
+        for row_number, (category_id, category_name) in enumerate(categories):
             self.table.insertRow(row_number)
-            id_item = QtWidgets.QTableWidgetItem(str(category['ID']))
+            id_item = QtWidgets.QTableWidgetItem(str(category_id))
             id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            name_item = QtWidgets.QTableWidgetItem(category['name'])
+            name_item = QtWidgets.QTableWidgetItem(category_name)
             name_item.setFlags(name_item.flags() & ~QtCore.Qt.ItemIsEditable)
             self.table.setItem(row_number, 0, id_item)
             self.table.setItem(row_number, 1, name_item)
@@ -67,10 +67,15 @@ class CategoryManagerDialog(QtWidgets.QDialog):
     def add_category(self):
         text, ok = QtWidgets.QInputDialog.getText(self, "Přidat Kategorii", "Název Kategorie:")
         if ok and text:
-            cursor = self.connection.cursor()
-            cursor.execute("INSERT INTO recipes_category (name) VALUES (%s)", (text,))
-            self.connection.commit()
-            self.load_categories()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("INSERT INTO recipes_category (name) VALUES (%s)", (text,))
+                self.connection.commit()
+                ReferenceData.instance().invalidate('recipe_categories')
+                self.load_categories()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání záznamu: {err}")
 
     def edit_category(self):
         selected_items = self.table.selectedItems()
@@ -80,10 +85,15 @@ class CategoryManagerDialog(QtWidgets.QDialog):
             current_name = self.table.item(row, 1).text()
             text, ok = QtWidgets.QInputDialog.getText(self, "Upravit Kategorii", "Název Kategorie:", text=current_name)
             if ok and text:
-                cursor = self.connection.cursor()
-                cursor.execute("UPDATE recipes_category SET name = %s WHERE ID = %s", (text, category_id))
-                self.connection.commit()
-                self.load_categories()
+                try:
+                    cursor = self.connection.cursor()
+                    cursor.execute("UPDATE recipes_category SET name = %s WHERE ID = %s", (text, category_id))
+                    self.connection.commit()
+                    ReferenceData.instance().invalidate('recipe_categories')
+                    self.load_categories()
+                except mysql.connector.Error as err:
+                    self.connection.rollback()
+                    QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání záznamu: {err}")
         else:
             QtWidgets.QMessageBox.warning(self, "Upozornění", "Vyberte kategorii k úpravě.")
 
@@ -96,15 +106,20 @@ class CategoryManagerDialog(QtWidgets.QDialog):
                                                      "Opravdu chcete smazat tuto kategorii?",
                                                      QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
             if confirm == QtWidgets.QMessageBox.Yes:
-                cursor = self.connection.cursor()
-                # Zkontrolujeme, zda jsou kategorie přiřazeny nějaké recepty
-                cursor.execute("SELECT COUNT(*) AS count FROM recipes WHERE category_id = %s", (category_id,))
-                result = cursor.fetchone()
-                if result['count'] > 0:
-                    QtWidgets.QMessageBox.warning(self, "Upozornění", "Nelze smazat kategorii, která je přiřazena receptům.")
-                else:
-                    cursor.execute("DELETE FROM recipes_category WHERE ID = %s", (category_id,))
-                    self.connection.commit()
-                    self.load_categories()
+                try:
+                    cursor = self.connection.cursor()
+                    # Zkontrolujeme, zda jsou kategorie přiřazeny nějaké recepty
+                    cursor.execute("SELECT COUNT(*) AS count FROM recipes WHERE category_id = %s", (category_id,))
+                    result = cursor.fetchone()
+                    if result['count'] > 0:
+                        QtWidgets.QMessageBox.warning(self, "Upozornění", "Nelze smazat kategorii, která je přiřazena receptům.")
+                    else:
+                        cursor.execute("DELETE FROM recipes_category WHERE ID = %s", (category_id,))
+                        self.connection.commit()
+                        ReferenceData.instance().invalidate('recipe_categories')
+                        self.load_categories()
+                except mysql.connector.Error as err:
+                    self.connection.rollback()
+                    QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
         else:
             QtWidgets.QMessageBox.warning(self, "Upozornění", "Vyberte kategorii ke smazání.")
\ No newline at end of file
@@ -5,6 +5,7 @@ from mysql.connector import Error
 from PyQt5 import QtWidgets, QtCore
 
 from character_dialog import CharacterDialog
+from db import Database
 
 
 class CharacterEditorDialog(QtWidgets.QWidget):
@@ -37,12 +38,7 @@ class CharacterEditorDialog(QtWidgets.QWidget):
     def create_db_connection(self):
         print("Connecting to database...")
         try:
-            connection = mysql.connector.connect(
-                host=self.config['mysql']['host'],
-                user=self.config['mysql']['user'],
-                password=self.config['mysql']['password'],
-                database=self.config['mysql']['database']
-            )
+            connection = Database.instance().configure(self.config['mysql'])
             if connection.is_connected():
                 print("Spojeno s DB.")
             return connection
@@ -7,6 +7,8 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from item_manager import ItemSelectionDialog, ItemDialog  # Importujeme ItemDialog
+from image_store import ImageNameResolver
+from reference_data import ReferenceData
 
 
 class ConsumableDialog(QtWidgets.QDialog):
@@ -297,6 +299,9 @@ class ConsumableDialog(QtWidgets.QDialog):
         try:
             cursor.execute(insert_query, params)
             self.connection.commit()
+            # Nový item musí hned najít ItemManager i výběr položek, obrázek se dohledá znovu
+            ImageNameResolver.instance().invalidate(item_name)
+            ReferenceData.instance().refresh_items(self.connection, [item_name])
             QtWidgets.QMessageBox.information(
                 self, "Úspěch", f"Item '{item_name}' byl vytvořen.")
         except mysql.connector.Error as err:
@@ -1,5 +1,7 @@
 from PyQt5 import QtWidgets, QtGui, QtCore
+import mysql.connector
 from consumable_dialog import ConsumableDialog
+from table_delegates import ActionButtonsDelegate, action_item
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -46,6 +48,12 @@ class ConsumableManagerDialog(QtWidgets.QDialog):
             ['ID', 'Item', 'Typ', 'Prop', 'Popis', 'Akce', ''])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
         self.table.setSortingEnabled(True)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate([
+            ("Upravit", "#28a745", self.edit_consumable_by_id),
+            ("Smazat", "#dc3545", self.delete_consumable_by_id),
+        ], self.table)
+        self.table.setItemDelegateForColumn(5, self.action_delegate)
         layout.addWidget(self.table)
 
         # Tlačítka
@@ -106,36 +114,11 @@ class ConsumableManagerDialog(QtWidgets.QDialog):
             dsc_item.setFlags(dsc_item.flags() & ~QtCore.Qt.ItemIsEditable)
             self.table.setItem(row_number, 4, dsc_item)
 
-            # Vytvoříme tlačítka pro akce
-            action_widget = self.create_action_buttons(consumable['id'])
-            self.table.setCellWidget(row_number, 5, action_widget)
+            # Buňka pro tlačítka akcí
+            self.table.setItem(row_number, 5, action_item(consumable['id']))
 
         self.table.resizeColumnsToContents()
 
-    def create_action_buttons(self, consumable_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet(
-            "background-color: #28a745; color: white; border-radius: 5px;")
-        edit_button.clicked.connect(
-            lambda _, cid=consumable_id: self.edit_consumable_by_id(cid))
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet(
-            "background-color: #dc3545; color: white; border-radius: 5px;")
-        delete_button.clicked.connect(
-            lambda _, cid=consumable_id: self.delete_consumable_by_id(cid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 0)  # Sloupec 0 je ID
         if id_item:
@@ -167,8 +150,12 @@ class ConsumableManagerDialog(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat tuto konzumovatelnou položku?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "DELETE FROM aprts_consumable WHERE id = %s", (consumable_id,))
-            self.connection.commit()
-            self.load_consumables()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(
+                    "DELETE FROM aprts_consumable WHERE id = %s", (consumable_id,))
+                self.connection.commit()
+                self.load_consumables()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
@@ -0,0 +1,278 @@
+# db.py
+# Sdílený přístup k databázi: pool spojení, vlastní spojení pro každé vlákno,
+# obnovení spojení po výpadku serveru a kurzory, které se vždy zavřou (bez závislosti na Qt).
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import errorcode, pooling
+
+from query_stats import QueryStats
+from snapshot import open_snapshot
+
+DEFAULT_POOL_SIZE = 5
+POOL_WAIT_TIMEOUT = 10.0  # s, jak dlouho čekat na volné spojení, když jsou všechna půjčená
+RECONNECT_ATTEMPTS = 3
+RECONNECT_DELAY = 1  # s mezi pokusy o obnovení spojení
+# "MySQL server has gone away" a spol.: spojení obnovíme a dotaz zkusíme znovu
+RECONNECT_ERRORS = frozenset((
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+))
+READ_STATEMENTS = ('SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN')
+
+
+class Database:
+    """Pool spojení k MySQL sdílený celým editorem.
+
+    Každé vlákno si z poolu půjčí vlastní spojení (mysql.connector spojení
+    nesmí sdílet více vláken) a drží ho, dokud ho release() nevrátí.
+    Manažery a dialogy dostávají místo spojení ThreadConnection, která
+    všechna volání posílá na spojení aktuálního vlákna.
+
+    V offline režimu (configure_snapshot) si vlákna místo spojení z poolu
+    otevírají lokální snapshot v SQLite, jen pro čtení.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.pool = None
+        self.snapshot_path = None
+        self.local = threading.local()
+
+    def configure(self, mysql_config, pool_size=DEFAULT_POOL_SIZE):
+        """Vytvoří pool podle sekce `mysql` z config.json a vrátí ThreadConnection."""
+        self.pool = pooling.MySQLConnectionPool(
+            pool_name="editor",
+            pool_size=pool_size,
+            host=mysql_config['host'],
+            user=mysql_config['user'],
+            password=mysql_config['password'],
+            database=mysql_config['database']
+        )
+        return self.connection()
+
+    def configure_snapshot(self, path):
+        """Offline režim nad snapshotem z snapshot.py; vrací ThreadConnection jako configure()."""
+        open_snapshot(path).close()  # Chybějící soubor se ohlásí hned, ne až v prvním dialogu
+        self.pool = None
+        self.snapshot_path = path
+        return self.connection()
+
+    def is_offline(self):
+        return self.snapshot_path is not None
+
+    def connection(self):
+        return ThreadConnection(self)
+
+    def checkout(self):
+        """Spojení aktuálního vlákna; při prvním použití ho vlákno dostane z poolu."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None and self.snapshot_path is not None:
+            connection = self.local.connection = open_snapshot(self.snapshot_path)
+            self.local.dirty = False
+        elif connection is None:
+            connection = self.get_from_pool()
+            # Každé čtení vidí aktuální data, i když spojení drží otevřenou transakci
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cursor.close()
+            self.local.connection = connection
+            self.local.dirty = False
+        return connection
+
+    def get_from_pool(self):
+        if self.pool is None:
+            raise RuntimeError("Database.configure() nebylo zavoláno")
+        deadline = time.monotonic() + POOL_WAIT_TIMEOUT
+        while True:
+            try:
+                return self.pool.get_connection()
+            except pooling.PoolError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def release(self):
+        """Vrátí spojení aktuálního vlákna do poolu (např. na konci QThread.run)."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            return
+        self.local.connection = None
+        try:
+            connection.close()
+        except mysql.connector.Error as err:
+            print(f"Chyba při vracení spojení do poolu: {err}")
+
+    def is_connection_lost(self, err):
+        """True pro chyby, po kterých má smysl spojení obnovit a dotaz zopakovat."""
+        if err.errno in RECONNECT_ERRORS:
+            return True
+        # Spojení zavřené serverem (wait_timeout) hlásí mysql.connector už v cursor()
+        # jen obecnou OperationalError bez kódu ("MySQL Connection not available")
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            return False
+        try:
+            return not connection.is_connected()
+        except mysql.connector.Error:
+            return True
+
+    def reconnect(self):
+        connection = self.checkout()
+        connection.reconnect(attempts=RECONNECT_ATTEMPTS, delay=RECONNECT_DELAY)
+        cursor = connection.cursor()
+        cursor.execute("SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED")
+        cursor.close()
+        self.local.dirty = False
+
+    def mark_dirty(self, dirty=True):
+        self.local.dirty = dirty
+
+    def is_dirty(self):
+        """True, pokud vlákno od posledního commitu/rollbacku něco zapsalo."""
+        return getattr(self.local, 'dirty', False)
+
+    @contextmanager
+    def cursor(self, *args, **kwargs):
+        """`with Database.instance().cursor(dictionary=True) as cursor:` - kurzor se vždy zavře."""
+        cursor = ReconnectingCursor(self, args, kwargs)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def transaction(self):
+        """Zápisy v bloku se na konci potvrdí, při výjimce vrátí."""
+        connection = self.connection()
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+
+class ThreadConnection:
+    """Náhrada spojení pro manažery a dialogy; každé volání jde na spojení aktuálního vlákna."""
+
+    def __init__(self, database):
+        self.database = database
+
+    def cursor(self, *args, **kwargs):
+        return ReconnectingCursor(self.database, args, kwargs)
+
+    def commit(self):
+        self.database.checkout().commit()
+        self.database.mark_dirty(False)
+
+    def rollback(self):
+        self.database.checkout().rollback()
+        self.database.mark_dirty(False)
+
+    def close(self):
+        self.database.release()
+
+    def __getattr__(self, name):
+        return getattr(self.database.checkout(), name)
+
+
+class ReconnectingCursor:
+    """Kurzor, který po ztrátě spojení se serverem spojení obnoví a dotaz zopakuje.
+
+    Opakuje jen tehdy, když vlákno nemá nepotvrzené zápisy; ty by s původním
+    spojením zanikly, takže chyba se v tom případě předá dál.
+    """
+
+    def __init__(self, database, args, kwargs):
+        self.database = database
+        self.args = args
+        self.kwargs = kwargs
+        # Kurzor vzniká až v run(): na spojení, které server mezitím zavřel, selže už
+        # cursor() a obnova spojení musí zachytit i tuto chybu
+        self.cursor = None
+        self.record = None  # měření posledního dotazu, řádky z fetch* se přičtou k němu
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self.run('execute', operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self.run('executemany', operation, seq_params, *args, **kwargs)
+
+    def run(self, method, operation, *args, **kwargs):
+        is_write = not operation.lstrip().upper().startswith(READ_STATEMENTS)
+        started = time.perf_counter()
+        try:
+            result = self.call(method, operation, *args, **kwargs)
+        except mysql.connector.Error as err:
+            if not self.database.is_connection_lost(err):
+                raise
+            dirty = self.database.is_dirty()
+            print(f"Spojení s databází ztraceno ({err}), připojuji znovu...")
+            self.close()
+            self.cursor = None
+            self.database.reconnect()
+            if dirty:
+                raise
+            result = self.call(method, operation, *args, **kwargs)
+        if is_write:
+            self.database.mark_dirty()
+        self.record = QueryStats.instance().record(
+            operation, time.perf_counter() - started, self.cursor.rowcount if is_write else 0)
+        return result
+
+    def call(self, method, operation, *args, **kwargs):
+        if self.cursor is None:
+            self.cursor = self.database.checkout().cursor(*self.args, **self.kwargs)
+        return getattr(self.cursor, method)(operation, *args, **kwargs)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self.cursor.fetchone()
+        self.add_fetch(started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = self.cursor.fetchmany(*args, **kwargs)
+        self.add_fetch(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self.cursor.fetchall()
+        self.add_fetch(started, len(rows))
+        return rows
+
+    def add_fetch(self, started, rows):
+        if self.record is not None:
+            QueryStats.instance().add_fetch(self.record, time.perf_counter() - started, rows)
+
+    def close(self):
+        if self.cursor is None:
+            return
+        try:
+            self.cursor.close()
+        except mysql.connector.Error:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
@@ -0,0 +1,159 @@
+# downloader.py
+# Sdílené stahování obrázků položek přes znovupoužívaná HTTP spojení (editor i exporter).
+import http.client
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit, quote
+
+IMAGE_BASE_URL = "https://api.westhavenrp.cz/storage/items/"
+USER_AGENT = 'Mozilla/5.0'
+
+Response = namedtuple('Response', ['status', 'data', 'etag', 'last_modified'])
+
+
+class DownloadError(Exception):
+    """Stažení se nepodařilo ani po opakování. `status` je HTTP kód, nebo None při chybě spojení."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class HttpDownloader:
+    """Stahuje soubory z jednoho serveru přes pool keep-alive spojení.
+
+    Počet souběžných požadavků je omezen počtem spojení, chyby spojení
+    a odpovědi 5xx se opakují s exponenciálně rostoucí pauzou.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, base_url=IMAGE_BASE_URL, max_connections=4, timeout=15, retries=3, backoff=0.5):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path if parts.path.endswith('/') else parts.path + '/'
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+        self.idle = []  # volná spojení připravená k dalšímu použití
+
+        # Statistiky
+        self.requests = 0
+        self.failures = 0
+        self.retried = 0
+        self.connections_opened = 0
+        self.bytes_downloaded = 0
+        self.download_time = 0.0
+
+    def new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        with self.lock:
+            self.connections_opened += 1
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def acquire_connection(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return self.new_connection()
+
+    def release_connection(self, connection):
+        with self.lock:
+            self.idle.append(connection)
+
+    def fetch(self, file_name):
+        """Stáhne soubor relativně k base_url a vrátí jeho obsah."""
+        return self.request(file_name).data
+
+    def fetch_if_modified(self, file_name, etag=None, last_modified=None):
+        """Podmíněný GET; při nezměněném souboru vrátí odpověď se statusem 304 a prázdnými daty."""
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return self.request(file_name, headers)
+
+    def request(self, file_name, extra_headers=None):
+        path = self.base_path + quote(file_name)
+        headers = {'User-Agent': USER_AGENT}
+        headers.update(extra_headers or {})
+        attempt = 0
+        with self.slots:
+            while True:
+                connection = self.acquire_connection()
+                started = time.monotonic()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    data = response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException) as e:
+                    # Spojení je v neznámém stavu, zahodíme ho
+                    connection.close()
+                    error = DownloadError(f"{file_name}: {e}")
+                else:
+                    if response.will_close:
+                        connection.close()
+                    else:
+                        self.release_connection(connection)
+                    if status in (200, 304):
+                        with self.lock:
+                            self.requests += 1
+                            self.bytes_downloaded += len(data)
+                            self.download_time += time.monotonic() - started
+                        return Response(status, data, response.getheader('ETag'),
+                                        response.getheader('Last-Modified'))
+                    error = DownloadError(f"{file_name}: HTTP {status}", status)
+                    if status < 500:
+                        # Chyby klienta (např. 404) opakovat nemá smysl
+                        break
+
+                if attempt >= self.retries:
+                    break
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+                with self.lock:
+                    self.retried += 1
+
+        with self.lock:
+            self.requests += 1
+            self.failures += 1
+        raise error
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+    def stats(self):
+        with self.lock:
+            elapsed = self.download_time
+            return {
+                'requests': self.requests,
+                'failures': self.failures,
+                'retries': self.retried,
+                'connections_opened': self.connections_opened,
+                'bytes': self.bytes_downloaded,
+                'seconds': elapsed,
+                'bytes_per_second': self.bytes_downloaded / elapsed if elapsed else 0.0,
+            }
+
+    def report(self):
+        s = self.stats()
+        return (f"Staženo {s['requests'] - s['failures']}/{s['requests']} souborů, "
+                f"{s['bytes'] / 1024:.1f} KiB za {s['seconds']:.2f} s "
+                f"({s['bytes_per_second'] / 1024:.1f} KiB/s), "
+                f"opakování: {s['retries']}, otevřená spojení: {s['connections_opened']}")
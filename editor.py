@@ -17,7 +17,19 @@ from housing_props_manager import HousingPropsManager, HousingPropDialog
 from category_manager import CategoryManagerDialog
 from freeplace_manager import FreeplaceManager
 from book_manager import BookManager
-from image_utils import get_item_image_label
+from image_utils import retry_broken_images, ImageService, PixmapCache
+from image_store import DiskImageCache, NegativeImageCache, DEFAULT_CACHE_DIR
+from cache_warmer import CacheWarmThread, load_all_item_images
+from recipe_model import RecipeTableModel, RecipeFilterProxyModel, ACTIONS_COLUMN
+from table_delegates import ActionButtonsDelegate, standard_action_buttons
+from recipe_index import RecipeSearchIndex, RecipeFacets
+from json_cache import parse_json
+from db import Database, DEFAULT_POOL_SIZE
+from reference_data import ReferenceData
+from query_stats_dialog import QueryStatsDialog
+from snapshot import snapshot_info
+from snapshot_thread import SnapshotRefreshThread
+from recipe_loader import RecipeLoadThread, load_recipes_by_id, fetch_recipes_checksum
 from hunting_animal_manager import HuntingAnimalManager
 from herbs_manager import HerbsManagerDialog
 from plants_manager import PlantTypesManagerDialog
@@ -36,20 +48,33 @@ SOUNDS = [
     os.path.join(ASSET_PATH, "click6.mp3"),
     # Přidej další zvuky podle potřeby
 ]
+SEARCH_DEBOUNCE_MS = 150  # Filtrování při psaní se spustí až po krátké pauze
+CATEGORY_NAME_ROLE = QtCore.Qt.UserRole + 1  # Název kategorie bez počtu receptů
+RECIPES_POLL_SECONDS = 30  # Jak často se kontroluje, jestli recepty nezměnil někdo jiný
+SNAPSHOT_FILE = 'snapshot.sqlite'  # Offline snapshot databáze (viz snapshot.py), cestu lze změnit v config.json
 
 class RecipeManager(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
         self.load_config()
-        self.setWindowTitle(f"Správa Receptů - {self.config['version']}")
         self.setGeometry(100, 100, 1800, 700)
         self.load_stylesheet(os.path.join(BASE_DIR, "stylesheet.qss"))
 
+        # Offline režim: "offline": true v config.json nebo `python editor.py --offline`
+        self.snapshot_path = os.path.join(BASE_DIR, self.config.get('snapshot_path', SNAPSHOT_FILE))
+        self.snapshot_thread = None
         self.connection = self.create_db_connection()
-        self.image_cache = {}
-        self.cache_dir = 'cache'
+        self.update_window_title()
+        # Paměťový limit sdílené cache obrázků (v MB) lze nastavit v config.json
+        PixmapCache.instance().set_budget(self.config.get('pixmap_cache_mb', 64) * 1024 * 1024)
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        # Cache obrázků na disku: limit velikosti (MB) a stáří (dny) lze nastavit v config.json
+        disk_cache = DiskImageCache.instance(self.cache_dir)
+        disk_cache.max_bytes = self.config.get('disk_cache_mb', 512) * 1024 * 1024
+        disk_cache.max_age = self.config.get('disk_cache_max_age_days', 90) * 24 * 3600
+        disk_cache.evict()
 
         self.selected_category_id = None
         self.click_sound = QMediaPlayer()
@@ -60,6 +85,13 @@ class RecipeManager(QtWidgets.QMainWindow):
         self.item_label_cache = {}
 
         self.all_recipes = []  # seznam všech receptů z DB
+        self.recipe_rows = {}  # ID receptu -> řádek v all_recipes (a v modelu)
+        self.search_index = RecipeSearchIndex()
+        self.facets = RecipeFacets()
+        self.recipe_load_thread = None
+        self.cache_warm_thread = None
+        self.recipes_checksum = None  # otisk tabulky receptů z posledního načtení
+        self.query_stats_dialog = None
 
         self.init_ui()
 
@@ -75,21 +107,44 @@ class RecipeManager(QtWidgets.QMainWindow):
             self.config = json.load(f)
 
     def create_db_connection(self):
+        if self.config.get('offline', False) or '--offline' in sys.argv:
+            return self.open_snapshot()
         print("Connecting to database...")
         try:
-            connection = mysql.connector.connect(
-                host=self.config['mysql']['host'],
-                user=self.config['mysql']['user'],
-                password=self.config['mysql']['password'],
-                database=self.config['mysql']['database']
-            )
-            return connection
+            # Manažery dostanou spojení z poolu; každé vlákno používá vlastní
+            return Database.instance().configure(
+                self.config['mysql'], self.config.get('db_pool_size', DEFAULT_POOL_SIZE))
         except mysql.connector.Error as err:
             print(f"Error connecting to database: {err}")
-            QtWidgets.QMessageBox.critical(
-                self, "Chyba", f"Nelze se připojit k databázi: {err}")
+            info = snapshot_info(self.snapshot_path)
+            if info:
+                answer = QtWidgets.QMessageBox.question(
+                    self, "Chyba",
+                    f"Nelze se připojit k databázi: {err}\n\n"
+                    f"Spustit editor offline nad snapshotem z {info.get('refreshed_at', '?')} (jen pro čtení)?")
+                if answer == QtWidgets.QMessageBox.Yes:
+                    return self.open_snapshot()
+            else:
+                QtWidgets.QMessageBox.critical(
+                    self, "Chyba", f"Nelze se připojit k databázi: {err}")
+            sys.exit(1)
+
+    def open_snapshot(self):
+        print(f"Opening offline snapshot {self.snapshot_path}...")
+        try:
+            return Database.instance().configure_snapshot(self.snapshot_path)
+        except (OSError, mysql.connector.Error) as err:
+            print(f"Error opening snapshot: {err}")
+            QtWidgets.QMessageBox.critical(self, "Chyba", f"Nelze otevřít offline snapshot: {err}")
             sys.exit(1)
 
+    def update_window_title(self):
+        title = f"Správa Receptů - {self.config['version']}"
+        if Database.instance().is_offline():
+            refreshed_at = snapshot_info(self.snapshot_path).get('refreshed_at', '?')
+            title += f" - OFFLINE (snapshot z {refreshed_at}, jen pro čtení)"
+        self.setWindowTitle(title)
+
     def play_click_sound(self):
         if not self.sound_checkbox.isChecked():
             return
@@ -134,6 +189,12 @@ class RecipeManager(QtWidgets.QMainWindow):
         self.search_edit = QtWidgets.QLineEdit()
         self.search_edit.setPlaceholderText("Zadejte hledaný text...")
         self.search_edit.returnPressed.connect(self.apply_filters)
+        # Hledá se už při psaní, s krátkou prodlevou po posledním stisku
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_filters)
+        self.search_edit.textChanged.connect(self.search_timer.start)
         search_button = QtWidgets.QPushButton("Vyhledat")
         search_button.clicked.connect(self.apply_filters)
         search_button.clicked.connect(self.play_click_sound)
@@ -142,18 +203,38 @@ class RecipeManager(QtWidgets.QMainWindow):
         search_layout.addWidget(search_button)
         left_layout.addLayout(search_layout)
 
-        # Tabulka receptů
-        # Zvedáme počet sloupců na 13, přidáváme sloupec "Materiály"
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(13)
-        self.table.setHorizontalHeaderLabels([
-            'Obrázek', 'ID', 'Item (Label)', 'Food', 'Housing',
-            'Skill', 'XP', 'Název', 'Typ', 'Kategorie',
-            'Prop', 'Materiály', 'Akce'
-        ])
-        self.table.cellDoubleClicked.connect(self.play_click_sound)
-        self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tabulka receptů (model/view, vykreslují se jen viditelné řádky)
+        self.recipe_model = RecipeTableModel(self.cache_dir, self.connection, self)
+        self.recipe_proxy = RecipeFilterProxyModel(self)
+        self.recipe_proxy.setSourceModel(self.recipe_model)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.recipe_proxy)
+        self.table.setIconSize(QtCore.QSize(64, 64))
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(98)
+        self.table.doubleClicked.connect(self.play_click_sound)
+        self.table.doubleClicked.connect(self.on_table_double_clicked)
         self.table.setSortingEnabled(False)
+
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_recipe_by_id, copy=self.copy_recipe_by_id, delete=self.delete_recipe_by_id), self.table)
+        self.action_delegate.clicked.connect(self.play_click_sound)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.action_delegate)
+
+        # Nastavení šířek sloupců
+        self.table.setColumnWidth(0, 70)   # Obrázek
+        self.table.setColumnWidth(1, 30)    # ID
+        self.table.setColumnWidth(2, 150)   # Item (Label)
+        self.table.setColumnWidth(3, 30)    # Food
+        self.table.setColumnWidth(4, 60)    # Housing
+        self.table.setColumnWidth(5, 70)    # Skill
+        self.table.setColumnWidth(6, 30)    # XP
+        self.table.setColumnWidth(7, 150)   # Název
+        self.table.setColumnWidth(8, 100)   # Typ
+        self.table.setColumnWidth(9, 70)   # Kategorie
+        self.table.setColumnWidth(10, 100)  # Prop
+        self.table.setColumnWidth(11, 100)  # Materiály
+        self.table.setColumnWidth(12, 300)  # Akce
         left_layout.addWidget(self.table)
 
         # Kontextové menu
@@ -195,9 +276,37 @@ class RecipeManager(QtWidgets.QMainWindow):
 
         refresh_action = QtWidgets.QAction("Obnovit", self)
         refresh_action.triggered.connect(self.play_click_sound)
-        refresh_action.triggered.connect(self.load_all_recipes)
+        refresh_action.triggered.connect(self.refresh_all)
         toolbar.addAction(refresh_action)
 
+        # Počítadlo obrázků, které se nepodařilo načíst, s možností zkusit je znovu
+        self.retry_images_action = QtWidgets.QAction(self)
+        self.retry_images_action.setToolTip("Zapomene neúspěšné pokusy a načte chybějící obrázky znovu")
+        self.retry_images_action.triggered.connect(self.play_click_sound)
+        self.retry_images_action.triggered.connect(self.retry_broken_images)
+        toolbar.addAction(self.retry_images_action)
+        ImageService.instance().task_finished.connect(self.update_broken_images_counter)
+        self.update_broken_images_counter()
+
+        self.warm_cache_action = QtWidgets.QAction("Předstáhnout obrázky", self)
+        self.warm_cache_action.setToolTip("Stáhne obrázky všech itemů do cache a vytvoří náhledy")
+        self.warm_cache_action.triggered.connect(self.play_click_sound)
+        self.warm_cache_action.triggered.connect(self.warm_image_cache)
+        toolbar.addAction(self.warm_cache_action)
+
+        query_stats_action = QtWidgets.QAction("Statistiky SQL", self)
+        query_stats_action.setToolTip("Nejpomalejší a nejčastější dotazy do databáze a podezřelé N+1 dotazy")
+        query_stats_action.triggered.connect(self.play_click_sound)
+        query_stats_action.triggered.connect(self.show_query_stats)
+        toolbar.addAction(query_stats_action)
+
+        self.refresh_snapshot_action = QtWidgets.QAction("Obnovit snapshot", self)
+        self.refresh_snapshot_action.setToolTip(
+            "Stáhne z MySQL do offline snapshotu jen změněné řádky (první spuštění ho vytvoří celý)")
+        self.refresh_snapshot_action.triggered.connect(self.play_click_sound)
+        self.refresh_snapshot_action.triggered.connect(self.refresh_snapshot)
+        toolbar.addAction(self.refresh_snapshot_action)
+
         manage_categories_action = QtWidgets.QAction("Spravovat Kategorie", self)
         manage_categories_action.triggered.connect(self.play_click_sound)
         manage_categories_action.triggered.connect(self.manage_categories)
@@ -263,130 +372,187 @@ class RecipeManager(QtWidgets.QMainWindow):
         manage_treasures_action.triggered.connect(self.manage_treasures)
         toolbar.addAction(manage_treasures_action)
 
+        # Průběh načítání receptů ve stavovém řádku
+        self.load_progress = QtWidgets.QProgressBar()
+        self.load_progress.setRange(0, 100)
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.hide()
+        self.cancel_load_button = QtWidgets.QPushButton("Zrušit")
+        self.cancel_load_button.clicked.connect(self.cancel_recipes_load)
+        self.cancel_load_button.hide()
+        self.statusBar().addPermanentWidget(self.load_progress)
+        self.statusBar().addPermanentWidget(self.cancel_load_button)
+
+        # Změny receptů mimo editor se odhalí levným dotazem na otisk tabulky
+        self.recipes_poll_timer = QtCore.QTimer(self)
+        self.recipes_poll_timer.setInterval(self.config.get('recipes_poll_seconds', RECIPES_POLL_SECONDS) * 1000)
+        self.recipes_poll_timer.timeout.connect(self.check_outside_changes)
+        self.recipes_poll_timer.start()
+
         self.load_all_recipes()
 
-    def load_all_recipes(self):
-        """Načte všechny recepty, naparsuje materials a vytvoří cache pro skill a item labely."""
-        cursor = self.connection.cursor(dictionary=True)
+    def refresh_all(self):
+        # Ruční obnovení zahodí i sdílené číselníky, mohl je změnit někdo mimo editor
+        ReferenceData.instance().invalidate()
+        self.load_categories()
+        self.load_all_recipes()
 
-        query = """
-            SELECT
-                r.id,
-                r.name,
-                r.type,
-                r.prop,
-                r.materials,
-                rc.name AS category_name,
-                r.result,
-                r.skill,
-                r.XP,
-                i.item AS item_code,
-                i.label,
-                CASE WHEN c.item IS NOT NULL THEN 1 ELSE 0 END AS is_consumable,
-                CASE WHEN h.item IS NOT NULL THEN 1 ELSE 0 END AS is_housing_prop
-            FROM recipes r
-            LEFT JOIN recipes_category rc ON r.category_id = rc.ID
-            LEFT JOIN items i ON JSON_UNQUOTE(JSON_EXTRACT(r.result, '$.item')) = i.item
-            LEFT JOIN aprts_consumable c ON c.item = i.item
-            LEFT JOIN aprts_housing_props h ON h.item = i.item
-        """
-        cursor.execute(query)
-        self.all_recipes = cursor.fetchall()
-
-        # CACHE pro SKILLY
-        all_skills = {r['skill'] for r in self.all_recipes if r.get('skill')}
-        self.skill_cache.clear()
-        if all_skills:
-            placeholder = ", ".join(["%s"] * len(all_skills))
-            query_skills = f"SELECT name, label FROM skills WHERE name IN ({placeholder})"
-            cursor.execute(query_skills, tuple(all_skills))
-            result_skills = cursor.fetchall()
-            for row in result_skills:
-                self.skill_cache[row['name']] = row['label']
-
-        # CACHE pro ITEMS (materiálů)
-        all_material_codes = set()
-        for r in self.all_recipes:
-            mats_json = r.get('materials') or '{}'
-            try:
-                mat_dict = json.loads(mats_json)
-                for mat_code in mat_dict.keys():
-                    all_material_codes.add(mat_code)
-            except:
-                pass
-
-        self.item_label_cache.clear()
-        if all_material_codes:
-            placeholder = ", ".join(["%s"] * len(all_material_codes))
-            query_items = f"SELECT item, label FROM items WHERE item IN ({placeholder})"
-            cursor.execute(query_items, tuple(all_material_codes))
-            result_items = cursor.fetchall()
-            for row in result_items:
-                self.item_label_cache[row['item']] = row['label']
-
-        # Naparsování materials do řetězce s labely
-        for r in self.all_recipes:
-            materials = r.get('materials') or '{}'
-            try:
-                mat_dict = json.loads(materials)
-                materials_str_parts = []
-                for k, v in mat_dict.items():
-                    label = self.item_label_cache.get(k, "")
-                    if label:
-                        materials_str_parts.append(f"{k} ({label}): {v}")
-                    else:
-                        materials_str_parts.append(f"{k}: {v}")
-                materials_str = ", ".join(materials_str_parts)
-            except:
-                materials_str = ""
-            r['materials_str'] = materials_str
+    def load_all_recipes(self):
+        """Na pozadí načte všechny recepty; tabulka zůstává použitelná, dokud nepřijdou nová data."""
+        if self.recipe_load_thread is not None:
+            # Probíhající načítání je zastaralé, jeho výsledek zahodíme
+            self.recipe_load_thread.cancel()
+        thread = RecipeLoadThread(self)
+        thread.progress.connect(self.on_recipes_load_progress)
+        thread.loaded.connect(self.on_recipes_loaded)
+        thread.failed.connect(self.on_recipes_load_failed)
+        thread.finished.connect(thread.deleteLater)
+        self.recipe_load_thread = thread
+        self.load_progress.setValue(0)
+        self.load_progress.show()
+        self.cancel_load_button.show()
+        thread.start()
+
+    def on_recipes_load_progress(self, percent, text):
+        if self.sender() is not self.recipe_load_thread:
+            return
+        self.load_progress.setValue(percent)
+        self.statusBar().showMessage(text)
 
+    def on_recipes_loaded(self, data):
+        if self.sender() is not self.recipe_load_thread:
+            return
+        self.finish_recipes_load()
+        # Nová data i indexy vyměníme najednou
+        self.all_recipes = data['recipes']
+        self.skill_cache = data['skill_cache']
+        self.item_label_cache = data['item_label_cache']
+        self.search_index = data['search_index']
+        self.facets = data['facets']
+        self.recipes_checksum = data['checksum']
+        self.recipe_rows = {r['id']: row for row, r in enumerate(self.all_recipes)}
+
+        self.recipe_model.set_recipes(self.all_recipes, self.skill_cache)
         self.load_categories()
         self.populate_type_combobox()
         self.populate_prop_combobox()
 
         self.apply_filters()
 
+    def on_recipes_load_failed(self, error):
+        if self.sender() is not self.recipe_load_thread:
+            return
+        self.finish_recipes_load()
+        QtWidgets.QMessageBox.warning(self, "Chyba", f"Nepodařilo se načíst recepty: {error}")
+
+    def cancel_recipes_load(self):
+        if self.recipe_load_thread is not None:
+            self.recipe_load_thread.cancel()
+            self.finish_recipes_load()
+            self.statusBar().showMessage("Načítání receptů zrušeno", 3000)
+
+    def finish_recipes_load(self):
+        self.recipe_load_thread = None
+        self.load_progress.hide()
+        self.cancel_load_button.hide()
+        self.statusBar().clearMessage()
+
+    def refresh_recipes(self, recipe_ids):
+        """Znovu načte jen vybrané recepty a zapíše je do tabulky a indexů.
+
+        Recept, který v DB už není, z tabulky zmizí; nový se přidá na konec.
+        """
+        if self.recipe_load_thread is not None:
+            # Rozběhnuté načítání mohlo změnu minout, spustíme ho znovu
+            self.load_all_recipes()
+            return
+        recipes = load_recipes_by_id(self.connection, recipe_ids, self.skill_cache, self.item_label_cache)
+        found = {r['id']: r for r in recipes}
+        for recipe_id in recipe_ids:
+            recipe = found.get(recipe_id)
+            row = self.recipe_rows.get(recipe_id)
+            if row is None:
+                if recipe is None:
+                    continue
+                row = self.recipe_model.append_recipe(recipe)
+                self.recipe_rows[recipe_id] = row
+                old_recipe = None
+            else:
+                old_recipe = self.all_recipes[row]
+                if recipe is None:
+                    self.recipe_model.remove_recipe(row)
+                    del self.recipe_rows[recipe_id]
+                else:
+                    self.recipe_model.update_recipe(row, recipe)
+            self.search_index.set_row(row, recipe, self.skill_cache)
+            self.facets.set_row(row, old_recipe, recipe)
+
+        # Vlastní změny nesmí kontrola otisku považovat za cizí
+        self.recipes_checksum = fetch_recipes_checksum(self.connection)
+        self.populate_type_combobox()
+        self.populate_prop_combobox()
+        self.apply_filters()
+
+    def check_outside_changes(self):
+        if self.recipe_load_thread is not None or self.recipes_checksum is None:
+            return
+        try:
+            checksum = fetch_recipes_checksum(self.connection)
+        except mysql.connector.Error as err:
+            print(f"Kontrola změn receptů selhala: {err}")
+            return
+        if checksum != self.recipes_checksum:
+            self.load_all_recipes()
+            self.statusBar().showMessage("Recepty byly změněny mimo editor, načítám znovu...")
+
+    def recipe_ids_with_item(self, item_code):
+        return [r['id'] for r in self.all_recipes if r is not None and r['item_code'] == item_code]
+
+    def closeEvent(self, event):
+        # Rozběhnutá načítání (i zrušená) musí doběhnout dřív, než okno zanikne
+        for thread in (self.findChildren(RecipeLoadThread) + self.findChildren(CacheWarmThread)
+                       + self.findChildren(SnapshotRefreshThread)):
+            thread.cancel()
+            thread.wait()
+        super().closeEvent(event)
+
     def populate_type_combobox(self):
+        # Vybraný typ zůstane vybraný i po obnovení seznamu
+        current = self.type_combobox.currentData()
         self.type_combobox.blockSignals(True)
         self.type_combobox.clear()
         self.type_combobox.addItem("Vše", None)
-        types = set()
-
-        for r in self.all_recipes:
-            if r['type'] and r['type'].strip():
-                types.add(r['type'])
+        types = {t for t in self.facets.values('type') if t and t.strip()}
 
         for t in sorted(types):
             self.type_combobox.addItem(t, t)
+        self.type_combobox.setCurrentIndex(max(self.type_combobox.findData(current), 0))
         self.type_combobox.blockSignals(False)
 
     def populate_prop_combobox(self):
+        current = self.prop_combobox.currentData()
         self.prop_combobox.blockSignals(True)
         self.prop_combobox.clear()
         self.prop_combobox.addItem("Vše", None)
-        props = set()
-
-        for r in self.all_recipes:
-            if r['prop'] and r['prop'].strip():
-                props.add(r['prop'])
+        props = {p for p in self.facets.values('prop') if p and p.strip()}
 
         for p in sorted(props):
             self.prop_combobox.addItem(p, p)
+        self.prop_combobox.setCurrentIndex(max(self.prop_combobox.findData(current), 0))
         self.prop_combobox.blockSignals(False)
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT ID, name FROM recipes_category ORDER BY name")
-        categories = cursor.fetchall()
+        categories = ReferenceData.instance().rows(self.connection, 'recipe_categories')
         self.categories_list.clear()
         all_categories_item = QtWidgets.QListWidgetItem("Všechny kategorie")
         all_categories_item.setData(QtCore.Qt.UserRole, None)
+        all_categories_item.setData(CATEGORY_NAME_ROLE, "Všechny kategorie")
         self.categories_list.addItem(all_categories_item)
 
-        for category in categories:
-            item = QtWidgets.QListWidgetItem(category['name'])
-            item.setData(QtCore.Qt.UserRole, category['ID'])
+        for category_id, category_name in categories:
+            item = QtWidgets.QListWidgetItem(category_name)
+            item.setData(QtCore.Qt.UserRole, category_id)
+            item.setData(CATEGORY_NAME_ROLE, category_name)
             self.categories_list.addItem(item)
 
     def on_category_selected(self, item):
@@ -399,160 +565,127 @@ class RecipeManager(QtWidgets.QMainWindow):
         self.apply_filters()
 
     def apply_filters(self):
-        filtered = self.all_recipes
-
-        # Filtr podle kategorie
-        if self.selected_category_id is not None:
-            sel_cat_name = None
-            for i in range(self.categories_list.count()):
-                cat_item = self.categories_list.item(i)
-                cat_id = cat_item.data(QtCore.Qt.UserRole)
-                if cat_id == self.selected_category_id:
-                    sel_cat_name = cat_item.text()
-                    break
-            if sel_cat_name and sel_cat_name != "Všechny kategorie":
-                filtered = [r for r in filtered if r.get('category_name') and r['category_name'] == sel_cat_name]
-
-        # Filtr vyhledávání (name, item_code, label, skill, XP a materiály)
-        search_text = self.search_edit.text().strip().lower()
-        if search_text:
-            def matches_search(r):
-                name = (r['name'] or "").lower()
-                item_code = (r['item_code'] or "").lower()
-                label = (r['label'] or "").lower()
-                skill_label = self.skill_cache.get(r['skill'], r['skill']) or ""
-                xp = str(r['XP'])
-                materials_str = (r.get('materials_str', '')).lower()
-                return (
-                    search_text in name or
-                    search_text in item_code or
-                    search_text in label or
-                    search_text in skill_label.lower() or
-                    search_text in xp or
-                    search_text in materials_str
-                )
-            filtered = [r for r in filtered if matches_search(r)]
-
-        # Filtr podle typu
-        selected_type = self.type_combobox.currentData()
-        if selected_type:
-            filtered = [r for r in filtered if r['type'] == selected_type]
-
-        # Filtr podle prop
-        selected_prop = self.prop_combobox.currentData()
-        if selected_prop:
-            filtered = [r for r in filtered if r['prop'] == selected_prop]
-
-        self.show_recipes_in_table(filtered)
-
-    def show_recipes_in_table(self, recipes_to_show):
-        self.table.setRowCount(len(recipes_to_show))
-
-        for row_number, recipe in enumerate(recipes_to_show):
-            item_code = recipe.get('item_code')
-            item_label = recipe.get('label')
-
-            # Obrázek
-            if item_code:
-                image_label = get_item_image_label(item_code, self.cache_dir, self.connection)
-            else:
-                image_label = QtWidgets.QLabel("No Image")
-                image_label.setAlignment(QtCore.Qt.AlignCenter)
-            self.table.setCellWidget(row_number, 0, image_label)
-
-            # ID
-            id_item = QtWidgets.QTableWidgetItem(str(recipe['id']))
-            id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            id_item.setData(QtCore.Qt.UserRole, recipe['id'])
-            self.table.setItem(row_number, 1, id_item)
-
-            # Item (Label)
-            if item_code and item_label:
-                combined_label = f"{item_code} ({item_label})"
-            elif item_code:
-                combined_label = item_code
-            else:
-                combined_label = ""
-            item_label_item = QtWidgets.QTableWidgetItem(combined_label)
-            item_label_item.setFlags(item_label_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 2, item_label_item)
-
-            # Food
-            is_consumable = bool(recipe.get('is_consumable', 0))
-            consumable_item = QtWidgets.QTableWidgetItem("Ano" if is_consumable else "Ne")
-            consumable_item.setFlags(consumable_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 3, consumable_item)
-
-            # Housing
-            is_housing_prop = bool(recipe.get('is_housing_prop', 0))
-            housing_prop_item = QtWidgets.QTableWidgetItem("Ano" if is_housing_prop else "Ne")
-            housing_prop_item.setFlags(housing_prop_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 4, housing_prop_item)
-
-            # Skill
-            skill_label = self.skill_cache.get(recipe.get('skill'), recipe.get('skill') or "")
-            skill_item = QtWidgets.QTableWidgetItem(skill_label)
-            skill_item.setFlags(skill_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 5, skill_item)
-
-            # XP
-            xp_val = recipe.get('XP', 0)
-            xp_item = QtWidgets.QTableWidgetItem(str(xp_val))
-            xp_item.setFlags(xp_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 6, xp_item)
-
-            # Název
-            name_item = QtWidgets.QTableWidgetItem(recipe['name'] if recipe['name'] else "")
-            name_item.setFlags(name_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 7, name_item)
-
-            # Typ
-            type_text = recipe['type'] if recipe['type'] else ""
-            type_item = QtWidgets.QTableWidgetItem(type_text)
-            type_item.setFlags(type_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 8, type_item)
-
-            # Kategorie
-            category_text = recipe['category_name'] or ""
-            category_item = QtWidgets.QTableWidgetItem(category_text)
-            category_item.setFlags(category_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 9, category_item)
-
-            # Prop
-            prop_value = recipe['prop'] if recipe['prop'] else ""
-            prop_item = QtWidgets.QTableWidgetItem(prop_value)
-            prop_item.setFlags(prop_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 10, prop_item)
-
-            # Materiály
-            materials_str = recipe.get('materials_str', "")
-            materials_item = QtWidgets.QTableWidgetItem(materials_str)
-            materials_item.setFlags(materials_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            font = materials_item.font()
-            font.setPointSize(8)
-            materials_item.setFont(font)
-            self.table.setItem(row_number, 11, materials_item)
-
-            # Akce
-            action_widget = self.create_action_buttons(recipe['id'])
-            self.table.setCellWidget(row_number, 12, action_widget)
-
-            self.table.setRowHeight(row_number, 98)
-
-        # Nastavení šířek sloupců
-        self.table.setColumnWidth(0, 70)   # Obrázek
-        self.table.setColumnWidth(1, 30)    # ID
-        self.table.setColumnWidth(2, 150)   # Item (Label)
-        self.table.setColumnWidth(3, 30)    # Food
-        self.table.setColumnWidth(4, 60)    # Housing
-        self.table.setColumnWidth(5, 70)    # Skill
-        self.table.setColumnWidth(6, 30)    # XP
-        self.table.setColumnWidth(7, 150)   # Název
-        self.table.setColumnWidth(8, 100)   # Typ
-        self.table.setColumnWidth(9, 70)   # Kategorie
-        self.table.setColumnWidth(10, 100)  # Prop
-        self.table.setColumnWidth(11, 100)  # Materiály
-        self.table.setColumnWidth(12, 300)  # Akce
+        self.search_timer.stop()
+
+        # Filtr vyhledávání (name, item_code, label, skill, XP a materiály) z předpočítaného indexu
+        matches = self.search_index.search(self.search_edit.text())
+
+        # Filtry podle kategorie, typu a prop jako průnik předpočítaných množin řádků
+        selection = {
+            'category': self.selected_category_id,
+            'type': self.type_combobox.currentData() or None,
+            'prop': self.prop_combobox.currentData() or None,
+        }
+        rows, counts = self.facets.filter(matches, selection)
+
+        # Tabulka se nepřestavuje, proxy jen přepočítá viditelné řádky
+        self.recipe_proxy.set_accepted_rows(rows)
+        self.update_facet_counts(counts)
+        self.update_broken_images_counter()
+
+    def update_facet_counts(self, counts):
+        """Doplní k hodnotám filtrů počet receptů, které by po jejich výběru zůstaly."""
+        total, per_category = counts['category']
+        for i in range(self.categories_list.count()):
+            item = self.categories_list.item(i)
+            category_id = item.data(QtCore.Qt.UserRole)
+            count = total if category_id is None else per_category.get(category_id, 0)
+            item.setText(f"{item.data(CATEGORY_NAME_ROLE)} ({count})")
+
+        for combobox, facet in ((self.type_combobox, 'type'), (self.prop_combobox, 'prop')):
+            total, per_value = counts[facet]
+            for i in range(combobox.count()):
+                value = combobox.itemData(i)
+                if value is None:
+                    combobox.setItemText(i, f"Vše ({total})")
+                else:
+                    combobox.setItemText(i, f"{value} ({per_value.get(value, 0)})")
+
+    def update_broken_images_counter(self):
+        count = NegativeImageCache.instance().count()
+        self.retry_images_action.setText(f"Chybějící obrázky: {count}")
+
+    def retry_broken_images(self):
+        retry_broken_images()
+        self.recipe_model.refresh_images()
+        self.update_broken_images_counter()
+
+    def warm_image_cache(self):
+        """Na pozadí stáhne obrázky všech itemů, průběh ukazuje v progress dialogu."""
+        if self.cache_warm_thread is not None:
+            return
+        item_images = load_all_item_images(self.connection)
+        progress_dialog = QtWidgets.QProgressDialog(
+            "Stahuji obrázky itemů...", "Zrušit", 0, len(set(item_images.values())), self)
+        progress_dialog.setWindowTitle("Předstažení obrázků")
+        progress_dialog.setMinimumDuration(0)
+
+        workers = self.config.get('cache_warm_workers', 8)
+        self.cache_warm_thread = CacheWarmThread(item_images, self.cache_dir, workers, self)
+        self.cache_warm_thread.progress.connect(lambda done, total: progress_dialog.setValue(done))
+        progress_dialog.canceled.connect(self.cache_warm_thread.cancel)
+        self.cache_warm_thread.finished_with_stats.connect(
+            lambda stats: self.on_image_cache_warmed(progress_dialog, stats))
+        # Tlačítko se povolí, i když běh skončí chybou a statistika nepřijde
+        self.cache_warm_thread.finished.connect(lambda: self.finish_image_cache_warm(progress_dialog))
+        self.cache_warm_thread.finished.connect(self.cache_warm_thread.deleteLater)
+        self.warm_cache_action.setEnabled(False)
+        self.cache_warm_thread.start()
+
+    def on_image_cache_warmed(self, progress_dialog, stats):
+        progress_dialog.close()
+        print(stats['report'])
+        QtWidgets.QMessageBox.information(self, "Předstažení obrázků", stats['report'])
+        self.recipe_model.refresh_images()
+        self.update_broken_images_counter()
+
+    def finish_image_cache_warm(self, progress_dialog):
+        self.cache_warm_thread = None
+        self.warm_cache_action.setEnabled(True)
+        progress_dialog.close()
+
+    def show_query_stats(self):
+        # Nemodální okno, ať jde sledovat dotazy při práci v ostatních dialozích
+        if self.query_stats_dialog is None:
+            self.query_stats_dialog = QueryStatsDialog(self)
+        self.query_stats_dialog.show()
+        self.query_stats_dialog.raise_()
+        self.query_stats_dialog.activateWindow()
+
+    def refresh_snapshot(self):
+        """Na pozadí obnoví offline snapshot z MySQL; v offline režimu pak načte nová data."""
+        if self.snapshot_thread is not None:
+            return
+        thread = SnapshotRefreshThread(self.config['mysql'], self.snapshot_path, parent=self)
+        thread.progress.connect(self.on_snapshot_progress)
+        thread.refreshed.connect(self.on_snapshot_refreshed)
+        thread.failed.connect(self.on_snapshot_failed)
+        thread.finished.connect(thread.deleteLater)
+        self.snapshot_thread = thread
+        self.refresh_snapshot_action.setEnabled(False)
+        self.statusBar().showMessage("Obnovuji snapshot...")
+        thread.start()
+
+    def on_snapshot_progress(self, done, total, table):
+        self.statusBar().showMessage(f"Obnovuji snapshot: {done}/{total} ({table})")
+
+    def on_snapshot_refreshed(self, stats):
+        self.finish_snapshot_refresh()
+        print(stats['report'])
+        self.statusBar().showMessage(f"Snapshot obnoven. {stats['report']}", 10000)
+        if Database.instance().is_offline():
+            self.update_window_title()
+            if stats['changed_tables']:
+                self.refresh_all()
+
+    def on_snapshot_failed(self, error):
+        self.finish_snapshot_refresh()
+        self.statusBar().clearMessage()
+        QtWidgets.QMessageBox.warning(self, "Chyba", f"Nepodařilo se obnovit snapshot: {error}")
+
+    def finish_snapshot_refresh(self):
+        self.snapshot_thread = None
+        self.refresh_snapshot_action.setEnabled(True)
 
     def manage_books(self):
         dialog = BookManager(self.connection)
@@ -574,6 +707,7 @@ class RecipeManager(QtWidgets.QMainWindow):
         dialog = CategoryManagerDialog(self.connection)
         dialog.exec_()
         self.load_categories()
+        self.apply_filters()
 
     def manage_longcraft(self):
         dialog = LongcraftManager(self.connection)
@@ -607,50 +741,15 @@ class RecipeManager(QtWidgets.QMainWindow):
         dialog = TreasureManagerDialog(self.connection)
         dialog.exec_()
 
-    def create_action_buttons(self, recipe_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setIcon(QtGui.QIcon.fromTheme('edit'))
-        edit_button.setToolTip("Upravit")
-        edit_button.clicked.connect(self.play_click_sound)
-        edit_button.clicked.connect(lambda _, rid=recipe_id: self.edit_recipe_by_id(rid))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Kopírovat
-        copy_button = QtWidgets.QPushButton("Kopírovat")
-        copy_button.setIcon(QtGui.QIcon.fromTheme('edit-copy'))
-        copy_button.setToolTip("Kopírovat")
-        copy_button.clicked.connect(self.play_click_sound)
-        copy_button.clicked.connect(lambda _, rid=recipe_id: self.copy_recipe_by_id(rid))
-        copy_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        h_layout.addWidget(copy_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setIcon(QtGui.QIcon.fromTheme('edit-delete'))
-        delete_button.setToolTip("Smazat")
-        delete_button.clicked.connect(self.play_click_sound)
-        delete_button.clicked.connect(lambda _, rid=recipe_id: self.delete_recipe_by_id(rid))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def edit_recipe_by_id(self, recipe_id):
         dialog = RecipeDialog(self.connection, recipe_id)
         if dialog.exec_():
-            self.load_all_recipes()
+            self.refresh_recipes([recipe_id])
 
     def copy_recipe_by_id(self, recipe_id):
         dialog = RecipeDialog(self.connection, recipe_id, copy=True)
         if dialog.exec_():
-            self.load_all_recipes()
+            self.refresh_recipes([dialog.recipe_id])
 
     def delete_recipe_by_id(self, recipe_id):
         confirm = QtWidgets.QMessageBox.question(
@@ -659,33 +758,29 @@ class RecipeManager(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM recipes WHERE id = %s", (recipe_id,))
-            self.connection.commit()
-            self.load_all_recipes()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM recipes WHERE id = %s", (recipe_id,))
+                self.connection.commit()
+                self.refresh_recipes([recipe_id])
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def add_recipe(self):
         dialog = RecipeDialog(self.connection)
         if dialog.exec_():
-            self.load_all_recipes()
+            self.refresh_recipes([dialog.recipe_id])
 
-    def on_table_double_clicked(self, row, column):
-        id_item = self.table.item(row, 1)
-        if id_item:
-            recipe_id = int(id_item.text())
-            self.edit_recipe_by_id(recipe_id)
+    def on_table_double_clicked(self, index):
+        self.edit_recipe_by_id(index.data(QtCore.Qt.UserRole))
 
     def show_context_menu(self, position):
         index = self.table.indexAt(position)
         if not index.isValid():
             return
 
-        row = index.row()
-        recipe_id_item = self.table.item(row, 1)
-        if recipe_id_item:
-            recipe_id = int(recipe_id_item.text())
-        else:
-            return
+        recipe_id = index.data(QtCore.Qt.UserRole)
 
         menu = QtWidgets.QMenu()
         set_consumable_action = menu.addAction("Nastavit výsledný item jako konzumovatelný")
@@ -706,20 +801,19 @@ class RecipeManager(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Chyba", "Recept nebyl nalezen.")
             return
 
-        try:
-            result = json.loads(recipe['result'])
-            item_code = result.get('item')
-            if not item_code:
-                QtWidgets.QMessageBox.warning(self, "Chyba", "Výsledný item nebyl nalezen.")
-                return
-        except json.JSONDecodeError:
+        result = parse_json(recipe['result'], None, "result")
+        if not isinstance(result, dict):
             QtWidgets.QMessageBox.warning(self, "Chyba", "Chyba při načítání výsledného itemu.")
             return
+        item_code = result.get('item')
+        if not item_code:
+            QtWidgets.QMessageBox.warning(self, "Chyba", "Výsledný item nebyl nalezen.")
+            return
 
         dialog = ConsumableDialog(self.connection, item_code=item_code)
         if dialog.exec_():
             QtWidgets.QMessageBox.information(self, "Úspěch", "Item byl nastaven jako konzumovatelný.")
-            self.load_all_recipes()
+            self.refresh_recipes(self.recipe_ids_with_item(item_code))
         else:
             QtWidgets.QMessageBox.warning(self, "Zrušeno", "Akce byla zrušena.")
 
@@ -731,20 +825,19 @@ class RecipeManager(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Chyba", "Recept nebyl nalezen.")
             return
 
-        try:
-            result = json.loads(recipe['result'])
-            item_code = result.get('item')
-            if not item_code:
-                QtWidgets.QMessageBox.warning(self, "Chyba", "Výsledný item nebyl nalezen.")
-                return
-        except json.JSONDecodeError:
+        result = parse_json(recipe['result'], None, "result")
+        if not isinstance(result, dict):
             QtWidgets.QMessageBox.warning(self, "Chyba", "Chyba při načítání výsledného itemu.")
             return
+        item_code = result.get('item')
+        if not item_code:
+            QtWidgets.QMessageBox.warning(self, "Chyba", "Výsledný item nebyl nalezen.")
+            return
 
         dialog = HousingPropDialog(self.connection, item_code=item_code)
         if dialog.exec_():
             QtWidgets.QMessageBox.information(self, "Úspěch", "Item byl nastaven jako housing prop.")
-            self.load_all_recipes()
+            self.refresh_recipes(self.recipe_ids_with_item(item_code))
         else:
             QtWidgets.QMessageBox.warning(self, "Zrušeno", "Akce byla zrušena.")
 
@@ -7,10 +7,18 @@ import mysql.connector
 from graphviz import Digraph
 from itertools import cycle
 
+from image_store import ImageNameResolver, DiskImageCache, DEFAULT_CACHE_DIR
+from recipe_store import fetch_recipes
+from reference_data import ReferenceData
+from json_cache import parse_json
+from db import Database
+from query_stats import QueryStats
+from downloader import HttpDownloader
+
 # Cesta k souboru config.json
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 config_path = os.path.join(BASE_DIR, 'config.json')
-image_cache_dir = os.path.join(BASE_DIR, 'item_images')
+image_cache_dir = DEFAULT_CACHE_DIR  # Stejná cache obrázků jako v editoru
 
 def load_config():
     with open(config_path, 'r', encoding='utf-8') as f:
@@ -20,28 +28,17 @@ def load_config():
 def create_db_connection(config):
     print("Connecting to database...")
     try:
-        connection = mysql.connector.connect(
-            host=config['mysql']['host'],
-            user=config['mysql']['user'],
-            password=config['mysql']['password'],
-            database=config['mysql']['database']
-        )
-        return connection
+        # Jednovláknový skript, stačí pool s jedním spojením; dotazy se tak i měří
+        return Database.instance().configure(config['mysql'], pool_size=1)
     except mysql.connector.Error as err:
         print(f"Error connecting to database: {err}")
         sys.exit(1)
 
 def get_recipes(connection):
-    cursor = connection.cursor(dictionary=True)
-    query = """
-        SELECT r.id, r.name, r.type, r.prop, r.triggerItem, r.result, r.materials, r.meta,
-               r.category_id, rc.name AS category_name, i.label AS result_label, i.image AS result_image
-        FROM recipes r
-        LEFT JOIN recipes_category rc ON r.category_id = rc.ID
-        LEFT JOIN items i ON JSON_UNQUOTE(JSON_EXTRACT(r.result, '$.item')) = i.item
-    """
-    cursor.execute(query)
-    recipes = cursor.fetchall()
+    recipes = fetch_recipes(connection)
+    for recipe in recipes:
+        recipe['result_label'] = recipe['label']
+        recipe['result_image'] = recipe['image']
     return recipes
 
 def get_longcraft_recipes(connection):
@@ -55,46 +52,39 @@ def get_longcraft_recipes(connection):
     return longcraft_recipes
 
 def parse_materials(materials_json):
-    try:
-        materials = json.loads(materials_json)
-        items = []
-        if isinstance(materials, dict):
-            # Formát {"item": count}
-            for item_name, count in materials.items():
-                label = f"{item_name} x{count}"
-                items.append({'item_name': item_name, 'label': label, 'count': count}) # Přidáno 'count'
-        elif isinstance(materials, list):
-            # Formát [{"item": "item_name", "count": count}, ...]
-            for material in materials:
-                item_name = material.get('item')
-                count = material.get('count', 1)
-                label = f"{item_name} x{count}"
-                items.append({'item_name': item_name, 'label': label, 'count': count}) # Přidáno 'count'
-        return items
-    except json.JSONDecodeError:
-        return []
+    materials = parse_json(materials_json, [], "materials")
+    items = []
+    if isinstance(materials, dict):
+        # Formát {"item": count}
+        for item_name, count in materials.items():
+            label = f"{item_name} x{count}"
+            items.append({'item_name': item_name, 'label': label, 'count': count}) # Přidáno 'count'
+    elif isinstance(materials, list):
+        # Formát [{"item": "item_name", "count": count}, ...]
+        for material in materials:
+            item_name = material.get('item')
+            count = material.get('count', 1)
+            label = f"{item_name} x{count}"
+            items.append({'item_name': item_name, 'label': label, 'count': count}) # Přidáno 'count'
+    return items
 
 def parse_longcraft_materials(recipe_json):
-    try:
-        recipe = json.loads(recipe_json)
-        items = []
-        for slot, materials in recipe.items():
-            for item_name, count in materials.items():
-                label = f"{item_name} x{count} (Slot {slot})"
-                items.append({'item_name': item_name, 'label': label, 'count': count, 'slot': slot}) # Přidáno 'count' a 'slot'
-        return items
-    except json.JSONDecodeError:
-        return []
+    recipe = parse_json(recipe_json, {}, "longcraft recipe")
+    items = []
+    for slot, materials in recipe.items():
+        for item_name, count in materials.items():
+            label = f"{item_name} x{count} (Slot {slot})"
+            items.append({'item_name': item_name, 'label': label, 'count': count, 'slot': slot}) # Přidáno 'count' a 'slot'
+    return items
 
 def parse_result(result_json):
-    try:
-        result = json.loads(result_json)
-        item_name = result.get('item')
-        count = result.get('count', 1)
-        label = f"{item_name} x{count}"
-        return {'item_name': item_name, 'label': label, 'count': count} # Přidáno 'count'
-    except json.JSONDecodeError:
+    result = parse_json(result_json, None, "result")
+    if result is None:
         return None
+    item_name = result.get('item')
+    count = result.get('count', 1)
+    label = f"{item_name} x{count}"
+    return {'item_name': item_name, 'label': label, 'count': count} # Přidáno 'count'
 
 def parse_longcraft_result(reward_item_name, count):
     if reward_item_name:
@@ -104,45 +94,42 @@ def parse_longcraft_result(reward_item_name, count):
         return None
 
 def download_item_image(item_name, image_name):
-    if not os.path.exists(image_cache_dir):
-        os.makedirs(image_cache_dir)
-    image_path = os.path.join(image_cache_dir, f"{item_name}.png")
-    if not os.path.exists(image_path):
-        url = f"https://api.westhavenrp.cz/storage/items/{image_name}"
-        try:
-            from urllib.request import urlopen, Request
-            req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            data = urlopen(req).read()
-            with open(image_path, 'wb') as f:
-                f.write(data)
-        except Exception as e:
-            print(f"Error downloading image for {item_name}: {e}")
-            return None
-    return image_path
-
-def get_item_image_path(item_name, connection):
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-    result = cursor.fetchone()
-    if result and result.get('image'):
-        image_name = result['image']
-        image_path = download_item_image(item_name, image_name)
-        return image_path
-    else:
+    # Sdílená cache s editorem; soubor se stáhne jen pokud ho ještě nemáme
+    try:
+        return DiskImageCache.instance(image_cache_dir).fetch(image_name, HttpDownloader.instance(), item_name)
+    except Exception as e:
+        print(f"Error downloading image for {item_name}: {e}")
         return None
 
+def collect_item_codes(recipes, longcraft_recipes):
+    """Kódy všech materiálů a výsledků, aby se jejich labely a obrázky načetly najednou."""
+    item_codes = set()
+    for recipe in recipes:
+        item_codes.update(material['item_name'] for material in parse_materials(recipe['materials']))
+        result = parse_result(recipe['result'])
+        if result:
+            item_codes.add(result['item_name'])
+    for recipe in longcraft_recipes:
+        item_codes.update(material['item_name'] for material in parse_longcraft_materials(recipe['recipe']))
+        item_codes.add(recipe['reward'])
+    item_codes.discard(None)
+    return item_codes
+
+def prefetch_item_info(connection, item_codes):
+    # Obrázky dávkami WHERE item IN (...), labely jedním dotazem do sdílené cache položek
+    ImageNameResolver.instance().prefetch(connection, item_codes)
+    ReferenceData.instance().items(connection)
+
 def get_item_info(item_name, connection):
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT label, image FROM items WHERE item = %s", (item_name,))
-    result = cursor.fetchone()
-    if result:
-        item_label = result['label']
-        image_name = result['image']
-        image_path = None
-        if image_name:
-            image_path = download_item_image(item_name, image_name)
-        return item_label, image_path
-    return None, None
+    """(label, cesta k obrázku) itemu z dat načtených v prefetch_item_info."""
+    record = ReferenceData.instance().item(connection, item_name)
+    if record is None:
+        return None, None
+    image_path = None
+    image_name = ImageNameResolver.instance().resolve(connection, item_name)
+    if image_name:
+        image_path = download_item_image(item_name, image_name)
+    return record.label, image_path
 
 def generate_graph(recipes, longcraft_recipes, connection, graph_title="Recepty", output_format='pdf'):
     from itertools import cycle
@@ -194,11 +181,8 @@ def generate_graph(recipes, longcraft_recipes, connection, graph_title="Recepty"
         prop = recipe.get('prop')  # Získání prop, pokud existuje
         trigger_item = recipe.get('triggerItem')  # Získání triggerItem, pokud existuje
         category_name = recipe.get('category_name') or 'Nezařazeno'
-        try:
-            meta = json.loads(recipe.get('meta', '{}'))
-            recipe_desc = meta.get('description', '')
-        except json.JSONDecodeError:
-            recipe_desc = ''
+        meta = parse_json(recipe.get('meta'), {}, "meta")
+        recipe_desc = meta.get('description', '')
 
         # Přidání typu a případně prop nebo triggerItem do názvu receptu
         if recipe_type in ['near_prop', 'on_prop']:
@@ -333,6 +317,9 @@ def export_pdfs(connection):
     longcraft_recipes = get_longcraft_recipes(connection)
     print(f"Nalezeno {len(longcraft_recipes)} longcraft receptů.")
 
+    # Labely a obrázky všech itemů v grafech dopředu, ne jeden dotaz na každý uzel
+    prefetch_item_info(connection, collect_item_codes(recipes, longcraft_recipes))
+
     # Skupiny podle kategorií
     categories = {}
 
@@ -387,6 +374,9 @@ def export_pdfs(connection):
         merger.close()
         print(f"Všechny kategorie byly sloučeny do jednoho PDF: {merged_pdf_path}")
 
+    print(HttpDownloader.instance().report())
+    print(QueryStats.instance().report())
+
 if __name__ == '__main__':
     config = load_config()
     connection = create_db_connection(config)
@@ -5,6 +5,7 @@ import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from field_dialog import FieldDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 
 class FieldsManagerWidget(QtWidgets.QWidget):
@@ -52,6 +53,10 @@ class FieldsManagerWidget(QtWidgets.QWidget):
         self.fields_table.setSortingEnabled(True)
         self.fields_table.cellDoubleClicked.connect(
             self.on_fields_double_click)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.fields_action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_field_by_id, delete=self.delete_field_by_id), self.fields_table)
+        self.fields_table.setItemDelegateForColumn(5, self.fields_action_delegate)
         main_layout.addWidget(self.fields_table)
 
         # Tlačítka
@@ -121,8 +126,7 @@ class FieldsManagerWidget(QtWidgets.QWidget):
             self.fields_table.setItem(row_number, 4, limit_item)
 
             # akce
-            action_widget = self.create_field_action_buttons(field['id'])
-            self.fields_table.setCellWidget(row_number, 5, action_widget)
+            self.fields_table.setItem(row_number, 5, action_item(field['id']))
 
         self.fields_table.resizeColumnsToContents()
 
@@ -132,26 +136,6 @@ class FieldsManagerWidget(QtWidgets.QWidget):
             field_id = int(id_item.text())
             self.edit_field_by_id(field_id)
 
-    def create_field_action_buttons(self, field_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(
-            lambda _, fid=field_id: self.edit_field_by_id(fid))
-        h_layout.addWidget(edit_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(
-            lambda _, fid=field_id: self.delete_field_by_id(fid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def add_field(self):
         dialog = FieldDialog(self.connection)
         if dialog.exec_():
@@ -169,8 +153,12 @@ class FieldsManagerWidget(QtWidgets.QWidget):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute(
-                "DELETE FROM aprts_herbs_fields WHERE id = %s", (field_id,))
-            self.connection.commit()
-            self.load_fields()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute(
+                    "DELETE FROM aprts_herbs_fields WHERE id = %s", (field_id,))
+                self.connection.commit()
+                self.load_fields()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
@@ -5,6 +5,7 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from freeplace_prop_dialog import FreeplacePropDialog
 from item_manager import ItemDialog
+from table_delegates import ActionButtonsDelegate, action_item, EDIT_COLOR, COPY_COLOR, DELETE_COLOR
 
 class FreeplaceManager(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -37,6 +38,13 @@ class FreeplaceManager(QtWidgets.QDialog):
         self.table.setHorizontalHeaderLabels(['ID', 'Prop', 'Item', 'Typ', 'Jobs', 'Akce'])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
         self.table.setSortingEnabled(True)
+        # Tlačítka akcí kreslí delegát; buňka nese (id, item) propu
+        self.action_delegate = ActionButtonsDelegate([
+            ("Upravit", EDIT_COLOR, lambda prop: self.edit_prop_by_id(prop[0])),
+            ("Upravit Item", COPY_COLOR, lambda prop: self.edit_item_by_name(prop[1])),
+            ("Smazat", DELETE_COLOR, lambda prop: self.delete_prop_by_id(prop[0])),
+        ], self.table)
+        self.table.setItemDelegateForColumn(5, self.action_delegate)
         layout.addWidget(self.table)
 
         # Tlačítka
@@ -95,36 +103,9 @@ class FreeplaceManager(QtWidgets.QDialog):
             jobs_item.setFlags(jobs_item.flags() & ~QtCore.Qt.ItemIsEditable)
             self.table.setItem(row_number, 4, jobs_item)
 
-            action_widget = self.create_action_buttons(prop['id'], prop['item'])
-            self.table.setCellWidget(row_number, 5, action_widget)
+            self.table.setItem(row_number, 5, action_item((prop['id'], prop['item'])))
             self.table.setColumnWidth(5, 200)
 
-    def create_action_buttons(self, prop_id, item_name):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, pid=prop_id: self.edit_prop_by_id(pid))
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Upravit Item
-        edit_item_button = QtWidgets.QPushButton("Upravit Item")
-        edit_item_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        edit_item_button.clicked.connect(lambda _, name=item_name: self.edit_item_by_name(name))
-        h_layout.addWidget(edit_item_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, pid=prop_id: self.delete_prop_by_id(pid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 0)  # Sloupec 0 je ID
         if id_item:
@@ -154,7 +135,11 @@ class FreeplaceManager(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat tento záznam?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_freeplacing_props WHERE id = %s", (prop_id,))
-            self.connection.commit()
-            self.load_props()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_freeplacing_props WHERE id = %s", (prop_id,))
+                self.connection.commit()
+                self.load_props()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
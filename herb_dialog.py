@@ -6,6 +6,9 @@ import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from item_manager import ItemSelectionDialog
+from image_utils import load_item_pixmap, prefetch_item_images
+from image_store import DEFAULT_CACHE_DIR
+from reference_data import ReferenceData
 
 ########################################
 # DIALOG PRO PŘIDÁNÍ / ÚPRAVU JEDNÉ ODMĚNY
@@ -83,13 +86,7 @@ class RewardDialog(QtWidgets.QDialog):
                 self.item_label.setText(f"{lbl} ({self.selected_item})")
 
     def get_item_label(self, item_name):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT label FROM items WHERE item = %s", (item_name,))
-        result = cursor.fetchone()
-        if result and result.get('label'):
-            return result['label']
-        else:
-            return None
+        return ReferenceData.instance().item_label(self.connection, item_name) or None
 
     def accept_dialog(self):
         # Kontrola, zda uživatel vybral item
@@ -122,7 +119,7 @@ class HerbDialog(QtWidgets.QDialog):
         # Seznam odměn (list of dict: {item, chance, maxamount})
         self.rewards = []
 
-        self.cache_dir = 'cache'
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
@@ -254,6 +251,7 @@ class HerbDialog(QtWidgets.QDialog):
     def update_rewards_list(self):
         """Zobrazí self.rewards v ListWidgetu i s ikonami."""
         self.rewards_list.clear()
+        prefetch_item_images([rwd['item'] for rwd in self.rewards], self.connection)
         for rwd in self.rewards:
             # Najdeme label itemu
             item_label = self.get_item_label(rwd['item']) or rwd['item']
@@ -272,39 +270,11 @@ class HerbDialog(QtWidgets.QDialog):
             self.rewards_list.addItem(list_item)
 
     def load_item_image(self, item_name):
-        """Načte obrázek z cache nebo z DB (podobně jako v recipe_dialog)."""
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-        if os.path.exists(cache_file_path):
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                pixmap = None
-        return pixmap
+        """Načte obrázek přes sdílenou cache (podobně jako v recipe_dialog)."""
+        return load_item_pixmap(item_name, self.cache_dir, self.connection)
 
     def get_item_label(self, item_name):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT label FROM items WHERE item = %s", (item_name,))
-        result = cursor.fetchone()
-        if result and result.get('label'):
-            return result['label']
-        return None
+        return ReferenceData.instance().item_label(self.connection, item_name) or None
 
     def decode_if_bytes(self, value):
         if isinstance(value, bytes):
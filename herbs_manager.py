@@ -9,6 +9,7 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from herb_dialog import HerbDialog
 # Widget pro druhou záložku (pole)
 from fields_manager import FieldsManagerWidget
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 
 def decode_if_bytes(value):
@@ -97,6 +98,12 @@ class HerbsManagerDialog(QtWidgets.QDialog):
             ["ID", "source", "GatherTime", "Akce"])
         self.herbs_table.setSortingEnabled(True)
         self.herbs_table.cellDoubleClicked.connect(self.edit_herb_by_row)
+        # Tlačítka akcí kreslí delegát; buňka nese celý záznam bylinky (kvůli kopírování)
+        self.herbs_action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=lambda herb: self.edit_herb_by_id(herb['id']),
+            copy=self.copy_herb,
+            delete=lambda herb: self.delete_herb_by_id(herb['id'])), self.herbs_table)
+        self.herbs_table.setItemDelegateForColumn(3, self.herbs_action_delegate)
         layout.addWidget(self.herbs_table)
 
         # Tlačítka pod tabulkou
@@ -157,45 +164,10 @@ class HerbsManagerDialog(QtWidgets.QDialog):
             self.herbs_table.setItem(row_number, 2, gather_time_item)
 
             # Akce
-            action_widget = self.create_herb_action_buttons(herb)
-            self.herbs_table.setCellWidget(row_number, 3, action_widget)
+            self.herbs_table.setItem(row_number, 3, action_item(herb))
 
         self.herbs_table.resizeColumnsToContents()
 
-    def create_herb_action_buttons(self, herb_dict):
-        """Vytvoří widget s tlačítky pro Upravit / Kopírovat / Smazat."""
-        herb_id = herb_dict['id']
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet(
-            "background-color: #5cb85c; color: white;")  # Zelené
-        edit_button.clicked.connect(
-            lambda _, hid=herb_id: self.edit_herb_by_id(hid))
-        h_layout.addWidget(edit_button)
-
-        # Kopírovat
-        copy_button = QtWidgets.QPushButton("Kopírovat")
-        copy_button.setStyleSheet(
-            "background-color: #5bc0de; color: white;")  # Modré
-        copy_button.clicked.connect(
-            lambda _, hdict=herb_dict: self.copy_herb(hdict))
-        h_layout.addWidget(copy_button)
-
-        # Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet(
-            "background-color: #d9534f; color: white;")  # Červené
-        delete_button.clicked.connect(
-            lambda _, hid=herb_id: self.delete_herb_by_id(hid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def copy_herb(self, herb_dict):
         """
         Zkopíruje danou bylinku (herb_dict) do nového záznamu.
@@ -219,8 +191,7 @@ class HerbsManagerDialog(QtWidgets.QDialog):
 
         col_str = ", ".join(columns)
         place_str = ", ".join(placeholders)
-        insert_query = f"INSERT INTO aprts_herbs ({col_str}) VALUES ({
-            place_str})"
+        insert_query = f"INSERT INTO aprts_herbs ({col_str}) VALUES ({place_str})"
 
         cursor = self.connection.cursor()
         try:
@@ -262,7 +233,11 @@ class HerbsManagerDialog(QtWidgets.QDialog):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_herbs WHERE id = %s", (herb_id,))
-            self.connection.commit()
-            self.load_herbs()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_herbs WHERE id = %s", (herb_id,))
+                self.connection.commit()
+                self.load_herbs()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
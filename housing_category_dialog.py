@@ -3,6 +3,8 @@ import os
 from PyQt5 import QtWidgets, QtCore
 import mysql.connector
 
+from reference_data import ReferenceData
+
 class CategoryManagerDialog(QtWidgets.QDialog):
     def __init__(self, connection):
         super().__init__()
@@ -46,18 +48,16 @@ class CategoryManagerDialog(QtWidgets.QDialog):
     def load_categories(self):
         """Načte kategorie z tabulky aprts_housing_category a zobrazí v tabulce."""
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT id, name FROM aprts_housing_category ORDER BY name")
-            rows = cursor.fetchall()
+            rows = ReferenceData.instance().rows(self.connection, 'housing_categories')
 
             self.table.setRowCount(0)
             for row_num, row in enumerate(rows):
                 self.table.insertRow(row_num)
-                id_item = QtWidgets.QTableWidgetItem(str(row['id']))
+                id_item = QtWidgets.QTableWidgetItem(str(row[0]))
                 id_item.setFlags(id_item.flags() & ~QtCore.Qt.ItemIsEditable)
                 self.table.setItem(row_num, 0, id_item)
 
-                name_item = QtWidgets.QTableWidgetItem(row['name'])
+                name_item = QtWidgets.QTableWidgetItem(row[1])
                 self.table.setItem(row_num, 1, name_item)
             self.table.resizeColumnsToContents()
 
@@ -72,6 +72,7 @@ class CategoryManagerDialog(QtWidgets.QDialog):
                 cursor = self.connection.cursor()
                 cursor.execute("INSERT INTO aprts_housing_category (name) VALUES (%s)", (text.strip(),))
                 self.connection.commit()
+                ReferenceData.instance().invalidate('housing_categories')
                 self.load_categories()
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání kategorie: {e}")
@@ -94,6 +95,7 @@ class CategoryManagerDialog(QtWidgets.QDialog):
                 cursor = self.connection.cursor()
                 cursor.execute("UPDATE aprts_housing_category SET name=%s WHERE id=%s", (text.strip(), category_id))
                 self.connection.commit()
+                ReferenceData.instance().invalidate('housing_categories')
                 self.load_categories()
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při úpravě kategorie: {e}")
@@ -119,6 +121,7 @@ class CategoryManagerDialog(QtWidgets.QDialog):
                 cursor = self.connection.cursor()
                 cursor.execute("DELETE FROM aprts_housing_category WHERE id=%s", (category_id,))
                 self.connection.commit()
+                ReferenceData.instance().invalidate('housing_categories')
                 self.load_categories()
             except Exception as e:
                 QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání kategorie: {e}")
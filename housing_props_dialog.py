@@ -9,6 +9,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from item_manager import ItemSelectionDialog
 from housing_category_dialog import CategoryManagerDialog
+from image_store import ImageNameResolver
+from reference_data import ReferenceData
 
 
 class HousingPropDialog(QtWidgets.QDialog):
@@ -249,13 +251,9 @@ class HousingPropDialog(QtWidgets.QDialog):
     # DALŠÍ FUNKCE
     # --------------------------------------------------------------------------------
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT id, name FROM aprts_housing_category ORDER BY name")
-        categories = cursor.fetchall()
-
         self.cat_edit.clear()
-        for cat in categories:
-            self.cat_edit.addItem(cat['name'], cat['id'])
+        for cat_id, cat_name in ReferenceData.instance().rows(self.connection, 'housing_categories'):
+            self.cat_edit.addItem(cat_name, cat_id)
 
     def manage_categories(self):
         dialog = CategoryManagerDialog(self.connection)
@@ -345,6 +343,8 @@ class HousingPropDialog(QtWidgets.QDialog):
         try:
             cursor.execute(insert_query, params)
             self.connection.commit()
+            ImageNameResolver.instance().invalidate(new_item_name)
+            ReferenceData.instance().refresh_items(self.connection, [new_item_name])
             self.item_edit.setText(new_item_name)
             QtWidgets.QMessageBox.information(
                 self, "Úspěch", f"Nový item '{new_item_name}' byl vytvořen."
@@ -9,6 +9,8 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from item_manager import ItemDialog
 from housing_props_dialog import HousingPropDialog
 from housing_category_dialog import CategoryManagerDialog  # Přidán import CategoryManagerDialog
+from reference_data import ReferenceData
+from table_delegates import ActionButtonsDelegate, action_item, EDIT_COLOR, COPY_COLOR, DELETE_COLOR
 
 class HousingPropsManager(QtWidgets.QDialog):
     def __init__(self, connection, item_code=None, is_new=False):
@@ -86,6 +88,13 @@ class HousingPropsManager(QtWidgets.QDialog):
             'Prodej', 'Cena ($)', 'Akce'
         ])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tlačítka akcí kreslí delegát; buňka nese (id, item) propu
+        self.action_delegate = ActionButtonsDelegate([
+            ("Upravit", EDIT_COLOR, lambda prop: self.edit_housing_prop_by_id(prop[0])),
+            ("Upravit Item", COPY_COLOR, lambda prop: self.edit_item_by_name(prop[1])),
+            ("Smazat", DELETE_COLOR, lambda prop: self.delete_housing_prop_by_id(prop[0])),
+        ], self.table)
+        self.table.setItemDelegateForColumn(8, self.action_delegate)
         self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
@@ -110,16 +119,14 @@ class HousingPropsManager(QtWidgets.QDialog):
     def load_categories(self):
         """Načte seznam kategorií pro filtr z tabulky aprts_housing_category."""
         try:
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT id, name FROM aprts_housing_category ORDER BY name")
-            categories = cursor.fetchall()
+            categories = ReferenceData.instance().rows(self.connection, 'housing_categories')
 
             # Zablokujeme signály během aktualizace
             self.category_combo.blockSignals(True)
             self.category_combo.clear()
             self.category_combo.addItem("Všechny kategorie", None)
-            for cat in categories:
-                self.category_combo.addItem(cat['name'], cat['id'])
+            for cat_id, cat_name in categories:
+                self.category_combo.addItem(cat_name, cat_id)
             self.category_combo.blockSignals(False)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při načítání kategorií: {e}")
@@ -239,8 +246,7 @@ class HousingPropsManager(QtWidgets.QDialog):
                 self.table.setItem(row_number, 7, price_item)
 
                 # Akce
-                action_widget = self.create_action_buttons(id_value, item_value)
-                self.table.setCellWidget(row_number, 8, action_widget)
+                self.table.setItem(row_number, 8, action_item((id_value, item_value)))
 
             # Jednorázové přizpůsobení sloupců
             self.table.resizeColumnsToContents()
@@ -252,29 +258,6 @@ class HousingPropsManager(QtWidgets.QDialog):
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při načítání dat: {e}")
 
-    def create_action_buttons(self, prop_id, item_name):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, pid=prop_id: self.edit_housing_prop_by_id(pid))
-        h_layout.addWidget(edit_button)
-
-        edit_item_button = QtWidgets.QPushButton("Upravit Item")
-        edit_item_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        edit_item_button.clicked.connect(lambda _, name=item_name: self.edit_item_by_name(name))
-        h_layout.addWidget(edit_item_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, pid=prop_id: self.delete_housing_prop_by_id(pid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def edit_item_by_name(self, item_name):
         if not item_name:
             QtWidgets.QMessageBox.warning(self, "Chyba", "Tento záznam nemá přiřazený item.")
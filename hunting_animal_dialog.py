@@ -8,6 +8,8 @@ from mysql.connector import Error
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from item_manager import ItemSelectionDialog  # Předpokládáme, že existuje a funguje.
+from image_utils import load_item_pixmap, prefetch_item_images
+from image_store import DEFAULT_CACHE_DIR
 
 class HuntingAnimalDialog(QtWidgets.QDialog):
     def __init__(self, connection, animal_id=None):
@@ -17,7 +19,7 @@ class HuntingAnimalDialog(QtWidgets.QDialog):
         self.setWindowTitle("Zvíře - Hunting")
         self.setGeometry(100, 100, 1000, 600)
 
-        self.cache_dir = 'cache'
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
@@ -285,6 +287,7 @@ class HuntingAnimalDialog(QtWidgets.QDialog):
             for c in range(self.grid_cols):
                 self.loot_table.setItem(r, c, None)
 
+        prefetch_item_images([entry.get("name") for entry in self.current_item_data], self.connection)
         index = 0
         for entry in self.current_item_data:
             if index >= self.grid_rows * self.grid_cols:
@@ -444,29 +447,4 @@ class HuntingAnimalDialog(QtWidgets.QDialog):
         return self.load_item_image(item_name)
 
     def load_item_image(self, item_name):
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-
-        if os.path.exists(cache_file_path):
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            # Stáhneme obrázek z DB a URL pokud je dostupný
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                pixmap = None
-        return pixmap
\ No newline at end of file
+        return load_item_pixmap(item_name, self.cache_dir, self.connection)
@@ -8,6 +8,7 @@ from mysql.connector import Error
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from hunting_animal_dialog import HuntingAnimalDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 class HuntingAnimalManager(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -39,6 +40,10 @@ class HuntingAnimalManager(QtWidgets.QDialog):
         self.table.setColumnCount(6)  # Změna z 4 na 6
         self.table.setHorizontalHeaderLabels(['ID', 'Name', 'Label', 'Level', 'XP', 'Akce'])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_item_by_id, copy=self.copy_item_by_id, delete=self.delete_item_by_id), self.table)
+        self.table.setItemDelegateForColumn(5, self.action_delegate)
         self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
@@ -116,42 +121,12 @@ class HuntingAnimalManager(QtWidgets.QDialog):
             self.table.setItem(row_number, 4, xp_item)
 
             # Akce
-            action_widget = self.create_action_buttons(a['id'])
-            self.table.setCellWidget(row_number, 5, action_widget)
+            self.table.setItem(row_number, 5, action_item(a['id']))
 
             self.table.setRowHeight(row_number, 40)  # Zvýšení výšky řádku pro lepší vzhled
 
         self.table.resizeColumnsToContents()
 
-    def create_action_buttons(self, animal_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setToolTip("Upravit zvíře")
-        edit_button.clicked.connect(lambda _, id=animal_id: self.edit_item_by_id(id))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        h_layout.addWidget(edit_button)
-
-        # Kopírovat
-        copy_button = QtWidgets.QPushButton("Kopírovat")
-        copy_button.setToolTip("Kopírovat zvíře")
-        copy_button.clicked.connect(lambda _, id=animal_id: self.copy_item_by_id(id))
-        copy_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        h_layout.addWidget(copy_button)
-
-        # Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setToolTip("Smazat zvíře")
-        delete_button.clicked.connect(lambda _, id=animal_id: self.delete_item_by_id(id))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 0)
         if id_item:
@@ -236,7 +211,11 @@ class HuntingAnimalManager(QtWidgets.QDialog):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_hunting_animals WHERE id = %s", (animal_id,))
-            self.connection.commit()
-            self.load_items()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_hunting_animals WHERE id = %s", (animal_id,))
+                self.connection.commit()
+                self.load_items()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
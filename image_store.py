@@ -0,0 +1,386 @@
+# image_store.py
+# Sdílená logika obrázků položek bez závislosti na Qt (používá ji editor i exporter).
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+from downloader import DownloadError
+
+IN_QUERY_CHUNK = 1000  # Maximální počet hodnot v jednom WHERE ... IN (...)
+NEGATIVE_TTL = 3600  # Jak dlouho si pamatujeme item bez obrázku nebo HTTP 404
+TRANSIENT_NEGATIVE_TTL = 300  # Kratší doba pro timeouty a chyby serveru
+
+
+def chunked(values, size=IN_QUERY_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class NegativeImageCache:
+    """Pamatuje si itemy bez obrázku a obrázky, které nešly stáhnout.
+
+    Díky tomu se neúspěšný SQL dotaz ani HTTP požadavek neopakuje
+    při každém obnovení tabulky, ale až po vypršení TTL nebo ručním
+    "zkusit znovu".
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # (druh, klíč) -> (důvod, čas vypršení)
+
+    def add(self, kind, key, reason, ttl=NEGATIVE_TTL):
+        with self.lock:
+            self.entries[(kind, key)] = (reason, time.monotonic() + ttl)
+
+    def add_download_error(self, image_file, error):
+        if error.status is None:
+            self.add('image', image_file, 'timeout', TRANSIENT_NEGATIVE_TTL)
+        elif error.status >= 500:
+            self.add('image', image_file, f"HTTP {error.status}", TRANSIENT_NEGATIVE_TTL)
+        else:
+            self.add('image', image_file, f"HTTP {error.status}")
+
+    def get(self, kind, key):
+        """Vrátí důvod, proč je záznam rozbitý, nebo None."""
+        with self.lock:
+            entry = self.entries.get((kind, key))
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.entries[(kind, key)]
+                return None
+            return entry[0]
+
+    def count(self):
+        now = time.monotonic()
+        with self.lock:
+            return sum(1 for _, expires in self.entries.values() if expires >= now)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ImageNameResolver:
+    """Paměť item -> název obrázku, plněná hromadnými dotazy.
+
+    Místo jednoho SELECTu na řádek se pro celou zobrazovanou stránku
+    pošle jediný dotaz `WHERE item IN (...)`.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.images = {}  # item -> název obrázku, None pokud item obrázek nemá
+
+    def is_known(self, item_code):
+        if item_code not in self.images:
+            return False
+        # "Bez obrázku" platí jen po dobu TTL v negativní cache
+        return (self.images[item_code] is not None
+                or NegativeImageCache.instance().get('item', item_code) is not None)
+
+    def prefetch(self, connection, item_codes):
+        """Jedním dotazem (po dávkách) dotáhne obrázky pro všechny neznámé itemy."""
+        missing = {code for code in item_codes if code and not self.is_known(code)}
+        if not missing:
+            return
+        cursor = connection.cursor(dictionary=True, buffered=True)
+        try:
+            for chunk in chunked(missing):
+                placeholder = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"SELECT item, image FROM items WHERE item IN ({placeholder})", tuple(chunk))
+                for row in cursor.fetchall():
+                    self.images[row['item']] = row['image'] or None
+        finally:
+            cursor.close()
+        # Itemy bez obrázku (nebo úplně chybějící v DB) si také zapamatujeme
+        negative_cache = NegativeImageCache.instance()
+        for code in missing:
+            self.images.setdefault(code, None)
+            if self.images[code] is None:
+                print(f"No image found for item {code}")
+                negative_cache.add('item', code, 'no_image')
+
+    def remember(self, images):
+        """Převezme názvy obrázků {item: obrázek} načtené jiným dotazem na tabulku items."""
+        negative_cache = NegativeImageCache.instance()
+        for code, image in images.items():
+            self.images[code] = image or None
+            if not image:
+                negative_cache.add('item', code, 'no_image')
+
+    def resolve(self, connection, item_code):
+        if not self.is_known(item_code):
+            self.prefetch(connection, [item_code])
+        return self.images.get(item_code)
+
+    def invalidate(self, item_code=None):
+        """Zapomene název obrázku pro item (nebo pro všechny itemy)."""
+        if item_code is None:
+            self.images.clear()
+        else:
+            self.images.pop(item_code, None)
+
+
+# Vedle skriptů, ne v pracovním adresáři: editor i exporter tak sdílejí jednu cache odkudkoli
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+MANIFEST_FILE = 'manifest.json'
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024  # Limit velikosti cache na disku
+DEFAULT_MAX_AGE = 90 * 24 * 3600  # Obrázky nepoužité déle než 90 dní se mažou
+DEFAULT_REVALIDATE_AFTER = 7 * 24 * 3600  # Po týdnu se obrázek ověří podmíněným dotazem
+MANIFEST_SAVE_INTERVAL = 5.0  # Manifest se při stahování ukládá nejčastěji jednou za 5 s
+# Verze manifestu; cache bez manifestu nebo se starší verzí ještě může obsahovat soubory staré cache
+MANIFEST_VERSION = 2
+
+
+class DiskImageCache:
+    """Obsahově adresovaná cache obrázků na disku.
+
+    Soubory jsou uložené pod SHA-256 svého obsahu v `objects/`, manifest
+    mapuje item -> název obrázku -> hash, ETag a čas stažení. Změna
+    `items.image` tak vede na nový soubor a stejné obrázky se ukládají jen jednou.
+    """
+    _instances = {}
+
+    @classmethod
+    def instance(cls, cache_dir=DEFAULT_CACHE_DIR):
+        key = os.path.abspath(cache_dir)
+        if key not in cls._instances:
+            cls._instances[key] = cls(cache_dir)
+        return cls._instances[key]
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_CACHE_BYTES,
+                 max_age=DEFAULT_MAX_AGE, revalidate_after=DEFAULT_REVALIDATE_AFTER):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.revalidate_after = revalidate_after
+        self.lock = threading.RLock()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.last_save = 0.0
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.version = 1
+        self.items, self.images = self.load_manifest()
+        atexit.register(self.save)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            self.version = manifest.get('version', 1)
+            return manifest.get('items', {}), manifest.get('images', {})
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError) as e:
+            print(f"Chyba při načítání manifestu cache, začínám s prázdnou: {e}")
+            return {}, {}
+
+    def save(self, force=True):
+        """Uloží manifest, pokud se změnil. Chyba zápisu se jen vypíše, změny zůstanou na příště."""
+        # Zápisy jdou po jednom a v pořadí snímků, starší manifest tak nepřepíše novější
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                if not force and time.monotonic() - self.last_save < MANIFEST_SAVE_INTERVAL:
+                    return
+                manifest = {'version': self.version, 'items': dict(self.items),
+                            'images': {k: dict(v) for k, v in self.images.items()}}
+                self.dirty = False
+                self.last_save = time.monotonic()
+            # Vlastní dočasný soubor: do stejné cache může zapisovat i jiný proces (cache_warmer)
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+                os.replace(tmp_path, self.manifest_path)
+            except OSError as e:
+                print(f"Chyba při ukládání manifestu cache: {e}")
+                with self.lock:
+                    self.dirty = True
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def object_path(self, content_hash):
+        return os.path.join(self.objects_dir, f"{content_hash}.png")
+
+    def path_for_image(self, image_name):
+        """Cesta k uloženému obrázku, nebo None pokud ho cache nemá. Počítá se jako přístup."""
+        path = self.known_path(image_name)
+        if path is None or not os.path.exists(path):
+            return None
+        self.touch(image_name)
+        return path
+
+    def known_path(self, image_name):
+        """Cesta podle manifestu, bez kontroly disku a bez záznamu přístupu (pro překreslování tabulek)."""
+        with self.lock:
+            entry = self.images.get(image_name)
+            return self.object_path(entry['hash']) if entry else None
+
+    def touch(self, image_name):
+        """Zaznamená přístup k obrázku; volá se jen při skutečném načtení souboru."""
+        with self.lock:
+            entry = self.images.get(image_name)
+            if entry:
+                entry['accessed_at'] = time.time()
+                # Čas přístupu rozhoduje o mazání v evict(), musí se dostat do manifestu
+                self.dirty = True
+
+    def path_for_item(self, item_name):
+        """Cesta k obrázku podle posledního známého názvu obrázku itemu (bez dotazu do DB)."""
+        with self.lock:
+            image_name = self.items.get(item_name)
+        return self.path_for_image(image_name) if image_name else None
+
+    def needs_revalidation(self, image_name):
+        with self.lock:
+            entry = self.images.get(image_name)
+            return bool(entry) and time.time() - entry.get('fetched_at', 0) > self.revalidate_after
+
+    def store(self, image_name, data, etag=None, last_modified=None):
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.object_path(content_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self.lock:
+            self.images[image_name] = {
+                'hash': content_hash,
+                'etag': etag,
+                'last_modified': last_modified,
+                'size': len(data),
+                'fetched_at': now,
+                'accessed_at': now,
+            }
+            self.dirty = True
+        self.save(force=False)
+        return path
+
+    def fetch(self, image_name, downloader, item_name=None, revalidate=None):
+        """Vrátí cestu k obrázku; chybějící stáhne, zastaralý ověří podmíněným dotazem.
+
+        Chyby stahování (DownloadError) propadají volajícímu.
+        """
+        if item_name:
+            with self.lock:
+                if self.items.get(item_name) != image_name:
+                    self.items[item_name] = image_name
+                    self.dirty = True
+
+        path = self.path_for_image(image_name)
+        if revalidate is None:
+            revalidate = self.needs_revalidation(image_name)
+        if path and not revalidate:
+            return path
+
+        negative_cache = NegativeImageCache.instance()
+        if path:
+            if negative_cache.get('image', image_name):
+                return path
+            with self.lock:
+                entry = dict(self.images[image_name])
+            try:
+                response = downloader.fetch_if_modified(image_name, entry.get('etag'), entry.get('last_modified'))
+            except DownloadError as e:
+                # Ověření se nepovedlo, zatím vrátíme to, co máme
+                print(f"Revalidation of {image_name} failed: {e}")
+                negative_cache.add_download_error(image_name, e)
+                return path
+            if response.status == 304:
+                with self.lock:
+                    self.images[image_name]['fetched_at'] = time.time()
+                    self.dirty = True
+                self.save(force=False)
+                return path
+        else:
+            reason = negative_cache.get('image', image_name)
+            if reason:
+                raise DownloadError(f"{image_name}: {reason} (negativní cache)")
+            try:
+                response = downloader.request(image_name)
+            except DownloadError as e:
+                negative_cache.add_download_error(image_name, e)
+                raise
+        return self.store(image_name, response.data, response.etag, response.last_modified)
+
+    def forget_item(self, item_name):
+        with self.lock:
+            if self.items.pop(item_name, None) is not None:
+                self.dirty = True
+
+    def evict(self):
+        """Smaže dlouho nepoužité obrázky a pak nejstarší, dokud cache nesplní limit velikosti."""
+        now = time.time()
+        with self.lock:
+            for image_name, entry in list(self.images.items()):
+                if now - entry.get('accessed_at', 0) > self.max_age:
+                    del self.images[image_name]
+            total = sum(entry['size'] for entry in self.images.values())
+            for image_name, entry in sorted(self.images.items(), key=lambda kv: kv[1].get('accessed_at', 0)):
+                if total <= self.max_bytes:
+                    break
+                del self.images[image_name]
+                total -= entry['size']
+            known = set(self.images)
+            self.items = {item: name for item, name in self.items.items() if name in known}
+            referenced = {entry['hash'] for entry in self.images.values()}
+            self.dirty = True
+
+        removed = 0
+        for file_name in os.listdir(self.objects_dir):
+            if file_name.endswith('.tmp'):
+                continue  # Právě se zapisuje
+            # Soubory (i náhledy) bez odkazu z manifestu smažeme
+            content_hash = file_name.split('.', 1)[0].split('@', 1)[0]
+            if content_hash not in referenced:
+                try:
+                    os.remove(os.path.join(self.objects_dir, file_name))
+                    removed += 1
+                except OSError as e:
+                    print(f"Nelze smazat {file_name} z cache: {e}")
+        if self.version < MANIFEST_VERSION:
+            # Soubory staré cache stačí smazat jednou, při přechodu na manifest
+            removed += self.remove_legacy_files()
+            with self.lock:
+                self.version = MANIFEST_VERSION
+        self.save()
+        return removed
+
+    def remove_legacy_files(self):
+        """Smaže soubory staré cache pojmenované podle itemu ({item}.png, {item}@64.png)."""
+        removed = 0
+        for file_name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, file_name)
+            if file_name.endswith('.png') and os.path.isfile(path):
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    print(f"Nelze smazat {file_name} z cache: {e}")
+        return removed
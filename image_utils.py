@@ -1,45 +1,319 @@
 import os
-from PyQt5 import QtWidgets, QtGui, QtCore
-from urllib.request import urlopen, Request
+from collections import OrderedDict
+from PyQt5 import QtWidgets, QtGui, QtCore, sip
+from image_store import ImageNameResolver, DiskImageCache, NegativeImageCache
+from downloader import HttpDownloader, DownloadError
 
-def get_item_image_label(item_name, cache_dir, connection):
-        # Vytvoříme název souboru pro cache
-        cache_file_path = os.path.join(cache_dir, f"{item_name}.png")
+MAX_IMAGE_WORKERS = 4  # Maximální počet souběžných stahování
+DEFAULT_PIXMAP_CACHE_BYTES = 64 * 1024 * 1024  # Paměťový limit sdílené cache obrázků
+THUMBNAIL_SIZES = (64, 128)  # Náhledy pro tabulky (128px pro hi-DPI displeje)
+
+
+class PixmapCache:
+    """Sdílená LRU cache dekódovaných obrázků s limitem velikosti v bajtech.
+
+    Klíčem je cesta k souboru, takže opakované otevření dialogu
+    nesahá na disk ani znovu nedekóduje PNG.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_bytes=DEFAULT_PIXMAP_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # klíč -> (pixmap, velikost v bajtech)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def pixmap_cost(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def set_budget(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, pixmap):
+        if not pixmap or pixmap.isNull():
+            return
+        self.remove(key)
+        cost = self.pixmap_cost(pixmap)
+        self.entries[key] = (pixmap, cost)
+        self.total_bytes += cost
+        self.evict()
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def evict(self):
+        # Nejdéle nepoužité obrázky jdou pryč jako první, poslední vložený necháme vždy
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, cost) = self.entries.popitem(last=False)
+            self.total_bytes -= cost
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+    def __contains__(self, key):
+        # Bez započtení zásahu a bez posunu v LRU
+        return key in self.entries
+
+    def load(self, path):
+        """Vrátí pixmapu pro soubor z cache, případně ji načte z disku."""
+        pixmap = self.get(path)
+        if pixmap is None and os.path.exists(path):
+            pixmap = QtGui.QPixmap(path)
+            if pixmap.isNull():
+                return None
+            self.put(path, pixmap)
+        return pixmap
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+def thumbnail_path(cache_file_path, size):
+    """Cesta k předzmenšené variantě obrázku uložené vedle originálu."""
+    base, ext = os.path.splitext(cache_file_path)
+    return f"{base}@{size}{ext}"
+
+
+def thumbnail_size():
+    """Velikost náhledu pro 64px buňku podle hustoty pixelů obrazovky."""
+    app = QtWidgets.QApplication.instance()
+    if app is not None and app.devicePixelRatio() > 1:
+        return THUMBNAIL_SIZES[-1]
+    return THUMBNAIL_SIZES[0]
+
+
+def make_thumbnails(cache_file_path):
+    """Vytvoří náhledy všech velikostí z originálu na disku.
+
+    Pracuje jen s QImage, takže ji lze volat i z worker threadu.
+    Vrací slovník velikost -> QImage, prázdný pokud originál nejde načíst.
+    """
+    image = QtGui.QImage(cache_file_path)
+    if image.isNull():
+        return {}
+    thumbnails = {}
+    for size in THUMBNAIL_SIZES:
+        thumb = image.scaled(size, size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        thumb.save(thumbnail_path(cache_file_path, size), 'PNG')
+        thumbnails[size] = thumb
+    return thumbnails
+
+
+class _ImageTaskSignals(QtCore.QObject):
+    # (klíč požadavku, QImage náhledu nebo None při chybě)
+    finished = QtCore.pyqtSignal(str, object)
+
+
+class _ImageTask(QtCore.QRunnable):
+    """Na pozadí zajistí obrázek v cache na disku a připraví z něj náhled."""
+
+    def __init__(self, item_name, image_file, cache_dir, size, revalidate, signals):
+        super().__init__()
+        self.item_name = item_name
+        self.image_file = image_file
+        self.cache_dir = cache_dir
+        self.size = size
+        self.revalidate = revalidate
+        self.signals = signals
+
+    def run(self):
+        thumb = None
+        try:
+            path = DiskImageCache.instance(self.cache_dir).fetch(
+                self.image_file, HttpDownloader.instance(), self.item_name, self.revalidate)
+            thumb = QtGui.QImage(thumbnail_path(path, self.size))
+            if thumb.isNull():
+                thumb = make_thumbnails(path).get(self.size)
+            if thumb is None:
+                # Soubor se stáhl, ale nejde dekódovat; bez záznamu by ho tabulka
+                # po každém překreslení zařadila ke stažení znovu
+                print(f"Error decoding image {self.image_file} for {self.item_name}")
+                NegativeImageCache.instance().add('image', self.image_file, 'decode')
+        except DownloadError as e:
+            # Chybu stažení už zapsal DiskImageCache.fetch do negativní cache
+            print(f"Error loading image for {self.item_name}: {e}")
+        except Exception as e:
+            print(f"Error loading image for {self.item_name}: {e}")
+            NegativeImageCache.instance().add('image', self.image_file, 'error')
+        self.signals.finished.emit(request_key(self.cache_dir, self.image_file, self.size), thumb)
+
+
+def request_key(cache_dir, image_file, size):
+    return f"{cache_dir}|{image_file}|{size}"
 
-        # Zkontrolujeme, zda soubor existuje v cache
-        if os.path.exists(cache_file_path):
-            # Načteme obrázek z cache
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            # Pokud není v cache, stáhneme obrázek a uložíme ho
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    # Uložíme data do souboru
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                print(f"No image found for item {item_name}")
-                pixmap = None
 
+class ImageService(QtCore.QObject):
+    """Sdílená služba pro načítání obrázků položek na pozadí.
+
+    Labely dostanou okamžitě placeholder a náhled se do nich doplní,
+    jakmile doběhne stahování a zmenšení ve worker threadu.
+    """
+    _instance = None
+    # Vyslán po každém dokončeném požadavku (např. pro obnovení počítadla rozbitých obrázků)
+    task_finished = QtCore.pyqtSignal()
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_workers=MAX_IMAGE_WORKERS):
+        super().__init__()
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(max_workers)
+        self.signals = _ImageTaskSignals()
+        self.signals.finished.connect(self.on_task_finished)
+        # klíč požadavku -> seznam labelů, které na obrázek čekají
+        self.pending = {}
+
+    def request(self, item_name, image_file, cache_dir, label, size, revalidate=False):
+        """Zařadí přípravu náhledu do fronty a po dokončení ho vloží do labelu.
+
+        Bez labelu (např. pro model tabulky) stačí počkat na signál task_finished.
+        """
+        key = request_key(cache_dir, image_file, size)
+        if key in self.pending:
+            # Obrázek se už připravuje, jen si zapamatujeme další label
+            if label is not None:
+                self.pending[key].append(label)
+            return
+
+        self.pending[key] = [label] if label is not None else []
+        task = _ImageTask(item_name, image_file, cache_dir, size, revalidate, self.signals)
+        self.pool.start(task)
+
+    def on_task_finished(self, key, image):
+        labels = self.pending.pop(key, [])
+        pixmap = None
+        if image is not None and not image.isNull():
+            pixmap = QtGui.QPixmap.fromImage(image)
+        for label in labels:
+            # Tabulka mohla mezitím řádek zahodit
+            if not sip.isdeleted(label):
+                set_label_pixmap(label, pixmap)
+        self.task_finished.emit()
+
+
+def fit_thumbnail(pixmap):
+    """Náhled 128px na hi-DPI displeji vykreslíme do 64px buňky bez přeškálování."""
+    longest = max(pixmap.width(), pixmap.height())
+    if longest > THUMBNAIL_SIZES[0]:
+        pixmap.setDevicePixelRatio(longest / THUMBNAIL_SIZES[0])
+    return pixmap
+
+
+def set_label_pixmap(label, pixmap):
+    if pixmap:
+        label.setPixmap(fit_thumbnail(pixmap))
+    else:
+        label.setText('No Image')
+
+
+def get_item_thumbnail(item_name, cache_dir, connection, label=None):
+    """Vrátí (náhled, placeholder) pro 64px buňku tabulky.
+
+    Pokud náhled v cache není, vrátí (None, '...') a připraví ho na pozadí;
+    hotový se doplní do labelu, případně ohlásí signálem ImageService.task_finished.
+    Item bez obrázku nebo s nedávno rozbitým obrázkem vrací (None, 'No Image').
+    """
+    image_file = ImageNameResolver.instance().resolve(connection, item_name) if item_name else None
+    if not image_file:
+        return None, 'No Image'
+
+    # Tabulky kreslí z předzmenšeného náhledu uloženého vedle originálu
+    size = thumbnail_size()
+    disk_cache = DiskImageCache.instance(cache_dir)
+    pixmap_cache = PixmapCache.instance()
+    # Náhled v paměti se vrací bez přístupu na disk; čas přístupu se zapíše jen při načtení souboru
+    path = disk_cache.known_path(image_file)
+    pixmap = None
+    if path:
+        thumb_path = thumbnail_path(path, size)
+        in_memory = thumb_path in pixmap_cache
+        pixmap = pixmap_cache.load(thumb_path)
+        if pixmap is not None and not in_memory:
+            disk_cache.touch(image_file)
+    recently_failed = NegativeImageCache.instance().get('image', image_file) is not None
+    if pixmap is not None:
+        if not recently_failed and disk_cache.needs_revalidation(image_file):
+            # Starší obrázek zobrazíme hned a na pozadí ověříme, zda se na serveru nezměnil
+            ImageService.instance().request(item_name, image_file, cache_dir, label, size, revalidate=True)
+        return fit_thumbnail(pixmap), None
+    if recently_failed:
+        # Stažení nedávno selhalo, do vypršení TTL to nezkoušíme znovu
+        return None, 'No Image'
+    # Náhled zatím neexistuje, připravíme ho na pozadí a zobrazíme placeholder
+    ImageService.instance().request(item_name, image_file, cache_dir, label, size)
+    return None, '...'
+
+
+def get_item_image_label(item_name, cache_dir, connection):
         label = QtWidgets.QLabel()
-        if pixmap:
-            label.setPixmap(pixmap)
-        else:
-            label.setText('No Image')
         label.setFixedSize(64, 64)
-        label.setScaledContents(True)
         label.setAlignment(QtCore.Qt.AlignCenter)
-        return label
\ No newline at end of file
+
+        pixmap, placeholder = get_item_thumbnail(item_name, cache_dir, connection, label)
+        if pixmap is not None:
+            label.setPixmap(pixmap)
+        else:
+            label.setText(placeholder)
+        return label
+
+
+def load_image_file_pixmap(image_file, cache_dir, item_name=None):
+    """Synchronně vrátí pixmapu pro název obrázku, chybějící soubor stáhne do cache."""
+    try:
+        path = DiskImageCache.instance(cache_dir).fetch(image_file, HttpDownloader.instance(), item_name)
+    except Exception as e:
+        print(f"Error loading image {image_file}: {e}")
+        return None
+    return PixmapCache.instance().load(path)
+
+
+def load_item_pixmap(item_name, cache_dir, connection):
+    """Synchronně vrátí pixmapu položky (pro dialogy s několika málo obrázky)."""
+    image_file = ImageNameResolver.instance().resolve(connection, item_name)
+    if not image_file:
+        return None
+    return load_image_file_pixmap(image_file, cache_dir, item_name)
+
+
+def prefetch_item_images(item_codes, connection):
+    """Jedním dotazem dohledá názvy obrázků pro itemy, které ještě nezná."""
+    ImageNameResolver.instance().prefetch(connection, item_codes)
+
+
+def retry_broken_images():
+    """Zapomene všechny neúspěšné pokusy, takže se při dalším vykreslení zkusí znovu."""
+    NegativeImageCache.instance().clear()
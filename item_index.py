@@ -0,0 +1,250 @@
+# item_index.py
+# Index položek pro rychlé hledání v ItemSelectionDialog, s řazením podle kvality shody (bez závislosti na Qt).
+#
+# Benchmark:  python item_index.py [--items 50000]
+import argparse
+import random
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain, compress, filterfalse, repeat
+from operator import contains
+
+from recipe_index import FIELD_SEPARATOR, NGRAM, ngrams
+
+PREFIX_END = "\U0010ffff"  # Větší než jakýkoli znak, ohraničuje rozsah klíčů s prefixem
+SUGGESTION_LIMIT = 20  # Kolik podobných položek nabídnout, když přesné hledání skoro nic nenajde
+FUZZY_CANDIDATES = 200  # Kolik kandidátů s nejvíc společnými trigramy ověřit editační vzdáleností
+COMMON_GRAM_SHARE = 20  # Trigram v více než 1/20 položek se pro hledání kandidátů nepočítá
+
+
+def max_typos(query):
+    """Kolik překlepů v dotazu tolerujeme: krátké dotazy žádný, pak 1, od 9 znaků 2."""
+    if len(query) < 4:
+        return 0
+    return 1 if len(query) < 9 else 2
+
+
+def substring_distance(query, text, limit):
+    """Nejmenší editační vzdálenost `query` od některého úseku `text`, None nad `limit`.
+
+    Levenshtein se začátkem i koncem shody kdekoli v textu, počítaný
+    bitově po sloupcích (Myers), takže na znak textu stačí pár operací s int.
+    """
+    length = len(query)
+    if not length:
+        return 0
+    masks = {}
+    for bit, char in enumerate(query):
+        masks[char] = masks.get(char, 0) | (1 << bit)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    plus, minus = full, 0  # Bity kladných / záporných rozdílů mezi řádky sloupce
+    score = best = length
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | minus
+        horizontal = (((equal & plus) + plus) ^ plus) | equal
+        horizontal_plus = minus | (~(horizontal | plus) & full)
+        horizontal_minus = plus & horizontal
+        if horizontal_plus & last:
+            score += 1
+        elif horizontal_minus & last:
+            score -= 1
+        if score < best:
+            best = score
+        # Bez nastavení nejnižšího bitu: shoda smí začít na kterékoli pozici textu
+        horizontal_plus = (horizontal_plus << 1) & full
+        horizontal_minus = (horizontal_minus << 1) & full
+        plus = horizontal_minus | (~(vertical | horizontal_plus) & full)
+        minus = horizontal_plus & vertical
+    return best if best <= limit else None
+
+
+class ItemSearchIndex:
+    """Index položek (item a label) pro výběr položky při psaní.
+
+    Prefixy hledá binárním půlením v seřazeném seznamu klíčů (item i label
+    malými písmeny), podřetězce přes trigramový index jako RecipeSearchIndex.
+    Výsledek je seřazený: nejdřív přesná shoda, pak shoda na začátku,
+    pak kdekoli uvnitř; v každé skupině podle labelu. Položky jsou v indexu
+    už seřazené podle labelu, takže pořadí ve skupině je pořadí čísel řádků.
+
+    Pro dotazy s překlepem nabízí suggest() podobné položky: kandidáty
+    s nejvíc společnými trigramy ověří omezenou editační vzdáleností.
+    """
+    _shared = None
+
+    @classmethod
+    def for_items(cls, items):
+        """Index pro slovník {item: ItemRecord}; dokud se slovník nezmění, staví se jen jednou."""
+        index = cls._shared
+        if index is None or index.source is not items:
+            index = cls._shared = cls()
+            index.build(items)
+        return index
+
+    def __init__(self):
+        self.source = None
+        self.records = []
+        self.haystacks = []
+        self.postings = {}
+        self.prefix_keys = []  # seřazené klíče (item i label malými písmeny)
+        self.prefix_rows = array('I')  # řádek ke každému klíči v prefix_keys
+        self.last_query = None
+        self.last_rows = None
+
+    def build(self, items):
+        self.source = items
+        self.records = sorted(items.values(), key=lambda record: ((record.label or "").lower(),
+                                                                 (record.item or "").lower()))
+        codes = [(record.item or "").lower() for record in self.records]
+        labels = [(record.label or "").lower() for record in self.records]
+        self.haystacks = [code + FIELD_SEPARATOR + label for code, label in zip(codes, labels)]
+
+        postings = defaultdict(list)
+        for row, haystack in enumerate(self.haystacks):
+            for gram in ngrams(haystack):
+                postings[gram].append(row)
+        self.postings = {gram: array('I', rows) for gram, rows in postings.items()}
+
+        keys = sorted(list(zip(codes, range(len(codes)))) + list(zip(labels, range(len(labels)))))
+        self.prefix_keys = [key for key, row in keys]
+        self.prefix_rows = array('I', (row for key, row in keys))
+        self.last_query = None
+        self.last_rows = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def prefix_range(self, query):
+        start = bisect_left(self.prefix_keys, query)
+        end = bisect_left(self.prefix_keys, query + PREFIX_END, start)
+        return start, end
+
+    def substring_rows(self, query):
+        """Vzestupně seřazené řádky, jejichž item nebo label obsahuje `query`."""
+        candidates = range(len(self.haystacks))
+        if self.last_query and self.last_query in query:
+            # Dotaz se jen prodloužil, výsledek je podmnožinou předchozího
+            candidates = self.last_rows
+        if len(query) >= NGRAM:
+            rarest = min((self.postings.get(gram, ()) for gram in ngrams(query)), key=len)
+            if len(rarest) < len(candidates):
+                candidates = rarest
+        texts = self.haystacks if isinstance(candidates, range) else map(self.haystacks.__getitem__, candidates)
+        rows = list(compress(candidates, map(contains, texts, repeat(query))))
+        self.last_query = query
+        self.last_rows = rows
+        return rows
+
+    def search(self, text):
+        """Seznam řádků (indexů do self.records) odpovídajících `text`, od nejlepší shody."""
+        query = text.strip().lower()
+        if not query:
+            return list(range(len(self.records)))
+        start, end = self.prefix_range(query)
+        exact = set()
+        for key_index in range(start, end):
+            if self.prefix_keys[key_index] != query:
+                break
+            exact.add(self.prefix_rows[key_index])
+        prefix = set(self.prefix_rows[start:end])
+        substring = self.substring_rows(query)
+        return (sorted(exact)
+                + sorted(prefix - exact)
+                + list(filterfalse(prefix.__contains__, substring)))
+
+    def suggest(self, text, limit=SUGGESTION_LIMIT, exclude=()):
+        """Až `limit` řádků podobných `text` (s překlepy), od nejmenšího počtu úprav."""
+        query = text.strip().lower()
+        typos = max_typos(query)
+        if not typos:
+            return []
+        postings = [self.postings.get(gram, ()) for gram in ngrams(query)]
+        # Trigramy, které má velká část položek, kandidáty skoro nezúží a jejich počítání je drahé;
+        # zkusíme nejdřív bez nich a se všemi až tehdy, když to nic nenajde
+        common = len(self.records) // COMMON_GRAM_SHARE
+        rare = [rows for rows in postings if len(rows) <= common]
+        attempts = [rare, postings] if rare and len(rare) < len(postings) else [postings]
+        for attempt in attempts:
+            found = []
+            for shared, shorter, row in self.fuzzy_candidates(attempt, typos):
+                if row in exclude:
+                    continue
+                distance = self.distance(query, row, typos)
+                if distance is not None:
+                    found.append((distance, -shared, -shorter, row))
+                    # Kandidáti jdou od nejvíc společných trigramů, dál by přibyly spíš horší shody
+                    if len(found) >= limit:
+                        break
+            if found:
+                found.sort()
+                return [row for distance, shared, length, row in found]
+        return []
+
+    def fuzzy_candidates(self, postings, typos):
+        """[(počet společných trigramů, -délka textu, řádek)] od největší shody (při shodě kratší položky).
+
+        Vrací jen řádky, které vůbec mohou vyhovět.
+        """
+        counts = Counter(chain.from_iterable(postings))
+        # Každá úprava zničí nejvýš NGRAM trigramů dotazu, řádky s menší shodou vyhovět nemohou
+        needed = max(1, len(postings) - NGRAM * typos)
+        haystacks = self.haystacks
+        candidates = [(shared, -len(haystacks[row]), row) for row, shared in counts.items() if shared >= needed]
+        candidates.sort(reverse=True)
+        return candidates[:FUZZY_CANDIDATES]
+
+    def distance(self, query, row, typos):
+        """Počet úprav dotazu ke kódu nebo labelu položky (menší z obou), None nad `typos`."""
+        code, _, label = self.haystacks[row].partition(FIELD_SEPARATOR)
+        distance = substring_distance(query, code, typos)
+        if distance == 0:
+            return 0
+        label_distance = substring_distance(query, label, typos if distance is None else distance - 1)
+        return distance if label_distance is None else label_distance
+
+if __name__ == '__main__':
+    from records import ItemRecord
+
+    parser = argparse.ArgumentParser(description="Změří rychlost hledání v indexu položek.")
+    parser.add_argument('--items', type=int, default=50000, help="počet generovaných položek")
+    args = parser.parse_args()
+
+    words = ["wood", "iron", "coffee", "bread", "meat", "herb", "leather", "nail", "water", "salt"]
+    items = {}
+    for i in range(args.items):
+        code = f"{random.choice(words)}_{random.choice(words)}_{i}"
+        items[code] = ItemRecord(code, f"{random.choice(words).title()} {random.choice(words)} {i}")
+    items["coffee"] = ItemRecord("coffee", "Káva")
+    items["consumable_coffee"] = ItemRecord("consumable_coffee", "Hrnek kávy")
+
+    started = time.perf_counter()
+    index = ItemSearchIndex.for_items(items)
+    print(f"Index pro {len(index)} položek postaven za {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for query in ["c", "co", "cof", "coff", "coffee", "coffee_", "káva", "12345", "nothing here", ""]:
+        started = time.perf_counter()
+        rows = index.search(query)
+        indexed_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        needle = query.strip().lower()
+        expected = {row for row, record in enumerate(index.records)
+                    if needle in record.item.lower() or needle in record.label.lower()}
+        linear_ms = (time.perf_counter() - started) * 1000
+        assert set(rows) == expected and len(rows) == len(expected), query
+        # Pořadí skupin: přesná shoda (0), začátek (1), kdekoli (2)
+        keys = [(index.records[row].item.lower(), index.records[row].label.lower()) for row in rows]
+        ranks = [0 if needle in key else 1 if key[0].startswith(needle) or key[1].startswith(needle) else 2
+                 for key in keys]
+        assert ranks == sorted(ranks), query
+        print(f"{query!r:16} {len(rows):6} položek  index {indexed_ms:7.2f} ms  (lineárně {linear_ms:7.1f} ms)")
+
+    for query in ["consumable_cofee", "cofee", "lether_nail", "hrnek kavy", "wod_iron_1234"]:
+        started = time.perf_counter()
+        rows = index.suggest(query, exclude=set(index.search(query)))
+        fuzzy_ms = (time.perf_counter() - started) * 1000
+        names = ", ".join(index.records[row].item for row in rows[:3])
+        print(f"{query!r:18} {len(rows):3} návrhů  {fuzzy_ms:7.2f} ms  {names}")
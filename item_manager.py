@@ -1,10 +1,18 @@
 import sys
 import json
 import os
-from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5 import QtWidgets, QtCore
 import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+from image_utils import load_image_file_pixmap
+from image_store import ImageNameResolver, DEFAULT_CACHE_DIR
+from reference_data import ReferenceData
+from item_index import ItemSearchIndex, SUGGESTION_LIMIT
+from item_model import ItemTableModel, ItemSearchProxyModel
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
+
+SEARCH_DEBOUNCE = 150  # ms od posledního znaku do hledání ve výběru položky
 
 class ItemManager(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -13,11 +21,10 @@ class ItemManager(QtWidgets.QDialog):
         self.setWindowTitle("Správa Položek")
         self.setGeometry(100, 100, 800, 600)
         self.load_stylesheet(os.path.join(BASE_DIR, "stylesheet.qss"))
-        self.image_cache = {}
-        self.cache_dir = 'cache'
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
-        self.items_data_cache = {}  # In-memory cache pro data položek
+        self.items_data_cache = {}  # In-memory cache pro data položek (item -> ItemRecord)
         self.init_ui()
     def load_stylesheet(self, filepath):
         """Načte stylesheet z externího souboru."""
@@ -52,6 +59,10 @@ class ItemManager(QtWidgets.QDialog):
         self.table.setColumnCount(3)
         self.table.setHorizontalHeaderLabels(['Item', 'Label', 'Akce'])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_item_by_name, delete=self.delete_item_by_name), self.table)
+        self.table.setItemDelegateForColumn(2, self.action_delegate)
         main_layout.addWidget(self.table)
 
         # Tlačítka
@@ -59,7 +70,7 @@ class ItemManager(QtWidgets.QDialog):
         add_button = QtWidgets.QPushButton("Přidat Položku")
         add_button.clicked.connect(self.add_item)
         refresh_button = QtWidgets.QPushButton("Obnovit")
-        refresh_button.clicked.connect(self.load_items)
+        refresh_button.clicked.connect(self.reload_items)
         manage_presets_button = QtWidgets.QPushButton("Správa Presetů")
         manage_presets_button.clicked.connect(self.manage_presets)
         button_layout.addWidget(add_button)
@@ -70,22 +81,20 @@ class ItemManager(QtWidgets.QDialog):
         self.load_items()
 
     def load_items(self):
-        # Načteme všechna data položek z databáze a uložíme je do cache
-        cursor = self.connection.cursor(dictionary=True)
-        query = "SELECT * FROM items"
-        cursor.execute(query)
-        items = cursor.fetchall()
-        self.items_data_cache = {item['item']: item for item in items}
+        # Položky bereme ze sdílené cache číselníků; metadata a popis si načte až ItemDialog
+        self.items_data_cache = ReferenceData.instance().items(self.connection)
         self.filter_items()
 
+    def reload_items(self):
+        # "Obnovit" načte položky z DB znovu (mohl je změnit někdo jiný)
+        ReferenceData.instance().invalidate('items')
+        self.load_items()
+
     def filter_items(self):
-        search_text = self.search_edit.text().strip().lower()
-        # Filtrovat položky v cache podle vyhledávacího textu
-        filtered_items = []
-        for item in self.items_data_cache.values():
-            if (search_text in item['item'].lower()) or (search_text in item['label'].lower()):
-                filtered_items.append(item)
-        self.populate_table(filtered_items)
+        # Hledání v indexu nad cache položek; při překlepu doplní podobné položky
+        index = ItemSearchIndex.for_items(self.items_data_cache)
+        rows = search_with_suggestions(index, self.search_edit.text())[0]
+        self.populate_table([index.records[row] for row in rows])
 
     def populate_table(self, items):
         self.table.setRowCount(0)
@@ -93,48 +102,23 @@ class ItemManager(QtWidgets.QDialog):
             self.table.insertRow(row_number)
 
             # Item
-            item_item = QtWidgets.QTableWidgetItem(item['item'])
+            item_item = QtWidgets.QTableWidgetItem(item.item)
             item_item.setFlags(item_item.flags() & ~QtCore.Qt.ItemIsEditable)
             self.table.setItem(row_number, 0, item_item)
 
             # Label
-            label_item = QtWidgets.QTableWidgetItem(item['label'])
+            label_item = QtWidgets.QTableWidgetItem(item.label)
             label_item.setFlags(label_item.flags() & ~QtCore.Qt.ItemIsEditable)
             self.table.setItem(row_number, 1, label_item)
 
             # Akce
-            action_widget = self.create_action_buttons(item['item'])
-            self.table.setCellWidget(row_number, 2, action_widget)
+            self.table.setItem(row_number, 2, action_item(item.item))
 
             # Nastavíme výšku řádku
             self.table.setRowHeight(row_number, 30)
 
         self.table.resizeColumnsToContents()
 
-    def create_action_buttons(self, item_name):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setIcon(QtGui.QIcon.fromTheme('edit'))
-        edit_button.setToolTip("Upravit")
-        edit_button.clicked.connect(lambda _, name=item_name: self.edit_item_by_name(name))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setIcon(QtGui.QIcon.fromTheme('edit-delete'))
-        delete_button.setToolTip("Smazat")
-        delete_button.clicked.connect(lambda _, name=item_name: self.delete_item_by_name(name))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_double_clicked(self, row, column):
         item_item = self.table.item(row, 0)  # Sloupec 0 je Item
         if item_item:
@@ -156,10 +140,16 @@ class ItemManager(QtWidgets.QDialog):
                                                  f"Opravdu chcete smazat položku '{item_name}'?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM items WHERE item = %s", (item_name,))
-            self.connection.commit()
-            self.load_items()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM items WHERE item = %s", (item_name,))
+                self.connection.commit()
+                ImageNameResolver.instance().invalidate(item_name)
+                ReferenceData.instance().refresh_items(self.connection, [item_name])
+                self.load_items()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def manage_presets(self):
         dialog = MetaPresetManager()
@@ -171,7 +161,7 @@ class ItemDialog(QtWidgets.QDialog):
         self.connection = connection
         self.item_name = item_name
         self.setWindowTitle("Položka")
-        self.cache_dir = 'cache'
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.setStyleSheet("""
@@ -288,25 +278,11 @@ class ItemDialog(QtWidgets.QDialog):
         if not image_file:
             image_file = 'default.png'  # Nastavíme výchozí obrázek
 
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-        if os.path.exists(cache_file_path):
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            # Zkontrolujeme, zda default.png existuje v cache
-            default_image_path = os.path.join(self.cache_dir, 'default.png')
-            if not os.path.exists(default_image_path):
-                # Stáhneme default.png z URL
-                url = f"https://api.westhavenrp.cz/storage/items/default.png"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    with open(default_image_path, 'wb') as f:
-                        f.write(data)
-                except Exception as e:
-                    print(f"Error loading default image: {e}")
+        # Obrázek hledáme podle názvu souboru, takže změna pole Image se projeví hned
+        pixmap = load_image_file_pixmap(image_file, self.cache_dir, item_name or None)
+        if pixmap is None and image_file != 'default.png':
             # Použijeme default.png
-            pixmap = QtGui.QPixmap(default_image_path)
+            pixmap = load_image_file_pixmap('default.png', self.cache_dir)
         if pixmap:
             self.image_label.setPixmap(pixmap)
         else:
@@ -355,6 +331,9 @@ class ItemDialog(QtWidgets.QDialog):
             print(query, params)
             cursor.execute(query, params)
             self.connection.commit()
+            # Název obrázku se mohl změnit, zapomeneme ho v paměti
+            ImageNameResolver.instance().invalidate(item_name)
+            ReferenceData.instance().refresh_items(self.connection, [item_name])
             self.accept()
         except mysql.connector.Error as err:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání: {err}")
@@ -382,6 +361,13 @@ class ItemDialog(QtWidgets.QDialog):
             MetaPresetManager.save_presets(presets)
             QtWidgets.QMessageBox.information(self, "Uloženo", f"Preset '{preset_name}' byl uložen.")
             
+def search_with_suggestions(index, text):
+    """(řádky, počet podobných) - výsledek hledání, a když je skoro prázdný, i podobné položky na konci."""
+    rows = index.search(text)
+    suggestions = index.suggest(text, exclude=set(rows)) if len(rows) < SUGGESTION_LIMIT else []
+    return rows + suggestions, len(suggestions)
+
+
 class ItemSelectionDialog(QtWidgets.QDialog):
     def __init__(self, connection, single_selection=False):
         super().__init__()
@@ -390,6 +376,8 @@ class ItemSelectionDialog(QtWidgets.QDialog):
         self.setWindowTitle("Výběr Položky")
         self.setGeometry(100, 100, 800, 600)
         self.selected_items = []
+        # Hledá se v paměti nad sdílenou cache položek, ne dotazem do DB při každém znaku
+        self.index = ItemSearchIndex.for_items(ReferenceData.instance().items(self.connection))
         self.init_ui()
     
     def init_ui(self):
@@ -398,15 +386,31 @@ class ItemSelectionDialog(QtWidgets.QDialog):
 
         self.search_edit = QtWidgets.QLineEdit()
         self.search_edit.setPlaceholderText("Vyhledat...")
-        self.search_edit.textChanged.connect(self.load_items)
+        self.search_edit.textChanged.connect(self.schedule_search)
+        self.search_edit.returnPressed.connect(self.load_items)
         layout.addWidget(self.search_edit)
-
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(2)
-        self.table.setHorizontalHeaderLabels(['Item', 'Label'])
+        self.suggestions_label = QtWidgets.QLabel()
+        self.suggestions_label.setStyleSheet("color: gray;")
+        self.suggestions_label.hide()
+        layout.addWidget(self.suggestions_label)
+
+        # Hledání až po krátké pauze v psaní
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE)
+        self.search_timer.timeout.connect(self.load_items)
+
+        self.model = ItemTableModel(self.index.records, self)
+        self.proxy = ItemSearchProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.proxy)
         self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection if self.single_selection else QtWidgets.QAbstractItemView.MultiSelection)
         self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
         
         self.table.doubleClicked.connect(self.select_item)
         layout.addWidget(self.table)
@@ -419,41 +423,31 @@ class ItemSelectionDialog(QtWidgets.QDialog):
         layout.addWidget(buttons)
 
         self.load_items()
+
+    def schedule_search(self):
+        self.search_timer.start()
     
     def load_items(self):
-        search_text = self.search_edit.text().strip()
-        cursor = self.connection.cursor(dictionary=True)
-        query = "SELECT item, label FROM items WHERE item LIKE %s OR label LIKE %s"
-        search_pattern = f"%{search_text}%"
-        cursor.execute(query, (search_pattern, search_pattern))
-        items = cursor.fetchall()
-        self.table.setRowCount(0)
-        for row_number, item in enumerate(items):
-            self.table.insertRow(row_number)
-            item_item = QtWidgets.QTableWidgetItem(item['item'])
-            self.table.setItem(row_number, 0, item_item)
-            label_item = QtWidgets.QTableWidgetItem(item['label'])
-            item_item.setFlags(item_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            label_item.setFlags(label_item.flags() & ~QtCore.Qt.ItemIsEditable)
-            self.table.setItem(row_number, 1, label_item)
-        self.table.resizeColumnsToContents()
+        self.search_timer.stop()
+        rows, suggested = search_with_suggestions(self.index, self.search_edit.text())
+        self.proxy.set_rows(rows)
+        self.suggestions_label.setText(f"Podobné položky (možný překlep): {suggested}")
+        self.suggestions_label.setVisible(bool(suggested))
+        if self.proxy.rowCount():
+            self.table.scrollToTop()
+
+    def item_at(self, proxy_row):
+        record = self.model.record_at(self.proxy.rows[proxy_row])
+        return {'item': record.item, 'label': record.label}
     
     def select_item(self, index):
-        row = index.row()
-        item_code = self.table.item(row, 0).text()
-        label = self.table.item(row, 1).text()
-        self.selected_items = [{'item': item_code, 'label': label}]
+        self.selected_items = [self.item_at(index.row())]
         if self.single_selection:
             self.accept()
     
     def accept_selection(self):
         selected_rows = self.table.selectionModel().selectedRows()
-        self.selected_items = []
-        for row_index in selected_rows:
-            row = row_index.row()
-            item_code = self.table.item(row, 0).text()
-            label = self.table.item(row, 1).text()
-            self.selected_items.append({'item': item_code, 'label': label})
+        self.selected_items = [self.item_at(row_index.row()) for row_index in selected_rows]
         self.accept()
         
 class MetaPresetManager(QtWidgets.QDialog):
@@ -0,0 +1,100 @@
+# item_model.py
+# Model položek pro ItemSelectionDialog a proxy, která zobrazuje seřazený výsledek hledání v ItemSearchIndex.
+from PyQt5 import QtCore
+
+ITEM_COLUMNS = ['Item', 'Label']
+
+
+class ItemTableModel(QtCore.QAbstractTableModel):
+    """Read-only model nad záznamy z ItemSearchIndex; pod `Qt.UserRole` vrací kód položky."""
+
+    def __init__(self, records=(), parent=None):
+        super().__init__(parent)
+        self.records = list(records)
+
+    def record_at(self, row):
+        return self.records[row]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(ITEM_COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return ITEM_COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return (record.item if index.column() == 0 else record.label) or ""
+        if role == QtCore.Qt.UserRole:
+            return record.item
+        return None
+
+
+class ItemSearchProxyModel(QtCore.QAbstractProxyModel):
+    """Zobrazí jen řádky zdrojového modelu ze seznamu `rows`, v pořadí seznamu.
+
+    Na rozdíl od QSortFilterProxyModel se nic nefiltruje ani neřadí po
+    řádcích v Pythonu: pořadí i výběr řádků už spočítal ItemSearchIndex,
+    nový výsledek je jen výměna seznamu.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.proxy_rows = None  # zdrojový řádek -> řádek proxy, počítá se až při potřebě
+
+    def setSourceModel(self, model):
+        self.beginResetModel()
+        super().setSourceModel(model)
+        self.rows = list(range(model.rowCount())) if model is not None else []
+        self.proxy_rows = None
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.proxy_rows = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        source = self.sourceModel()
+        return 0 if parent.isValid() or source is None else source.columnCount()
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=None):
+        return QtCore.QModelIndex()
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        source = self.sourceModel()
+        if orientation == QtCore.Qt.Horizontal and source is not None:
+            return source.headerData(section, orientation, role)
+        return super().headerData(section, orientation, role)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QtCore.QModelIndex()
+        return self.sourceModel().index(self.rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        if self.proxy_rows is None:
+            self.proxy_rows = {source_row: row for row, source_row in enumerate(self.rows)}
+        row = self.proxy_rows.get(source_index.row())
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.index(row, source_index.column())
@@ -0,0 +1,113 @@
+# json_cache.py
+# Sdílené parsování JSON sloupců z DB (materials, result, meta, recipe...) bez závislosti na Qt.
+import json
+import threading
+from collections import OrderedDict
+
+JSON_CACHE_SIZE = 8192  # Počet různých naparsovaných textů, které si pamatujeme
+_MISSING = object()
+
+
+class FrozenDict(dict):
+    """Slovník z cache, který nejde měnit (sdílí ho všichni, kdo parsovali stejný text).
+
+    Pro úpravy je potřeba vytvořit kopii, např. dict(data) nebo copy.deepcopy(data).
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Naparsovaný JSON z cache nelze měnit, vytvořte si kopii")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        # Kopie (copy/deepcopy/pickle) už je obyčejný, měnitelný slovník
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """Seznam z cache, který nejde měnit; viz FrozenDict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Naparsovaný JSON z cache nelze měnit, vytvořte si kopii")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+class JsonCache:
+    """Naparsovaný JSON podle surového textu sloupce, s omezenou velikostí (LRU).
+
+    Stejné texty (stejné materiály, výsledky, meta...) se tak parsují jen
+    jednou za běh, ať je čte editor při každém obnovení, dialog receptu
+    nebo exporter. Vadný JSON se nahlásí jen jednou pro každý text.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_entries=JSON_CACHE_SIZE):
+        self.lock = threading.Lock()  # Parsuje i vlákno načítající recepty
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # surový text -> naparsovaná hodnota
+        self.reported = set()  # hash textů, jejichž chybu už jsme vypsali
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, raw, default=None, what="JSON"):
+        """Vrátí naparsovaný (neměnný) obsah `raw`, pro prázdný nebo vadný text `default`."""
+        if isinstance(raw, (bytes, bytearray)):
+            raw = raw.decode('utf-8', errors='replace')
+        if not raw:
+            return default
+        with self.lock:
+            value = self.entries.get(raw, _MISSING)
+            if value is not _MISSING:
+                self.entries.move_to_end(raw)
+                self.hits += 1
+                return value
+        try:
+            value = freeze(json.loads(raw))
+        except (ValueError, TypeError) as err:
+            self.report(raw, what, err)
+            return default
+        with self.lock:
+            self.misses += 1
+            self.entries[raw] = value
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return value
+
+    def report(self, raw, what, err):
+        key = hash(raw)
+        with self.lock:
+            if key in self.reported:
+                return
+            self.reported.add(key)
+        preview = raw if len(raw) <= 80 else raw[:77] + "..."
+        print(f"Neplatný JSON ({what}): {err}: {preview!r}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.reported.clear()
+
+
+def parse_json(raw, default=None, what="JSON"):
+    return JsonCache.instance().parse(raw, default, what)
@@ -1,6 +1,10 @@
 import os
-from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5 import QtWidgets, QtCore
+import mysql.connector
 from longcraft_recipe_dialog import LongcraftRecipeDialog
+from image_utils import get_item_image_label, prefetch_item_images
+from image_store import DEFAULT_CACHE_DIR
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 class LongcraftManager(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -9,7 +13,7 @@ class LongcraftManager(QtWidgets.QDialog):
         self.setWindowTitle("Správa Dlouhých Receptů")
         self.setGeometry(100, 100, 1200, 600)
         self.load_stylesheet(os.path.join(BASE_DIR, "stylesheet.qss"))
-        self.cache_dir = 'cache'  # Adresář pro cache obrázků
+        self.cache_dir = DEFAULT_CACHE_DIR  # Adresář pro cache obrázků
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.selected_prop = None  # Přidáno
@@ -48,6 +52,10 @@ class LongcraftManager(QtWidgets.QDialog):
         self.table.setColumnCount(6)
         self.table.setHorizontalHeaderLabels(['Obrázek', 'ID', 'Název', 'Odměna', 'Prop', 'Akce'])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_recipe_by_id, copy=self.copy_recipe_by_id, delete=self.delete_recipe_by_id), self.table)
+        self.table.setItemDelegateForColumn(5, self.action_delegate)
         left_layout.addWidget(self.table)
 
         # Tlačítka
@@ -132,6 +140,8 @@ class LongcraftManager(QtWidgets.QDialog):
         """
         cursor.execute(query, params)
         recipes = cursor.fetchall()
+        # Názvy obrázků pro všechny řádky dohledáme jedním dotazem
+        prefetch_item_images([r['reward'] for r in recipes], self.connection)
         self.table.setRowCount(0)
         for row_number, recipe in enumerate(recipes):
             self.table.insertRow(row_number)
@@ -162,8 +172,7 @@ class LongcraftManager(QtWidgets.QDialog):
             self.table.setItem(row_number, 4, prop_item)
 
             # Akce
-            action_widget = self.create_action_buttons(recipe['id'])
-            self.table.setCellWidget(row_number, 5, action_widget)
+            self.table.setItem(row_number, 5, action_item(recipe['id']))
 
             # Nastavíme výšku řádku
             self.table.setRowHeight(row_number, 64)
@@ -171,78 +180,8 @@ class LongcraftManager(QtWidgets.QDialog):
         self.table.resizeColumnsToContents()
 
     def get_item_image_label(self, item_name):
-        # Vytvoříme název souboru pro cache
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-
-        # Zkontrolujeme, zda soubor existuje v cache
-        if os.path.exists(cache_file_path):
-            # Načteme obrázek z cache
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            # Pokud není v cache, stáhneme obrázek a uložíme ho
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    # Uložíme data do souboru
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                print(f"No image found for item {item_name}")
-                pixmap = None
-
-        label = QtWidgets.QLabel()
-        if pixmap:
-            label.setPixmap(pixmap)
-        else:
-            label.setText('No Image')
-        label.setFixedSize(64, 64)
-        label.setScaledContents(True)
-        label.setAlignment(QtCore.Qt.AlignCenter)
-        return label
-
-    def create_action_buttons(self, recipe_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Tlačítko Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setIcon(QtGui.QIcon.fromTheme('edit'))
-        edit_button.setToolTip("Upravit")
-        edit_button.clicked.connect(lambda _, rid=recipe_id: self.edit_recipe_by_id(rid))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        h_layout.addWidget(edit_button)
-
-        # Tlačítko Kopírovat
-        copy_button = QtWidgets.QPushButton("Kopírovat")
-        copy_button.setIcon(QtGui.QIcon.fromTheme('edit-copy'))
-        copy_button.setToolTip("Kopírovat")
-        copy_button.clicked.connect(lambda _, rid=recipe_id: self.copy_recipe_by_id(rid))
-        copy_button.setStyleSheet("background-color: #5bc0de; color: white;")
-        h_layout.addWidget(copy_button)
-
-        # Tlačítko Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setIcon(QtGui.QIcon.fromTheme('edit-delete'))
-        delete_button.setToolTip("Smazat")
-        delete_button.clicked.connect(lambda _, rid=recipe_id: self.delete_recipe_by_id(rid))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
+        # Obrázek se načítá přes sdílenou službu, aby stahování neblokovalo GUI
+        return get_item_image_label(item_name, self.cache_dir, self.connection)
 
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 1)  # Sloupec 1 je ID
@@ -273,8 +212,12 @@ class LongcraftManager(QtWidgets.QDialog):
                                                  f"Opravdu chcete smazat recept s ID {recipe_id}?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_longCraft_recipes WHERE id = %s", (recipe_id,))
-            self.connection.commit()
-            self.load_recipes()
-            self.load_prop_filters()  # Aktualizujeme seznam filtrů
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_longCraft_recipes WHERE id = %s", (recipe_id,))
+                self.connection.commit()
+                self.load_recipes()
+                self.load_prop_filters()  # Aktualizujeme seznam filtrů
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
@@ -1,10 +1,13 @@
 import json
 import os
-from PyQt5 import QtWidgets, QtGui, QtCore
+from PyQt5 import QtWidgets, QtCore
 import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from item_manager import ItemSelectionDialog
+from image_utils import load_item_pixmap
+from image_store import DEFAULT_CACHE_DIR
+from reference_data import ReferenceData
 
 class LongcraftRecipeDialog(QtWidgets.QDialog):
     def __init__(self, connection, recipe_id=None, copy=False):
@@ -14,7 +17,7 @@ class LongcraftRecipeDialog(QtWidgets.QDialog):
         self.copy = copy
         self.setWindowTitle("Dlouhý Recept")
         self.load_stylesheet(os.path.join(BASE_DIR, "stylesheet.qss"))
-        self.cache_dir = 'cache'  # Adresář pro cache obrázků
+        self.cache_dir = DEFAULT_CACHE_DIR  # Adresář pro cache obrázků
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.init_ui()
@@ -136,38 +139,8 @@ class LongcraftRecipeDialog(QtWidgets.QDialog):
                 self.result_image_label.setText('No Image')
 
     def get_item_pixmap(self, item_name):
-        # Vytvoříme název souboru pro cache
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-
-        # Zkontrolujeme, zda soubor existuje v cache
-        if os.path.exists(cache_file_path):
-            # Načteme obrázek z cache
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            # Pokud není v cache, stáhneme obrázek a uložíme ho
-            cursor = self.connection.cursor(dictionary=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    # Uložíme data do souboru
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                print(f"No image found for item {item_name}")
-                pixmap = None
-
-        return pixmap
+        # Obrázek bereme ze sdílené cache, na disk a síť jde jen při prvním použití
+        return load_item_pixmap(item_name, self.cache_dir, self.connection)
 
     def select_reward_item(self):
         dialog = ItemSelectionDialog(self.connection, single_selection=True)
@@ -206,13 +179,7 @@ class LongcraftRecipeDialog(QtWidgets.QDialog):
                 self.materials_list.addItem(list_item)
 
     def get_item_label(self, item_name):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT label FROM items WHERE item = %s", (item_name,))
-        result = cursor.fetchone()
-        if result and result.get('label'):
-            return result['label']
-        else:
-            return item_name
+        return ReferenceData.instance().item_label(self.connection, item_name) or item_name
 
     def add_material(self):
         # Umožníme uživateli vybrat slot, do kterého chce přidat materiál
@@ -4,6 +4,7 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 import mysql.connector
 
 from plants_dialog import PlantDialog  # (uvedený níže)
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 class PlantTypesManagerDialog(QtWidgets.QDialog):
     def __init__(self, connection):
@@ -41,6 +42,10 @@ class PlantTypesManagerDialog(QtWidgets.QDialog):
             "Grow (čas)", "Die (čas)", "Akce"
         ])
         self.table.cellDoubleClicked.connect(self.on_table_doubleclick)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_plant_type, delete=self.delete_plant_type), self.table)
+        self.table.setItemDelegateForColumn(6, self.action_delegate)
         self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
@@ -103,29 +108,10 @@ class PlantTypesManagerDialog(QtWidgets.QDialog):
             self.table.setItem(row_number, 5, die_item)
 
             # Akce (Upravit / Smazat)
-            action_widget = self.create_action_buttons(row_data["plant_type_id"])
-            self.table.setCellWidget(row_number, 6, action_widget)
+            self.table.setItem(row_number, 6, action_item(row_data["plant_type_id"]))
 
         self.table.resizeColumnsToContents()
 
-    def create_action_buttons(self, plant_type_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, pid=plant_type_id: self.edit_plant_type(pid))
-        h_layout.addWidget(edit_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, pid=plant_type_id: self.delete_plant_type(pid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_doubleclick(self, row, column):
         id_item = self.table.item(row, 0)  # Sloupec 0 je ID
         if id_item:
@@ -149,10 +135,14 @@ class PlantTypesManagerDialog(QtWidgets.QDialog):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_farming_plant_types WHERE plant_type_id=%s", (plant_type_id,))
-            self.connection.commit()
-            self.load_plant_types()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_farming_plant_types WHERE plant_type_id=%s", (plant_type_id,))
+                self.connection.commit()
+                self.load_plant_types()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
 
 if __name__ == "__main__":
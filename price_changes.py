@@ -0,0 +1,117 @@
+# price_changes.py
+# Hromadné změny cen v obchodech: výpočet náhledu a jeden UPDATE na dávku ID (bez závislosti na Qt).
+from decimal import Decimal, ROUND_HALF_UP
+
+from image_store import chunked
+
+PRICE_SET = 'set'
+PRICE_PERCENT = 'percent'
+PRICE_MULTIPLY = 'multiply'
+PRICE_ADD = 'add'
+PRICE_MODES = (PRICE_SET, PRICE_PERCENT, PRICE_MULTIPLY, PRICE_ADD)
+# Jen tyto sloupce se smí dosadit do textu dotazu
+PRICE_COLUMNS = ('price_b', 'price_s')
+CENT = Decimal('0.01')
+# MySQL i Python počítají v přesné desítkové aritmetice se 6 desetinnými místy, i když je
+# sloupec DOUBLE; ROUND nad DECIMAL v MySQL zaokrouhluje stejně jako ROUND_HALF_UP
+SQL_DECIMAL = 'DECIMAL(20, 6)'
+EXACT = Decimal('0.000001')
+
+
+def to_decimal(value):
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+class PriceChange:
+    """Změna ceny, kterou umí spočítat Python (náhled) i MySQL (UPDATE) stejně.
+
+    mode: PRICE_SET (nová cena), PRICE_PERCENT (+/- procenta),
+    PRICE_MULTIPLY (násobek), PRICE_ADD (+/- částka).
+    round_to: krok zaokrouhlení výsledku (např. 0.05 nebo 1), 0 = jen na haléře.
+    Výsledek se vždy zaokrouhlí na 2 desetinná místa a nikdy není záporný.
+    """
+
+    def __init__(self, mode, value, round_to=0):
+        if mode not in PRICE_MODES:
+            raise ValueError(f"Neznámý způsob změny ceny: {mode}")
+        self.mode = mode
+        self.value = to_decimal(value).quantize(EXACT, ROUND_HALF_UP)
+        self.round_to = to_decimal(round_to).quantize(EXACT, ROUND_HALF_UP)
+
+    def apply(self, price):
+        # Stejně jako CAST(sloupec AS DECIMAL(20, 6)) v sql_expression()
+        price = to_decimal(price).quantize(EXACT, ROUND_HALF_UP)
+        if self.mode == PRICE_SET:
+            new_price = self.value
+        elif self.mode == PRICE_PERCENT:
+            new_price = price * (100 + self.value) / 100
+        elif self.mode == PRICE_MULTIPLY:
+            new_price = price * self.value
+        else:
+            new_price = price + self.value
+        if self.round_to > 0:
+            new_price = (new_price / self.round_to).quantize(Decimal(1), ROUND_HALF_UP) * self.round_to
+        return max(new_price.quantize(CENT, ROUND_HALF_UP), Decimal('0.00'))
+
+    def sql_expression(self, column):
+        """(výraz pro SET column = ..., parametry) počítající totéž co apply()."""
+        if column not in PRICE_COLUMNS:
+            raise ValueError(f"Neznámý sloupec ceny: {column}")
+        price = f"CAST({column} AS {SQL_DECIMAL})"
+        param = f"CAST(%s AS {SQL_DECIMAL})"
+        if self.mode == PRICE_SET:
+            expression = param
+        elif self.mode == PRICE_PERCENT:
+            expression = f"{price} * (100 + {param}) / 100"
+        elif self.mode == PRICE_MULTIPLY:
+            expression = f"{price} * {param}"
+        else:
+            expression = f"{price} + {param}"
+        params = [str(self.value)]
+        if self.round_to > 0:
+            expression = f"ROUND(({expression}) / {param}) * {param}"
+            params += [str(self.round_to), str(self.round_to)]
+        return f"GREATEST(ROUND({expression}, 2), 0)", params
+
+
+def update_prices(connection, column, item_ids, change):
+    """Provede změnu jedním UPDATE ... WHERE id IN (...) na dávku a vše potvrdí najednou.
+
+    Vrací počet skutečně změněných řádků. Při chybě se nic neuloží.
+    """
+    expression, params = change.sql_expression(column)
+    cursor = connection.cursor()
+    changed = 0
+    try:
+        for chunk in chunked(item_ids):
+            placeholder = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"UPDATE aprts_store_items SET {column} = {expression} WHERE id IN ({placeholder})",
+                           (*params, *chunk))
+            changed += max(cursor.rowcount, 0)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return changed
+
+
+def fetch_prices(connection, column, item_ids):
+    """{id: cena} ve sloupci `column` tak, jak je po uložení v DB."""
+    if column not in PRICE_COLUMNS:
+        raise ValueError(f"Neznámý sloupec ceny: {column}")
+    cursor = connection.cursor()
+    prices = {}
+    try:
+        for chunk in chunked(item_ids):
+            placeholder = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"SELECT id, {column} FROM aprts_store_items WHERE id IN ({placeholder})", tuple(chunk))
+            prices.update(cursor.fetchall())
+    finally:
+        cursor.close()
+    return prices
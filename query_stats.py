@@ -0,0 +1,196 @@
+# query_stats.py
+# Měření SQL dotazů ze všech kurzorů (db.ReconnectingCursor) a hledání N+1 dotazů (bez závislosti na Qt).
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
+
+RECENT_QUERIES = 2000  # Kolik posledních provedení dotazů držíme pro přehled nejpomalejších
+N_PLUS_ONE_THRESHOLD = 10  # Od kolika opakování stejného dotazu ze stejného místa v řadě hlásíme N+1
+# s, delší nečinnost mezi koncem dotazu a začátkem dalšího už řadu přeruší; měří se bez
+# doby samotného dotazu, takže smyčka s pomalým spojením (200 ms na dotaz) se pozná také
+N_PLUS_ONE_GAP = 0.2
+MAX_BURSTS = 1000  # Kolik rozpracovaných řad (dotaz, místo volání) si pamatujeme
+# Moduly, které jen předávají dotaz dál; místo volání hledáme až za nimi
+SKIPPED_MODULES = frozenset(('db.py', 'query_stats.py', 'contextlib.py'))
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Text dotazu bez zbytečných mezer a s IN (%s, %s, ...) zkráceným na jeden tvar."""
+    sql = " ".join(sql.split())
+    return re.sub(r"%s(?:\s*,\s*%s)+", "%s, ...", sql)
+
+
+def call_site():
+    frame = sys._getframe(1)
+    while frame is not None and os.path.basename(frame.f_code.co_filename) in SKIPPED_MODULES:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class QueryRecord:
+    """Jedno provedení dotazu; řádky a čas načítání přičítá kurzor při fetch*."""
+    __slots__ = ('sql', 'call_site', 'seconds', 'rows', 'started', 'burst_key')
+
+    def __init__(self, sql, call_site, seconds, rows):
+        self.sql = sql
+        self.call_site = call_site
+        self.seconds = seconds
+        self.rows = rows
+        self.started = time.time()
+        self.burst_key = None
+
+    def as_dict(self):
+        return {'sql': self.sql, 'call_site': self.call_site, 'ms': round(self.seconds * 1000, 3),
+                'rows': self.rows, 'started': self.started}
+
+
+class StatementStats:
+    __slots__ = ('sql', 'count', 'seconds', 'max_seconds', 'rows', 'call_sites')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.call_sites = Counter()
+
+    def as_dict(self):
+        return {'sql': self.sql, 'count': self.count, 'total_ms': round(self.seconds * 1000, 3),
+                'avg_ms': round(self.seconds * 1000 / self.count, 3) if self.count else 0.0,
+                'max_ms': round(self.max_seconds * 1000, 3), 'rows': self.rows,
+                'call_sites': dict(self.call_sites.most_common())}
+
+
+class QueryStats:
+    """Statistika SQL dotazů za běh editoru.
+
+    Pro každý (normalizovaný) dotaz počítá provedení, čas, vrácené řádky
+    a místa volání. Stejný dotaz spouštěný ze stejného místa rychle za
+    sebou (typicky SELECT pro každý řádek ve smyčce) označí jako N+1
+    a jednou ho vypíše do konzole.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.enabled = True
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.statements = {}  # normalizovaný dotaz -> StatementStats
+            self.recent = deque(maxlen=RECENT_QUERIES)
+            # (dotaz, místo volání) -> [konec posledního provedení, počet v řadě], nejdéle nepoužité první
+            self.bursts = OrderedDict()
+            self.n_plus_one = {}  # (dotaz, místo volání) -> nejdelší řada opakování
+
+    def record(self, sql, seconds, rows=0):
+        """Zapíše provedení dotazu; vrací QueryRecord pro přičtení řádků z fetch*."""
+        if not self.enabled:
+            return None
+        sql = normalize_sql(sql)
+        site = call_site()
+        record = QueryRecord(sql, site, seconds, max(rows, 0))
+        now = time.monotonic()
+        report = False
+        with self.lock:
+            stats = self.statements.get(sql)
+            if stats is None:
+                stats = self.statements[sql] = StatementStats(sql)
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += record.rows
+            stats.call_sites[site] += 1
+            self.recent.append(record)
+
+            key = (sql, site)
+            record.burst_key = key
+            burst = self.bursts.get(key)
+            if burst is None or (now - seconds) - burst[0] > N_PLUS_ONE_GAP:
+                burst = self.bursts[key] = [now, 0]
+            self.bursts.move_to_end(key)
+            if len(self.bursts) > MAX_BURSTS:
+                self.bursts.popitem(last=False)
+            burst[0] = now
+            burst[1] += 1
+            if burst[1] >= N_PLUS_ONE_THRESHOLD:
+                report = key not in self.n_plus_one
+                self.n_plus_one[key] = max(self.n_plus_one.get(key, 0), burst[1])
+        if report:
+            print(f"Možný N+1 dotaz ({site}): {sql}")
+        return record
+
+    def add_fetch(self, record, seconds, rows):
+        with self.lock:
+            record.seconds += seconds
+            record.rows += rows
+            # Načítání řádků patří k dotazu, nečinnost se počítá až od jeho konce
+            burst = self.bursts.get(record.burst_key)
+            if burst is not None:
+                burst[0] = time.monotonic()
+            stats = self.statements.get(record.sql)
+            if stats is not None:
+                stats.seconds += seconds
+                stats.max_seconds = max(stats.max_seconds, record.seconds)
+                stats.rows += rows
+
+    def totals(self):
+        """(počet provedení, počet různých dotazů)."""
+        with self.lock:
+            return sum(stats.count for stats in self.statements.values()), len(self.statements)
+
+    def slowest(self, limit=50):
+        with self.lock:
+            recent = list(self.recent)
+        return sorted(recent, key=lambda record: record.seconds, reverse=True)[:limit]
+
+    def most_repeated(self, limit=50):
+        """Nejčastější dotazy jako slovníky (viz StatementStats.as_dict)."""
+        with self.lock:
+            statements = sorted(self.statements.values(), key=lambda stats: stats.count, reverse=True)[:limit]
+            return [stats.as_dict() for stats in statements]
+
+    def suspected_n_plus_one(self):
+        """Seznam (dotaz, místo volání, nejdelší řada) seřazený od nejdelší řady."""
+        with self.lock:
+            items = list(self.n_plus_one.items())
+        return sorted(((sql, site, count) for (sql, site), count in items), key=lambda item: -item[2])
+
+    def snapshot(self):
+        with self.lock:
+            statements = [stats.as_dict() for stats in self.statements.values()]
+        return {
+            'statements': sorted(statements, key=lambda stats: stats['total_ms'], reverse=True),
+            'slowest': [record.as_dict() for record in self.slowest()],
+            'n_plus_one': [{'sql': sql, 'call_site': site, 'repeats': count}
+                           for sql, site, count in self.suspected_n_plus_one()],
+        }
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def report(self, limit=10):
+        """Krátký textový přehled pro skripty bez GUI (exporter)."""
+        lines = ["Nejčastější dotazy:"]
+        for stats in self.most_repeated(limit):
+            lines.append(f"  {stats['count']:6}x {stats['total_ms']:9.1f} ms  {stats['sql']}")
+        for sql, site, count in self.suspected_n_plus_one():
+            lines.append(f"  N+1: {count}x v řadě z {site}: {sql}")
+        return "\n".join(lines)
@@ -0,0 +1,106 @@
+# query_stats_dialog.py
+# Živý přehled SQL dotazů editoru (nejpomalejší, nejčastější, podezřelé N+1) s exportem do JSON.
+from PyQt5 import QtWidgets, QtCore
+
+from query_stats import QueryStats
+
+REFRESH_INTERVAL = 1000  # ms
+ROW_LIMIT = 50
+
+
+class QueryStatsDialog(QtWidgets.QDialog):
+    """Nemodální okno nad QueryStats; obnovuje se samo, dokud je vidět."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Statistiky SQL dotazů")
+        self.resize(1100, 600)
+        self.stats = QueryStats.instance()
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.summary_label = QtWidgets.QLabel()
+        layout.addWidget(self.summary_label)
+
+        tabs = QtWidgets.QTabWidget()
+        self.slowest_table = self.create_table(["ms", "Řádků", "Místo volání", "Dotaz"])
+        self.repeated_table = self.create_table(["Počet", "Celkem ms", "Průměr ms", "Řádků", "Místa volání", "Dotaz"])
+        self.n_plus_one_table = self.create_table(["Opakování v řadě", "Místo volání", "Dotaz"])
+        tabs.addTab(self.slowest_table, "Nejpomalejší dotazy")
+        tabs.addTab(self.repeated_table, "Nejčastější dotazy")
+        tabs.addTab(self.n_plus_one_table, "Podezřelé N+1")
+        layout.addWidget(tabs)
+
+        button_layout = QtWidgets.QHBoxLayout()
+        export_button = QtWidgets.QPushButton("Exportovat JSON")
+        export_button.clicked.connect(self.export_json)
+        reset_button = QtWidgets.QPushButton("Vynulovat")
+        reset_button.clicked.connect(self.reset_stats)
+        close_button = QtWidgets.QPushButton("Zavřít")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(export_button)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def create_table(self, headers):
+        table = QtWidgets.QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def fill_table(self, table, rows):
+        table.setUpdatesEnabled(False)
+        table.setRowCount(len(rows))
+        for row_number, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(str(value))
+                if isinstance(value, (int, float)):
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                table.setItem(row_number, column, item)
+        table.setUpdatesEnabled(True)
+
+    def refresh(self):
+        repeated = self.stats.most_repeated(ROW_LIMIT)
+        n_plus_one = self.stats.suspected_n_plus_one()
+        executed, distinct = self.stats.totals()
+        self.summary_label.setText(f"Provedeno dotazů: {executed}, různých: {distinct}, "
+                                   f"podezřelých N+1: {len(n_plus_one)}")
+        self.fill_table(self.slowest_table, [
+            (round(record.seconds * 1000, 2), record.rows, record.call_site, record.sql)
+            for record in self.stats.slowest(ROW_LIMIT)])
+        self.fill_table(self.repeated_table, [
+            (stats['count'], stats['total_ms'], stats['avg_ms'], stats['rows'],
+             ", ".join(f"{site} ×{count}" for site, count in list(stats['call_sites'].items())[:3]), stats['sql'])
+            for stats in repeated])
+        self.fill_table(self.n_plus_one_table, [(count, site, sql) for sql, site, count in n_plus_one])
+
+    def export_json(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Exportovat statistiky", "sql_stats.json",
+                                                        "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.stats.export_json(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Chyba", f"Statistiky se nepodařilo uložit: {e}")
+
+    def reset_stats(self):
+        self.stats.reset()
+        self.refresh()
@@ -5,6 +5,7 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 import mysql.connector
 
 from ranch_animal_product_dialog import RanchAnimalProductDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 class RanchAnimalDialog(QtWidgets.QDialog):
     def __init__(self, connection, animal_id=None):
@@ -109,6 +110,10 @@ class RanchAnimalDialog(QtWidgets.QDialog):
         self.products_table.setColumnCount(5)
         self.products_table.setHorizontalHeaderLabels(["ID", "Název", "Item", "Chance", "Akce"])
         self.products_table.setSortingEnabled(True)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.products_action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_product_by_id, delete=self.delete_product_by_id), self.products_table)
+        self.products_table.setItemDelegateForColumn(4, self.products_action_delegate)
         layout.addWidget(self.products_table)
 
         # Tlačítka pro produkty
@@ -226,31 +231,10 @@ class RanchAnimalDialog(QtWidgets.QDialog):
             self.products_table.setItem(row_number, 3, chance_item)
 
             # Akce
-            action_widget = self.create_product_action_buttons(product['product_id'])
-            self.products_table.setCellWidget(row_number, 4, action_widget)
+            self.products_table.setItem(row_number, 4, action_item(product['product_id']))
 
         self.products_table.resizeColumnsToContents()
 
-    def create_product_action_buttons(self, product_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, pid=product_id: self.edit_product_by_id(pid))
-        h_layout.addWidget(edit_button)
-
-        # Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, pid=product_id: self.delete_product_by_id(pid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def add_product(self):
         if not self.animal_id:
             QtWidgets.QMessageBox.warning(self, "Chyba", "Nejdřív uložte zvíře, abyste mohli přidávat produkty.")
@@ -271,10 +255,14 @@ class RanchAnimalDialog(QtWidgets.QDialog):
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_ranch_config_animal_products WHERE product_id = %s", (product_id,))
-            self.connection.commit()
-            self.load_products()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_ranch_config_animal_products WHERE product_id = %s", (product_id,))
+                self.connection.commit()
+                self.load_products()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def save_animal(self):
         name = self.name_edit.text().strip()
@@ -6,6 +6,7 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from ranch_animal_dialog import RanchAnimalDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 
 class RanchAnimalManager(QtWidgets.QDialog):
@@ -40,6 +41,10 @@ class RanchAnimalManager(QtWidgets.QDialog):
         self.table.setColumnCount(4)
         self.table.setHorizontalHeaderLabels(["ID", "Název", "Model (F)", "Akce"])
         self.table.cellDoubleClicked.connect(self.on_table_double_clicked)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_animal_by_id, delete=self.delete_animal_by_id), self.table)
+        self.table.setItemDelegateForColumn(3, self.action_delegate)
         self.table.setSortingEnabled(True)
         layout.addWidget(self.table)
 
@@ -91,31 +96,10 @@ class RanchAnimalManager(QtWidgets.QDialog):
             self.table.setItem(row_number, 2, model_item)
 
             # Akce
-            action_widget = self.create_action_buttons(animal['animal_id'])
-            self.table.setCellWidget(row_number, 3, action_widget)
+            self.table.setItem(row_number, 3, action_item(animal['animal_id']))
 
         self.table.resizeColumnsToContents()
 
-    def create_action_buttons(self, animal_id):
-        widget = QtWidgets.QWidget()
-        h_layout = QtWidgets.QHBoxLayout()
-        h_layout.setContentsMargins(0, 0, 0, 0)
-
-        # Upravit
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        edit_button.clicked.connect(lambda _, aid=animal_id: self.edit_animal_by_id(aid))
-        h_layout.addWidget(edit_button)
-
-        # Smazat
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        delete_button.clicked.connect(lambda _, aid=animal_id: self.delete_animal_by_id(aid))
-        h_layout.addWidget(delete_button)
-
-        widget.setLayout(h_layout)
-        return widget
-
     def on_table_double_clicked(self, row, column):
         id_item = self.table.item(row, 0)  # Sloupec 0 je ID
         if id_item:
@@ -137,10 +121,14 @@ class RanchAnimalManager(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat toto zvíře?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_ranch_config_animals WHERE animal_id = %s", (animal_id,))
-            self.connection.commit()
-            self.load_animals()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_ranch_config_animals WHERE animal_id = %s", (animal_id,))
+                self.connection.commit()
+                self.load_animals()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
 
 if __name__ == "__main__":
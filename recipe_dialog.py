@@ -8,6 +8,10 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 from item_manager import ItemSelectionDialog
+from image_utils import load_item_pixmap, prefetch_item_images
+from image_store import DEFAULT_CACHE_DIR, ImageNameResolver
+from json_cache import parse_json
+from reference_data import ReferenceData
 from recipe_weapon_dialog import RecipeWeaponDialog  # <-- nový dialog pro nastavení zbraně
 
 class CategoryComboBox(QtWidgets.QComboBox):
@@ -20,9 +24,8 @@ class CategoryComboBox(QtWidgets.QComboBox):
         self.setCompleter(self.completer)
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True, buffered=True)
-        cursor.execute("SELECT ID, name FROM recipes_category ORDER BY name")
-        categories = cursor.fetchall()
+        categories = [{'ID': category_id, 'name': name}
+                      for category_id, name in ReferenceData.instance().rows(self.connection, 'recipe_categories')]
         self.categories = categories
         self.categories_names = [category['name'] for category in categories]
         self.clear()
@@ -93,8 +96,7 @@ class RecipeDialog(QtWidgets.QDialog):
         self.connection = connection
         self.recipe_id = recipe_id
         self.copy = copy
-        self.image_cache = {}
-        self.cache_dir = 'cache'
+        self.cache_dir = DEFAULT_CACHE_DIR
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
         self.setWindowTitle("Recept")
@@ -120,11 +122,9 @@ class RecipeDialog(QtWidgets.QDialog):
         return {}
 
     def load_skills(self):
-        """Načte dovednosti ze tabulky `skills` a vrátí je jako seznam."""
-        cursor = self.connection.cursor(dictionary=True, buffered=True)
-        cursor.execute("SELECT name, label FROM skills ORDER BY label")
-        skills = cursor.fetchall()
-        return skills
+        """Vrátí dovednosti z tabulky `skills` (ze sdílené cache číselníků) jako seznam."""
+        return [{'name': name, 'label': label}
+                for name, label in ReferenceData.instance().rows(self.connection, 'skills')]
 
     def init_ui(self):
         layout = QtWidgets.QVBoxLayout()
@@ -374,9 +374,7 @@ class RecipeDialog(QtWidgets.QDialog):
 
             # Načtení skill
             skill = recipe.get('skill', 'crafting')
-            cursor.execute("SELECT label FROM skills WHERE name = %s", (skill,))
-            skill_result = cursor.fetchone()
-            skill_label = skill_result['label'] if skill_result else skill
+            skill_label = ReferenceData.instance().label(self.connection, 'skills', skill) or skill
             index = self.skill_edit.findText(skill_label)
             if index >= 0:
                 self.skill_edit.setCurrentIndex(index)
@@ -388,18 +386,16 @@ class RecipeDialog(QtWidgets.QDialog):
             self.xp_spin.setValue(xp)
 
             # Materiály
-            materials_json = recipe.get('materials') or '{}'
+            materials_data = parse_json(recipe.get('materials'), {}, "materials")
             try:
-                materials_data = json.loads(materials_json)
                 self.materials = [{'item': key, 'count': value} for key, value in materials_data.items()]
-            except json.JSONDecodeError:
+            except AttributeError:
                 self.materials = []
             self.update_materials_list()
 
             # Výsledek
-            result_json = recipe.get('result') or '{}'
+            result_data = parse_json(recipe.get('result'), {}, "result")
             try:
-                result_data = json.loads(result_json)
                 self.result_item = {'item': result_data['item'], 'count': result_data['count']}
                 item_label = self.get_item_label(self.result_item['item']) or self.result_item['item']
                 self.result_item_name.setText(item_label + f" ({self.result_item['item']})")
@@ -409,7 +405,7 @@ class RecipeDialog(QtWidgets.QDialog):
                     self.result_item_image.setPixmap(pixmap)
                 else:
                     self.result_item_image.setText('No Image')
-            except (json.JSONDecodeError, KeyError):
+            except (KeyError, TypeError):
                 self.result_item = None
                 self.result_item_name.setText('')
                 self.result_count.setValue(1)
@@ -443,12 +439,8 @@ class RecipeDialog(QtWidgets.QDialog):
             skill_name = self.skill_edit.itemData(self.skill_edit.currentIndex())
         else:
             # Pokud je zadán vlastní skill, pokusíme se ho najít podle labelu
-            cursor = self.connection.cursor(dictionary=True, buffered=True)
-            cursor.execute("SELECT name FROM skills WHERE label = %s", (skill_label,))
-            result = cursor.fetchone()
-            if result:
-                skill_name = result['name']
-            else:
+            skill_name = ReferenceData.instance().key_for_label(self.connection, 'skills', skill_label)
+            if not skill_name:
                 # Pokud skill neexistuje, zobrazíme chybu
                 QtWidgets.QMessageBox.warning(self, "Chyba", "Zadaná dovednost (skill) není definována v databázi.")
                 return
@@ -495,6 +487,9 @@ class RecipeDialog(QtWidgets.QDialog):
         try:
             cursor.execute(query, params)
             self.connection.commit()
+            if not self.recipe_id:
+                # ID nového receptu si převezme RecipeManager pro obnovení tabulky
+                self.recipe_id = cursor.lastrowid
             self.accept()
         except Exception as err:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání: {err}")
@@ -528,6 +523,7 @@ class RecipeDialog(QtWidgets.QDialog):
 
     def update_materials_list(self):
         self.materials_list.clear()
+        prefetch_item_images([m['item'] for m in self.materials], self.connection)
         for material in self.materials:
             item_label = self.get_item_label(material['item']) or material['item']
             pixmap = self.load_item_image(material['item'])
@@ -555,40 +551,10 @@ class RecipeDialog(QtWidgets.QDialog):
             self.edit_material(list_item)
 
     def load_item_image(self, item_name):
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-        if os.path.exists(cache_file_path):
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            cursor = self.connection.cursor(dictionary=True, buffered=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                print(f"No image found for item {item_name}")
-                pixmap = None
-        return pixmap
+        return load_item_pixmap(item_name, self.cache_dir, self.connection)
 
     def get_item_label(self, item_name):
-        cursor = self.connection.cursor(dictionary=True, buffered=True)
-        cursor.execute("SELECT label FROM items WHERE item = %s", (item_name,))
-        result = cursor.fetchone()
-        if result and result.get('label'):
-            return result['label']
-        else:
-            return None
+        return ReferenceData.instance().item_label(self.connection, item_name) or None
 
     def select_result(self):
         dialog = ItemSelectionDialog(self.connection, single_selection=True)
@@ -633,6 +599,8 @@ class RecipeDialog(QtWidgets.QDialog):
                 """
                 cursor.execute(insert_query, (item_name, label, weight, limit_))
                 self.connection.commit()
+                ImageNameResolver.instance().invalidate(item_name)
+                ReferenceData.instance().refresh_items(self.connection, [item_name])
                 QtWidgets.QMessageBox.information(self, "Úspěch", f"Nový item '{label}' byl vytvořen.")
                 # Nastavíme ho jako výsledek
                 self.result_item = {'item': item_name, 'count': 1}
@@ -679,9 +647,7 @@ class RecipeDialog(QtWidgets.QDialog):
 
             # Načtení skill
             skill = recipe.get('skill', 'crafting')
-            cursor.execute("SELECT label FROM skills WHERE name = %s", (skill,))
-            skill_result = cursor.fetchone()
-            skill_label = skill_result['label'] if skill_result else skill
+            skill_label = ReferenceData.instance().label(self.connection, 'skills', skill) or skill
             index = self.skill_edit.findText(skill_label)
             if index >= 0:
                 self.skill_edit.setCurrentIndex(index)
@@ -693,18 +659,16 @@ class RecipeDialog(QtWidgets.QDialog):
             self.xp_spin.setValue(xp)
 
             # Materiály
-            materials_json = recipe.get('materials') or '{}'
+            materials_data = parse_json(recipe.get('materials'), {}, "materials")
             try:
-                materials_data = json.loads(materials_json)
                 self.materials = [{'item': key, 'count': value} for key, value in materials_data.items()]
-            except json.JSONDecodeError:
+            except AttributeError:
                 self.materials = []
             self.update_materials_list()
 
             # Výsledek
-            result_json = recipe.get('result') or '{}'
+            result_data = parse_json(recipe.get('result'), {}, "result")
             try:
-                result_data = json.loads(result_json)
                 self.result_item = {'item': result_data['item'], 'count': result_data['count']}
                 item_label = self.get_item_label(self.result_item['item']) or self.result_item['item']
                 self.result_item_name.setText(item_label + f" ({self.result_item['item']})")
@@ -714,7 +678,7 @@ class RecipeDialog(QtWidgets.QDialog):
                     self.result_item_image.setPixmap(pixmap)
                 else:
                     self.result_item_image.setText('No Image')
-            except (json.JSONDecodeError, KeyError):
+            except (KeyError, TypeError):
                 self.result_item = None
                 self.result_item_name.setText('')
                 self.result_count.setValue(1)
@@ -748,12 +712,8 @@ class RecipeDialog(QtWidgets.QDialog):
             skill_name = self.skill_edit.itemData(self.skill_edit.currentIndex())
         else:
             # Pokud je zadán vlastní skill, pokusíme se ho najít podle labelu
-            cursor = self.connection.cursor(dictionary=True, buffered=True)
-            cursor.execute("SELECT name FROM skills WHERE label = %s", (skill_label,))
-            result = cursor.fetchone()
-            if result:
-                skill_name = result['name']
-            else:
+            skill_name = ReferenceData.instance().key_for_label(self.connection, 'skills', skill_label)
+            if not skill_name:
                 # Pokud skill neexistuje, zobrazíme chybu
                 QtWidgets.QMessageBox.warning(self, "Chyba", "Zadaná dovednost (skill) není definována v databázi.")
                 return
@@ -800,6 +760,9 @@ class RecipeDialog(QtWidgets.QDialog):
         try:
             cursor.execute(query, params)
             self.connection.commit()
+            if not self.recipe_id:
+                # ID nového receptu si převezme RecipeManager pro obnovení tabulky
+                self.recipe_id = cursor.lastrowid
             self.accept()
         except Exception as err:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání: {err}")
@@ -833,6 +796,7 @@ class RecipeDialog(QtWidgets.QDialog):
 
     def update_materials_list(self):
         self.materials_list.clear()
+        prefetch_item_images([m['item'] for m in self.materials], self.connection)
         for material in self.materials:
             # print(material['item'])
             item_label = self.get_item_label(material['item']) or material['item']
@@ -861,42 +825,10 @@ class RecipeDialog(QtWidgets.QDialog):
             self.edit_material(list_item)
 
     def load_item_image(self, item_name):
-        cache_file_path = os.path.join(self.cache_dir, f"{item_name}.png")
-        if os.path.exists(cache_file_path):
-            pixmap = QtGui.QPixmap(cache_file_path)
-        else:
-            cursor = self.connection.cursor(dictionary=True, buffered=True)
-            cursor.execute("SELECT image FROM items WHERE item = %s", (item_name,))
-            result = cursor.fetchone()
-            if result and result.get('image'):
-                image_file = result['image']
-                url = f"https://api.westhavenrp.cz/storage/items/{image_file}"
-                try:
-                    from urllib.request import urlopen, Request
-                    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                    data = urlopen(req).read()
-                    with open(cache_file_path, 'wb') as f:
-                        f.write(data)
-                    pixmap = QtGui.QPixmap()
-                    pixmap.loadFromData(data)
-                except Exception as e:
-                    print(f"Error loading image for {item_name}: {e}")
-                    pixmap = None
-            else:
-                print(f"No image found for item {item_name}")
-                pixmap = None
-        return pixmap
+        return load_item_pixmap(item_name, self.cache_dir, self.connection)
 
     def get_item_label(self, item_name):
-        cursor = self.connection.cursor(dictionary=True, buffered=True)
-        print(item_name)
-        cursor.execute("SELECT label FROM items WHERE item = %s", (item_name,))
-        result = cursor.fetchone()
-        if result and result.get('label'):
-            return result['label']
-        else:
-            return None
-        # return item_name
+        return ReferenceData.instance().item_label(self.connection, item_name) or None
 
     def select_result(self):
         dialog = ItemSelectionDialog(self.connection, single_selection=True)
@@ -941,6 +873,8 @@ class RecipeDialog(QtWidgets.QDialog):
                 """
                 cursor.execute(insert_query, (item_name, label, weight, limit_))
                 self.connection.commit()
+                ImageNameResolver.instance().invalidate(item_name)
+                ReferenceData.instance().refresh_items(self.connection, [item_name])
                 QtWidgets.QMessageBox.information(self, "Úspěch", f"Nový item '{label}' byl vytvořen.")
                 # Nastavíme ho jako výsledek
                 self.result_item = {'item': item_name, 'count': 1}
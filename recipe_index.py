@@ -0,0 +1,249 @@
+# recipe_index.py
+# Indexy pro rychlé filtrování receptů v RecipeManageru (bez závislosti na Qt).
+#
+# Benchmark:  python recipe_index.py [--recipes 50000]
+import argparse
+import random
+import time
+from array import array
+from collections import defaultdict
+from itertools import compress, repeat
+from operator import contains
+
+FIELD_SEPARATOR = "\n"  # Hledaný text je po strip() bez konců řádků, shoda tak nepřeteče mezi poli
+NGRAM = 3
+
+
+def recipe_haystack(recipe, skill_cache):
+    """Prohledávaný text receptu: název, item, label, skill, XP a materiály (malými písmeny)."""
+    skill_label = skill_cache.get(recipe['skill'], recipe['skill']) or ""
+    return FIELD_SEPARATOR.join((
+        recipe['name'] or "",
+        recipe['item_code'] or "",
+        recipe['label'] or "",
+        skill_label,
+        str(recipe['XP']),
+        recipe.get('materials_str', ""),
+    )).lower()
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def matching_rows(haystacks, rows, query):
+    """Vybere z `rows` řádky, jejichž text obsahuje `query` (smyčka běží v C)."""
+    texts = haystacks if isinstance(rows, range) else map(haystacks.__getitem__, rows)
+    return set(compress(rows, map(contains, texts, repeat(query))))
+
+
+class RecipeSearchIndex:
+    """Index receptů pro hledání podřetězce.
+
+    Při načtení se pro každý recept jednou sestaví text malými písmeny
+    a trigramový index (trigram -> pole čísel řádků). Dotaz pak ověřuje
+    jen kandidáty z nejvzácnějšího trigramu dotazu; krátké nebo příliš
+    obecné dotazy projdou předpočítané texty bez volání Pythonu na řádek.
+    Dopisování dotazu prověřuje jen řádky, které vyhověly minule.
+    """
+
+    def __init__(self):
+        self.haystacks = []
+        self.postings = {}
+        self.last_query = None
+        self.last_rows = None
+
+    def build(self, recipes, skill_cache):
+        self.haystacks = [recipe_haystack(r, skill_cache) for r in recipes]
+        postings = defaultdict(list)
+        for row, haystack in enumerate(self.haystacks):
+            for gram in ngrams(haystack):
+                postings[gram].append(row)
+        self.postings = {gram: array('I', rows) for gram, rows in postings.items()}
+        self.last_query = None
+        self.last_rows = None
+
+    def set_row(self, row, recipe, skill_cache):
+        """Aktualizuje (nebo na konec přidá) jeden recept; None znamená smazaný recept."""
+        haystack = recipe_haystack(recipe, skill_cache) if recipe is not None else ""
+        if row == len(self.haystacks):
+            self.haystacks.append(haystack)
+        else:
+            self.haystacks[row] = haystack
+        # Trigramy původního textu v indexu zůstanou, kandidáty stejně ověřuje `in`
+        for gram in ngrams(haystack):
+            rows = self.postings.get(gram)
+            if rows is None:
+                self.postings[gram] = array('I', [row])
+            elif rows[-1] != row:
+                rows.append(row)
+        self.last_query = None
+        self.last_rows = None
+
+    def search(self, text):
+        """Vrátí množinu indexů receptů, které obsahují `text`, nebo None pro prázdný dotaz."""
+        query = text.strip().lower()
+        if not query:
+            return None
+        if query != self.last_query:
+            self.last_rows = matching_rows(self.haystacks, self.candidates(query), query)
+            self.last_query = query
+        return self.last_rows
+
+    def candidates(self, query):
+        row_count = len(self.haystacks)
+        candidates = range(row_count)
+        if self.last_query and self.last_query in query:
+            # Dotaz se jen prodloužil, výsledek je podmnožinou předchozího
+            candidates = sorted(self.last_rows)
+        if len(query) >= NGRAM:
+            rarest = min((self.postings.get(gram, ()) for gram in ngrams(query)), key=len)
+            if len(rarest) < len(candidates):
+                candidates = rarest
+        return candidates
+
+
+class FacetIndex:
+    """Hodnota jednoho atributu receptu -> množina čísel řádků s touto hodnotou."""
+
+    def __init__(self, key):
+        self.key = key
+        self.buckets = {}
+
+    def build(self, recipes):
+        buckets = defaultdict(set)
+        for row, recipe in enumerate(recipes):
+            buckets[recipe[self.key]].add(row)
+        self.buckets = dict(buckets)
+
+    def rows(self, value):
+        return self.buckets.get(value, set())
+
+    def move(self, row, old_recipe, new_recipe):
+        if old_recipe is not None:
+            bucket = self.buckets.get(old_recipe[self.key])
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self.buckets[old_recipe[self.key]]
+        if new_recipe is not None:
+            self.buckets.setdefault(new_recipe[self.key], set()).add(row)
+
+    def counts(self, rows, all_rows):
+        """Počet řádků z `rows` pro každou hodnotu atributu."""
+        if rows is all_rows:
+            return {value: len(bucket) for value, bucket in self.buckets.items()}
+        return {value: len(bucket & rows) for value, bucket in self.buckets.items()}
+
+
+class RecipeFacets:
+    """Facety receptů (kategorie, typ, prop) pro filtrování průnikem množin.
+
+    Kromě vyfiltrovaných řádků vrací i počty pro každou hodnotu facety,
+    spočítané se všemi ostatními aktivními filtry (hledání i ostatní facety).
+    """
+
+    def __init__(self):
+        self.facets = {
+            'category': FacetIndex('category_id'),
+            'type': FacetIndex('type'),
+            'prop': FacetIndex('prop'),
+        }
+        self.all_rows = set()
+
+    def build(self, recipes):
+        for facet in self.facets.values():
+            facet.build(recipes)
+        self.all_rows = set(range(len(recipes)))
+
+    def values(self, name):
+        return self.facets[name].buckets.keys()
+
+    def set_row(self, row, old_recipe, new_recipe):
+        """Přesune řádek mezi hodnotami facet po úpravě receptu (None = recept neexistuje)."""
+        for facet in self.facets.values():
+            facet.move(row, old_recipe, new_recipe)
+        # Novou množinu místo úpravy na místě: stará může být právě použitá jako výsledek filtru
+        if new_recipe is None:
+            self.all_rows = self.all_rows - {row}
+        else:
+            self.all_rows = self.all_rows | {row}
+
+    def filter(self, base_rows, selection):
+        """Vrátí (řádky, počty) pro výsledek hledání `base_rows` (None = vše) a vybrané hodnoty facet.
+
+        `selection` mapuje název facety na vybranou hodnotu, None znamená bez filtru.
+        Počty jsou {facet: (celkem, {hodnota: počet})}.
+        """
+        all_rows = self.all_rows
+        base = all_rows if base_rows is None else base_rows
+        selected = {name: self.facets[name].rows(value)
+                    for name, value in selection.items() if value is not None}
+
+        counts = {}
+        for name, facet in self.facets.items():
+            others = [rows for other, rows in selected.items() if other != name]
+            facet_base = intersect(base, others)
+            counts[name] = (len(facet_base), facet.counts(facet_base, all_rows))
+        return intersect(base, list(selected.values())), counts
+
+
+def intersect(rows, others):
+    if not others:
+        return rows
+    # Průnik začínáme od nejmenší množiny
+    return set.intersection(*sorted([rows] + others, key=len))
+
+
+def make_sample_recipes(count):
+    words = ["wood", "iron", "coffee", "bread", "meat", "herb", "leather", "nail", "water", "salt"]
+    recipes = []
+    for i in range(count):
+        materials = random.sample(words, 4)
+        recipes.append({
+            'id': i,
+            'name': f"{random.choice(words)} {random.choice(words)} {i}",
+            'category_id': random.randint(1, 30),
+            'type': random.choice(["craft", "cook", "smelt", None]),
+            'prop': random.choice(["p_table", "p_campfire", "p_anvil", None]),
+            'item_code': f"{random.choice(words)}_{i}",
+            'label': f"{random.choice(words).title()} {i}",
+            'skill': random.choice(["crafting", "cooking", None]),
+            'XP': random.randint(0, 50),
+            'materials_str': ", ".join(f"{m}_{i % 97} ({m.title()}): {random.randint(1, 5)}" for m in materials),
+        })
+    return recipes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Změří rychlost hledání v indexu receptů.")
+    parser.add_argument('--recipes', type=int, default=50000, help="počet generovaných receptů")
+    args = parser.parse_args()
+
+    recipes = make_sample_recipes(args.recipes)
+    skills = {'crafting': "Řemeslo", 'cooking': "Vaření"}
+    started = time.perf_counter()
+    index = RecipeSearchIndex()
+    index.build(recipes, skills)
+    print(f"Index pro {len(recipes)} receptů postaven za {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for query in ["c", "co", "cof", "coff", "coffee", "coffee_4", "vaření", "12345", "nothing here"]:
+        started = time.perf_counter()
+        rows = index.search(query)
+        indexed_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        expected = {i for i, r in enumerate(recipes) if query in recipe_haystack(r, skills)}
+        linear_ms = (time.perf_counter() - started) * 1000
+        assert rows == expected, query
+        print(f"{query!r:16} {len(rows):6} řádků  index {indexed_ms:7.2f} ms  (lineárně {linear_ms:7.1f} ms)")
+
+    facets = RecipeFacets()
+    facets.build(recipes)
+    for selection in [{'category': None, 'type': None, 'prop': None},
+                      {'category': 7, 'type': None, 'prop': None},
+                      {'category': 7, 'type': 'cook', 'prop': 'p_anvil'}]:
+        for query in ["", "coffee"]:
+            started = time.perf_counter()
+            rows, counts = facets.filter(index.search(query), selection)
+            facet_ms = (time.perf_counter() - started) * 1000
+            print(f"facety {selection} {query!r:8} {len(rows):6} řádků  {facet_ms:7.2f} ms (včetně počtů)")
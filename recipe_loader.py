@@ -0,0 +1,169 @@
+# recipe_loader.py
+# Načtení receptů pro RecipeManager mimo GUI thread.
+import mysql.connector
+from PyQt5 import QtCore
+
+from db import Database
+from image_store import chunked
+from json_cache import parse_json
+from recipe_index import RecipeSearchIndex, RecipeFacets
+from records import RecipeRecord
+from recipe_store import fetch_recipes
+
+# Levný otisk tabulky receptů pro odhalení změn provedených mimo editor
+RECIPES_CHECKSUM_QUERY = """
+    SELECT COUNT(*) AS count, MAX(id) AS max_id,
+           BIT_XOR(CRC32(CONCAT_WS('|', id, updated_at))) AS crc
+    FROM recipes
+"""
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+def parse_material_codes(materials):
+    mat_dict = parse_json(materials, {}, "materials")
+    return list(mat_dict.keys()) if isinstance(mat_dict, dict) else []
+
+
+def format_materials(materials, item_label_cache):
+    """Materiály receptu jako text "kód (label): množství, ..." pro tabulku a hledání."""
+    mat_dict = parse_json(materials, {}, "materials")
+    if not isinstance(mat_dict, dict):
+        return ""
+    materials_str_parts = []
+    for k, v in mat_dict.items():
+        label = item_label_cache.get(k, "")
+        if label:
+            materials_str_parts.append(f"{k} ({label}): {v}")
+        else:
+            materials_str_parts.append(f"{k}: {v}")
+    return ", ".join(materials_str_parts)
+
+
+def fetch_recipes_checksum(connection):
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(RECIPES_CHECKSUM_QUERY)
+    row = cursor.fetchone()
+    cursor.close()
+    return row['count'], row['max_id'], row['crc']
+
+
+def resolve_labels(cursor, recipes, skill_cache, item_label_cache):
+    """Doplní do cache labely skillů a materiálů receptů, které tam ještě nejsou."""
+    missing_skills = {r['skill'] for r in recipes if r.get('skill') and r['skill'] not in skill_cache}
+    for chunk in chunked(missing_skills):
+        placeholder = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT name, label FROM skills WHERE name IN ({placeholder})", tuple(chunk))
+        for row in cursor.fetchall():
+            skill_cache[row['name']] = row['label']
+
+    missing_codes = set()
+    for r in recipes:
+        missing_codes.update(parse_material_codes(r.get('materials')))
+    missing_codes.difference_update(item_label_cache)
+    for chunk in chunked(missing_codes):
+        placeholder = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"SELECT item, label FROM items WHERE item IN ({placeholder})", tuple(chunk))
+        for row in cursor.fetchall():
+            item_label_cache[row['item']] = row['label']
+
+
+def to_records(recipes, item_label_cache):
+    records = []
+    for r in recipes:
+        r['materials_str'] = format_materials(r.get('materials'), item_label_cache)
+        records.append(RecipeRecord.from_row(r))
+    return records
+
+
+def load_recipes(connection, progress=None, is_cancelled=None):
+    """Načte recepty, labely skillů a materiálů a postaví nad nimi indexy pro filtrování.
+
+    `progress(procenta, popis)` hlásí průběh, `is_cancelled()` umožní načítání
+    mezi kroky přerušit (vyhodí LoadCancelled). Vrací slovník s výsledky.
+    """
+    def step(percent, text):
+        if is_cancelled and is_cancelled():
+            raise LoadCancelled()
+        if progress:
+            progress(percent, text)
+
+    # Otisk bereme před načtením, změna během načítání se tak projeví při další kontrole
+    step(0, "Načítám recepty...")
+    checksum = fetch_recipes_checksum(connection)
+    # Spolu s výslednými itemy, včetně názvů jejich obrázků pro tabulku
+    recipes = fetch_recipes(connection)
+
+    step(30, "Načítám skilly a materiály...")
+    skill_cache = {}
+    item_label_cache = {}
+    cursor = connection.cursor(dictionary=True)
+    resolve_labels(cursor, recipes, skill_cache, item_label_cache)
+    cursor.close()
+
+    # Naparsování materials do řetězce s labely; v paměti zůstanou jen úsporné záznamy
+    step(55, "Zpracovávám materiály...")
+    recipes = to_records(recipes, item_label_cache)
+
+    step(70, "Stavím index pro hledání...")
+    search_index = RecipeSearchIndex()
+    search_index.build(recipes, skill_cache)
+    facets = RecipeFacets()
+    facets.build(recipes)
+    step(100, f"Načteno {len(recipes)} receptů")
+
+    return {
+        'recipes': recipes,
+        'skill_cache': skill_cache,
+        'item_label_cache': item_label_cache,
+        'search_index': search_index,
+        'facets': facets,
+        'checksum': checksum,
+    }
+
+
+def load_recipes_by_id(connection, recipe_ids, skill_cache, item_label_cache):
+    """Načte jen vybrané recepty (po úpravě v editoru); chybějící labely doplní do cache."""
+    if not recipe_ids:
+        return []
+    recipes = fetch_recipes(connection, recipe_ids)
+    cursor = connection.cursor(dictionary=True)
+    resolve_labels(cursor, recipes, skill_cache, item_label_cache)
+    cursor.close()
+    return to_records(recipes, item_label_cache)
+
+
+class RecipeLoadThread(QtCore.QThread):
+    """Spustí load_recipes mimo GUI thread a výsledek pošle signálem.
+
+    Vlákno si z poolu půjčí vlastní spojení a na konci ho vrátí.
+    """
+    progress = QtCore.pyqtSignal(int, str)
+    loaded = QtCore.pyqtSignal(dict)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        database = Database.instance()
+        try:
+            data = load_recipes(database.connection(), self.progress.emit, lambda: self.cancelled)
+        except LoadCancelled:
+            return
+        except mysql.connector.Error as err:
+            self.failed.emit(str(err))
+            return
+        except Exception as err:
+            # Např. vadná data v řádku; bez signálu by editor čekal na výsledek navždy
+            self.failed.emit(f"{type(err).__name__}: {err}")
+            return
+        finally:
+            database.release()
+        self.loaded.emit(data)
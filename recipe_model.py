@@ -0,0 +1,176 @@
+# recipe_model.py
+# Model tabulky receptů pro RecipeManager; view si data tahá jen pro viditelné řádky.
+from PyQt5 import QtGui, QtCore
+
+from image_utils import get_item_thumbnail, prefetch_item_images, ImageService
+
+RECIPE_COLUMNS = [
+    'Obrázek', 'ID', 'Item (Label)', 'Food', 'Housing',
+    'Skill', 'XP', 'Název', 'Typ', 'Kategorie',
+    'Prop', 'Materiály', 'Akce'
+]
+IMAGE_COLUMN = 0
+MATERIALS_COLUMN = 11
+ACTIONS_COLUMN = 12
+IMAGE_REFRESH_DELAY = 50  # ms, hotové náhledy se překreslují hromadně
+
+
+class RecipeTableModel(QtCore.QAbstractTableModel):
+    """Read-only model nad seznamem receptů načteným v RecipeManageru.
+
+    Pod `Qt.UserRole` vrací ID receptu (pro akce, dvojklik a kontextové menu).
+    """
+
+    def __init__(self, cache_dir, connection, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.connection = connection
+        self.recipes = []
+        self.skill_cache = {}
+        self.thumbnails = {}  # item -> (pixmap, placeholder), platí do příštího refresh_images()
+        self.materials_font = QtGui.QFont()
+        self.materials_font.setPointSize(8)
+
+        # Náhledy stažené na pozadí se do tabulky dostanou překreslením sloupce s obrázky
+        self.image_refresh_timer = QtCore.QTimer(self)
+        self.image_refresh_timer.setSingleShot(True)
+        self.image_refresh_timer.setInterval(IMAGE_REFRESH_DELAY)
+        self.image_refresh_timer.timeout.connect(self.refresh_images)
+        ImageService.instance().task_finished.connect(self.schedule_image_refresh)
+
+    def set_recipes(self, recipes, skill_cache):
+        # Názvy obrázků pro všechny recepty dohledáme jedním dotazem
+        prefetch_item_images([r.get('item_code') for r in recipes], self.connection)
+        self.beginResetModel()
+        self.recipes = recipes
+        self.skill_cache = skill_cache
+        self.thumbnails.clear()
+        self.endResetModel()
+
+    def recipe_at(self, row):
+        return self.recipes[row]
+
+    def update_recipe(self, row, recipe):
+        old = self.recipes[row]
+        if old is not None:
+            self.thumbnails.pop(old.get('item_code'), None)
+        self.thumbnails.pop(recipe.get('item_code'), None)
+        self.recipes[row] = recipe
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(RECIPE_COLUMNS) - 1))
+
+    def append_recipe(self, recipe):
+        row = len(self.recipes)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.recipes.append(recipe)
+        self.endInsertRows()
+        return row
+
+    def remove_recipe(self, row):
+        # Řádek zůstane jako prázdné místo, aby se neposunula čísla řádků v indexech;
+        # filtr ho už nepropustí a při příštím úplném načtení zmizí
+        self.recipes[row] = None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.recipes)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(RECIPE_COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return RECIPE_COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        recipe = self.recipes[index.row()]
+        if recipe is None:
+            return None
+        column = index.column()
+
+        if role == QtCore.Qt.DisplayRole:
+            if column == IMAGE_COLUMN:
+                return self.thumbnail(recipe)[1]
+            return self.display_text(recipe, column)
+        if role == QtCore.Qt.DecorationRole and column == IMAGE_COLUMN:
+            return self.thumbnail(recipe)[0]
+        if role == QtCore.Qt.UserRole:
+            return recipe['id']
+        if role == QtCore.Qt.FontRole and column == MATERIALS_COLUMN:
+            return self.materials_font
+        if role == QtCore.Qt.TextAlignmentRole and column == IMAGE_COLUMN:
+            return QtCore.Qt.AlignCenter
+        return None
+
+    def thumbnail(self, recipe):
+        """(pixmap, placeholder) pro item receptu, zjištěné jednou pro DisplayRole i DecorationRole."""
+        item_code = recipe.get('item_code')
+        if not item_code:
+            return None, "No Image"
+        thumbnail = self.thumbnails.get(item_code)
+        if thumbnail is None:
+            thumbnail = self.thumbnails[item_code] = get_item_thumbnail(item_code, self.cache_dir, self.connection)
+        return thumbnail
+
+    def display_text(self, recipe, column):
+        if column == 1:
+            return str(recipe['id'])
+        if column == 2:
+            item_code = recipe.get('item_code')
+            item_label = recipe.get('label')
+            if item_code and item_label:
+                return f"{item_code} ({item_label})"
+            return item_code or ""
+        if column == 3:
+            return "Ano" if recipe.get('is_consumable', 0) else "Ne"
+        if column == 4:
+            return "Ano" if recipe.get('is_housing_prop', 0) else "Ne"
+        if column == 5:
+            return self.skill_cache.get(recipe.get('skill'), recipe.get('skill') or "")
+        if column == 6:
+            return str(recipe.get('XP', 0))
+        if column == 7:
+            return recipe['name'] or ""
+        if column == 8:
+            return recipe['type'] or ""
+        if column == 9:
+            return recipe['category_name'] or ""
+        if column == 10:
+            return recipe['prop'] or ""
+        if column == MATERIALS_COLUMN:
+            return recipe.get('materials_str', "")
+        return None
+
+    def schedule_image_refresh(self):
+        if not self.image_refresh_timer.isActive():
+            self.image_refresh_timer.start()
+
+    def refresh_images(self):
+        # Doběhlé náhledy (a ověřené obrázky) se zjistí znovu při dalším vykreslení
+        self.thumbnails.clear()
+        if self.recipes:
+            self.dataChanged.emit(self.index(0, IMAGE_COLUMN), self.index(len(self.recipes) - 1, IMAGE_COLUMN),
+                                  [QtCore.Qt.DisplayRole, QtCore.Qt.DecorationRole])
+
+
+class RecipeFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Propouští jen řádky zdrojového modelu z množiny `accepted_rows` (None = všechny).
+
+    Změna filtru tak znamená jen přepočet mapování řádků, ne nové sestavení tabulky.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.accepted_rows = None
+
+    def set_accepted_rows(self, rows):
+        if rows == self.accepted_rows:
+            return
+        self.accepted_rows = rows
+        # invalidate() mapování zahodí a postaví znovu; invalidateFilter() by při
+        # roztroušených řádcích hlásil view každý odebraný úsek zvlášť (sekundy u 50k řádků)
+        self.invalidate()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.accepted_rows is None or source_row in self.accepted_rows
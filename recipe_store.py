@@ -0,0 +1,163 @@
+# recipe_store.py
+# Sdílené načítání receptů bez závislosti na Qt (používá ho editor i exporter).
+#
+# Benchmark proti původnímu dotazu:  python recipe_store.py [--repeat 5]
+import argparse
+import json
+import os
+import time
+
+from image_store import ImageNameResolver, chunked
+from json_cache import parse_json
+
+# Jen jednoduché dotazy nad indexy; výsledný item se k receptu připojí v Pythonu
+RECIPES_QUERY = """
+    SELECT
+        r.id,
+        r.name,
+        r.type,
+        r.prop,
+        r.triggerItem,
+        r.materials,
+        r.meta,
+        r.category_id,
+        rc.name AS category_name,
+        r.result,
+        r.skill,
+        r.XP
+    FROM recipes r
+    LEFT JOIN recipes_category rc ON r.category_id = rc.ID
+"""
+
+RESULT_ITEMS_QUERY = """
+    SELECT
+        i.item,
+        i.label,
+        i.image,
+        CASE WHEN c.item IS NOT NULL THEN 1 ELSE 0 END AS is_consumable,
+        CASE WHEN h.item IS NOT NULL THEN 1 ELSE 0 END AS is_housing_prop
+    FROM items i
+    LEFT JOIN aprts_consumable c ON c.item = i.item
+    LEFT JOIN aprts_housing_props h ON h.item = i.item
+    WHERE i.item IN ({placeholder})
+"""
+
+# Původní dotaz s joinem přes JSON_EXTRACT, jen pro srovnání v benchmarku
+JSON_JOIN_QUERY = """
+    SELECT
+        r.id, r.name, r.type, r.prop, r.triggerItem, r.materials, r.meta,
+        r.category_id, rc.name AS category_name, r.result, r.skill, r.XP,
+        i.item AS item_code,
+        i.label,
+        i.image,
+        CASE WHEN c.item IS NOT NULL THEN 1 ELSE 0 END AS is_consumable,
+        CASE WHEN h.item IS NOT NULL THEN 1 ELSE 0 END AS is_housing_prop
+    FROM recipes r
+    LEFT JOIN recipes_category rc ON r.category_id = rc.ID
+    LEFT JOIN items i ON JSON_UNQUOTE(JSON_EXTRACT(r.result, '$.item')) = i.item
+    LEFT JOIN aprts_consumable c ON c.item = i.item
+    LEFT JOIN aprts_housing_props h ON h.item = i.item
+"""
+
+
+def parse_result_item(result):
+    """Kód výsledného itemu z JSONu `result` receptu, None pokud chybí nebo je JSON vadný."""
+    result = parse_json(result, None, "result")
+    item = result.get('item') if isinstance(result, dict) else None
+    return item if isinstance(item, str) else None
+
+
+def fetch_result_items(connection, item_codes):
+    """Slovník item -> řádek (label, image, is_consumable, is_housing_prop) po dávkách WHERE IN."""
+    items = {}
+    codes = {code for code in item_codes if code}
+    if not codes:
+        return items
+    cursor = connection.cursor(dictionary=True)
+    for chunk in chunked(codes):
+        placeholder = ", ".join(["%s"] * len(chunk))
+        cursor.execute(RESULT_ITEMS_QUERY.format(placeholder=placeholder), tuple(chunk))
+        for row in cursor.fetchall():
+            items[row['item']] = row
+    cursor.close()
+    return items
+
+
+def fetch_recipes(connection, recipe_ids=None):
+    """Načte recepty (všechny, nebo jen `recipe_ids`) i s údaji o výsledném itemu.
+
+    Každý recept dostane `result_item` (kód z JSONu `result`) a z tabulky items
+    `item_code`, `label`, `image`, `is_consumable` a `is_housing_prop`; pokud item
+    v DB není, jsou `item_code`, `label` a `image` None, stejně jako u LEFT JOINu.
+    """
+    cursor = connection.cursor(dictionary=True)
+    if recipe_ids is None:
+        cursor.execute(RECIPES_QUERY)
+        recipes = cursor.fetchall()
+    else:
+        recipes = []
+        for chunk in chunked(recipe_ids):
+            placeholder = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"{RECIPES_QUERY} WHERE r.id IN ({placeholder})", tuple(chunk))
+            recipes.extend(cursor.fetchall())
+    cursor.close()
+
+    for r in recipes:
+        r['result_item'] = parse_result_item(r['result'])
+    items = fetch_result_items(connection, [r['result_item'] for r in recipes])
+    missing = {'item': None, 'label': None, 'image': None, 'is_consumable': 0, 'is_housing_prop': 0}
+    for r in recipes:
+        item = items.get(r['result_item'], missing)
+        r['item_code'] = item['item']
+        r['label'] = item['label']
+        r['image'] = item['image']
+        r['is_consumable'] = item['is_consumable']
+        r['is_housing_prop'] = item['is_housing_prop']
+
+    # Názvy obrázků máme z dotazu na itemy, resolver je nemusí dotazovat znovu
+    ImageNameResolver.instance().remember({code: item['image'] for code, item in items.items()})
+    return recipes
+
+
+if __name__ == '__main__':
+    import mysql.connector
+
+    parser = argparse.ArgumentParser(description="Porovná načtení receptů joinem přes JSON_EXTRACT a v Pythonu.")
+    parser.add_argument('--repeat', type=int, default=5, help="počet opakování každého způsobu")
+    args = parser.parse_args()
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json'), 'r', encoding='utf-8') as f:
+        mysql_config = json.load(f)['mysql']
+    connection = mysql.connector.connect(
+        host=mysql_config['host'],
+        user=mysql_config['user'],
+        password=mysql_config['password'],
+        database=mysql_config['database']
+    )
+
+    def measure(load):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            rows = load()
+            timings.append((time.perf_counter() - started) * 1000)
+        return rows, min(timings)
+
+    def load_json_join():
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(JSON_JOIN_QUERY)
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+
+    joined, json_join_ms = measure(load_json_join)
+    recipes, python_join_ms = measure(lambda: fetch_recipes(connection))
+
+    compared = ('item_code', 'label', 'image', 'is_consumable', 'is_housing_prop')
+    expected = {r['id']: tuple(r[key] for key in compared) for r in joined}
+    actual = {r['id']: tuple(r[key] for key in compared) for r in recipes}
+    assert expected == actual, "výsledky obou způsobů se liší"
+    print(f"{len(recipes)} receptů, nejlepší z {args.repeat} běhů:")
+    print(f"  JSON_EXTRACT join  {json_join_ms:8.1f} ms")
+    print(f"  join v Pythonu     {python_join_ms:8.1f} ms")
+    connection.close()
@@ -0,0 +1,164 @@
+# records.py
+# Úsporné záznamy načtených receptů a položek (bez závislosti na Qt).
+#
+# Benchmark paměti:  python records.py [--items 100000] [--recipes 20000]
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+
+# Sloupce, ve kterých se opakuje pár stejných hodnot; v paměti pak zůstane každá jen jednou
+INTERNED_RECIPE_FIELDS = frozenset(('type', 'prop', 'category_name', 'skill'))
+
+ITEM_RECORD_QUERY = "SELECT item, label, image, weight, `limit` FROM items"
+
+
+def intern_text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Record:
+    """Základ záznamů se __slots__; čte se atributy, kvůli starému kódu i jako slovník."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class RecipeRecord(Record):
+    """Recept v tabulce RecipeManageru.
+
+    Drží jen to, co zobrazuje tabulka a prohledávají indexy. Surové JSON sloupce
+    (materials, result, meta) si nenechává, dialog receptu je načítá až při otevření.
+    """
+    __slots__ = ('id', 'name', 'type', 'prop', 'category_id', 'category_name', 'skill', 'XP',
+                 'result_item', 'item_code', 'label', 'is_consumable', 'is_housing_prop', 'materials_str')
+
+    @classmethod
+    def from_row(cls, row):
+        record = cls.__new__(cls)
+        for field in cls.__slots__:
+            value = row.get(field)
+            if field in INTERNED_RECIPE_FIELDS:
+                value = intern_text(value)
+            setattr(record, field, value)
+        if record.materials_str is None:
+            record.materials_str = ""
+        return record
+
+
+class ItemRecord(Record):
+    """Položka v seznamu ItemManageru; metadata a popis načítá až ItemDialog."""
+    __slots__ = ('item', 'label', 'image', 'weight', 'limit')
+
+    def __init__(self, item, label, image=None, weight=None, limit=None):
+        self.item = item
+        self.label = label
+        self.image = image
+        self.weight = weight
+        self.limit = limit
+
+
+def load_item_records(connection):
+    """Všechny položky jako {item: ItemRecord}, bez metadat a popisu."""
+    cursor = connection.cursor()
+    cursor.execute(ITEM_RECORD_QUERY)
+    items = {row[0]: ItemRecord(*row) for row in cursor.fetchall()}
+    cursor.close()
+    return items
+
+
+def make_sample_rows(item_count, recipe_count):
+    """Řádky, jak je vrací cursor(dictionary=True): každý řetězec je samostatný objekt."""
+    def text(value):
+        return value.encode().decode()
+
+    words = ["wood", "iron", "coffee", "bread", "meat", "herb", "leather", "nail", "water", "salt"]
+    categories = [f"Kategorie {i}" for i in range(30)]
+    items = []
+    for i in range(item_count):
+        metadata = {"description": " ".join(random.choices(words, k=40)), "durability": random.randint(1, 100)}
+        items.append({
+            'item': f"{random.choice(words)}_{i}",
+            'label': f"{random.choice(words).title()} {i}",
+            'image': f"{random.choice(words)}_{i}.png",
+            'weight': random.random(),
+            'limit': random.randint(1, 100),
+            'desc': " ".join(random.choices(words, k=20)),
+            'metadata': str(metadata),
+        })
+    recipes = []
+    for i in range(recipe_count):
+        materials = {f"{m}_{i % 97}": random.randint(1, 5) for m in random.sample(words, 4)}
+        item = f"{random.choice(words)}_{i}"
+        recipes.append({
+            'id': i,
+            'name': f"{random.choice(words)} {random.choice(words)} {i}",
+            'type': text(random.choice(["craft", "cook", "smelt", "near_prop"])),
+            'prop': text(random.choice(["p_table", "p_campfire", "p_anvil", ""])),
+            'triggerItem': None,
+            'materials': str(materials),
+            'meta': str({"description": " ".join(random.choices(words, k=30))}),
+            'category_id': i % 30,
+            'category_name': text(categories[i % 30]),
+            'result': str({"item": item, "count": 1}),
+            'skill': text(random.choice(["crafting", "cooking", "smithing"])),
+            'XP': random.randint(0, 50),
+            'result_item': item,
+            'item_code': item,
+            'label': f"{item.title()}",
+            'image': f"{item}.png",
+            'is_consumable': 0,
+            'is_housing_prop': 0,
+            'materials_str': ", ".join(f"{k}: {v}" for k, v in materials.items()),
+        })
+    return items, recipes
+
+
+def measure(build):
+    """Vrátí (výsledek, velikost v MB) toho, co po `build()` zůstane v paměti."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    tracemalloc.stop()
+    return result, size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Změří paměť načtených položek a receptů jako slovníky a jako záznamy.")
+    parser.add_argument('--items', type=int, default=100000, help="počet generovaných položek")
+    parser.add_argument('--recipes', type=int, default=20000, help="počet generovaných receptů")
+    args = parser.parse_args()
+
+    random.seed(1)
+    (items, recipes), dict_mb = measure(lambda: make_sample_rows(args.items, args.recipes))
+    random.seed(1)
+
+    def build_records():
+        item_rows, recipe_rows = make_sample_rows(args.items, args.recipes)
+        item_records = {row['item']: ItemRecord(row['item'], row['label'], row['image'], row['weight'], row['limit'])
+                        for row in item_rows}
+        recipe_records = [RecipeRecord.from_row(row) for row in recipe_rows]
+        return item_records, recipe_records
+
+    (item_records, recipe_records), record_mb = measure(build_records)
+    assert len(item_records) == len(items) and len(recipe_records) == len(recipes)
+    print(f"{args.items} položek a {args.recipes} receptů:")
+    print(f"  slovníky z cursoru  {dict_mb:8.1f} MB")
+    print(f"  záznamy se slots    {record_mb:8.1f} MB  ({(1 - record_mb / dict_mb) * 100:.0f} % méně)")
@@ -0,0 +1,114 @@
+# reference_data.py
+# Sdílená cache číselníků (položky, dovednosti, kategorie) pro všechny dialogy (bez závislosti na Qt).
+import threading
+
+from image_store import chunked
+from records import ItemRecord, ITEM_RECORD_QUERY, load_item_records
+
+# Malé číselníky: název -> dotaz vracející (klíč, název) v pořadí pro comboboxy
+REFERENCE_QUERIES = {
+    'skills': "SELECT name, label FROM skills ORDER BY label",
+    'recipe_categories': "SELECT ID, name FROM recipes_category ORDER BY name",
+    'store_categories': "SELECT id, name FROM aprts_store_item_categories ORDER BY name",
+    'housing_categories': "SELECT id, name FROM aprts_housing_category ORDER BY name",
+}
+
+
+class ReferenceTable:
+    """Načtený číselník: řádky v pořadí z DB a slovníky pro hledání oběma směry."""
+
+    def __init__(self, rows):
+        self.rows = [tuple(row) for row in rows]  # [(klíč, název)]
+        self.labels = dict(self.rows)
+        self.keys = {}
+        for key, label in self.rows:
+            self.keys.setdefault(label, key)
+
+
+class ReferenceData:
+    """Číselníky načtené jednou za běh editoru.
+
+    Dialogy z ní berou dovednosti, kategorie a názvy položek místo
+    dotazu do DB při každém otevření. Kdo do těchto tabulek zapisuje,
+    po commitu zavolá invalidate() (malé číselníky se při dalším čtení
+    načtou znovu) nebo refresh_items() (přenačtou se jen změněné položky).
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables = {}  # název číselníku -> ReferenceTable
+        self.item_records = None  # item -> ItemRecord, None = ještě nenačteno
+
+    def table(self, connection, name):
+        with self.lock:
+            table = self.tables.get(name)
+            if table is None:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(REFERENCE_QUERIES[name])
+                    table = self.tables[name] = ReferenceTable(cursor.fetchall())
+                finally:
+                    cursor.close()
+            return table
+
+    def rows(self, connection, name):
+        """[(klíč, název)] číselníku `name` seřazené jako v REFERENCE_QUERIES."""
+        return list(self.table(connection, name).rows)
+
+    def label(self, connection, name, key, default=None):
+        return self.table(connection, name).labels.get(key, default)
+
+    def key_for_label(self, connection, name, label, default=None):
+        return self.table(connection, name).keys.get(label, default)
+
+    def items(self, connection):
+        """{item: ItemRecord} všech položek; slovník je sdílený, neměnit ho."""
+        with self.lock:
+            if self.item_records is None:
+                self.item_records = load_item_records(connection)
+            return self.item_records
+
+    def item(self, connection, item_code):
+        return self.items(connection).get(item_code)
+
+    def item_label(self, connection, item_code):
+        record = self.item(connection, item_code)
+        return record.label if record else None
+
+    def refresh_items(self, connection, item_codes):
+        """Přenačte z DB jen dané položky (po INSERT/UPDATE/DELETE v items)."""
+        with self.lock:
+            if self.item_records is None:
+                return
+            item_codes = list(item_codes)
+            records = dict(self.item_records)
+            for code in item_codes:
+                records.pop(code, None)
+            cursor = connection.cursor()
+            try:
+                for chunk in chunked(item_codes):
+                    placeholder = ", ".join(["%s"] * len(chunk))
+                    cursor.execute(f"{ITEM_RECORD_QUERY} WHERE item IN ({placeholder})", tuple(chunk))
+                    records.update((row[0], ItemRecord(*row)) for row in cursor.fetchall())
+            finally:
+                cursor.close()
+            # Nový slovník místo úprav na místě: kdo právě iteruje ten starý, nespadne
+            self.item_records = records
+
+    def invalidate(self, name=None):
+        """Zapomene číselník `name` ('items' pro položky), bez parametru všechno."""
+        with self.lock:
+            if name is None:
+                self.tables.clear()
+                self.item_records = None
+            elif name == 'items':
+                self.item_records = None
+            else:
+                self.tables.pop(name, None)
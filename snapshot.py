@@ -0,0 +1,541 @@
+# snapshot.py
+# Offline snapshot databáze editoru v lokálním SQLite souboru a spojení jen pro čtení nad ním (bez závislosti na Qt).
+#
+# Použití:  python snapshot.py [--path snapshot.sqlite] [--full]
+import argparse
+import datetime
+import decimal
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+
+import mysql.connector
+
+from image_store import chunked
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+config_path = os.path.join(BASE_DIR, 'config.json')
+DEFAULT_SNAPSHOT_PATH = os.path.join(BASE_DIR, 'snapshot.sqlite')
+# Tabulky, které editor čte; k nim všechny tabulky s prefixem z SNAPSHOT_TABLE_PREFIXES
+SNAPSHOT_TABLES = ('items', 'recipes', 'recipes_category', 'skills', 'books')
+SNAPSHOT_TABLE_PREFIXES = ('aprts_',)
+SNAPSHOT_CHUNK = 2000  # Řádků na jedno fetchmany() při kopírování z MySQL
+SNAPSHOT_BUCKETS = 1024  # Na kolik skupin se řádky tabulky dělí při hledání změn
+BUCKET_COLUMN = '_snapshot_bucket'
+DATA_TABLE_PREFIX = '_snapshot_data_'
+# Dotazy, na které snapshot umí odpovědět; ostatní (zápisy, SHOW...) skončí chybou
+SNAPSHOT_STATEMENTS = ('SELECT', 'WITH')
+PARAM_PATTERN = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+
+def translate_placeholders(operation):
+    """Převede placeholdery mysql.connector na sqlite3: %s -> ?, %(name)s -> :name, %% -> %.
+
+    Stejně jako mysql.connector se volá jen pro dotazy s parametry; bez nich zůstává %% beze změny.
+    """
+    def replace(match):
+        if match.group(1) is not None:
+            return f":{match.group(1)}"
+        return '?' if match.group(0) == '%s' else '%'
+    return PARAM_PATTERN.sub(replace, operation)
+
+
+META_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS _snapshot_info (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS _snapshot_tables (
+        name TEXT PRIMARY KEY, columns TEXT NOT NULL, row_count INTEGER, refreshed_at TEXT);
+    CREATE TABLE IF NOT EXISTS _snapshot_buckets (
+        name TEXT NOT NULL, bucket INTEGER NOT NULL, row_count INTEGER NOT NULL, checksum TEXT NOT NULL,
+        PRIMARY KEY (name, bucket));
+"""
+
+# Hodnoty z mysql.connector, které sqlite3 neumí uložit samo
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime.timedelta, str)
+sqlite3.register_adapter(set, lambda value: ','.join(sorted(value)))
+
+
+class SnapshotReadOnlyError(mysql.connector.errors.DatabaseError):
+    """Pokus o zápis (nebo nepodporovaný příkaz) v offline režimu.
+
+    Je to mysql.connector.Error, takže ho dialogy zobrazí stejně
+    jako jakoukoli jinou chybu databáze.
+    """
+
+
+def now_text():
+    return datetime.datetime.now().isoformat(' ', 'seconds')
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def as_text(value):
+    """information_schema vrací podle verze konektoru str i bytes."""
+    return value.decode() if isinstance(value, (bytes, bytearray)) else value
+
+
+def sqlite_type(mysql_type):
+    """Typ sloupce v SQLite podle DATA_TYPE z MySQL (jen afinita a porovnávání bez velikosti písmen)."""
+    mysql_type = mysql_type.lower()
+    if 'int' in mysql_type or mysql_type in ('bit', 'year'):
+        return 'INTEGER'
+    if mysql_type in ('decimal', 'numeric', 'float', 'double', 'real'):
+        return 'REAL'
+    if 'blob' in mysql_type or 'binary' in mysql_type:
+        return 'BLOB'
+    # MySQL porovnává texty s *_ci collation bez ohledu na velikost písmen
+    return 'TEXT COLLATE NOCASE'
+
+
+def is_snapshot_table(name):
+    return name in SNAPSHOT_TABLES or name.startswith(SNAPSHOT_TABLE_PREFIXES)
+
+
+class TableSchema:
+    """Sloupce, primární klíč a indexy jedné tabulky v MySQL."""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = []  # [(název, DATA_TYPE)]
+        self.primary_key = []
+        self.indexes = {}  # název indexu -> [sloupce]
+
+    def signature(self):
+        """Při změně sloupců nebo klíče se tabulka ve snapshotu vytvoří znovu."""
+        return json.dumps({'columns': self.columns, 'primary_key': self.primary_key})
+
+    def mysql_columns(self):
+        return ", ".join(f"`{column}`" for column, _ in self.columns)
+
+    def bucket_expression(self):
+        """Skupina řádku v MySQL: podle primárního klíče, bez něj podle celého řádku."""
+        key = [f"`{column}`" for column in self.primary_key] or self.row_parts()
+        return f"CRC32(CONCAT_WS('|', {', '.join(key)})) % {SNAPSHOT_BUCKETS}"
+
+    def row_parts(self):
+        # CONCAT_WS NULL přeskakuje, ISNULL odliší NULL od prázdného textu
+        return [f"`{column}`, ISNULL(`{column}`)" for column, _ in self.columns]
+
+    def checksum_query(self):
+        return (f"SELECT {self.bucket_expression()} AS bucket, COUNT(*) AS row_count, "
+                f"SUM(CRC32(CONCAT_WS('|', {', '.join(self.row_parts())}))) AS checksum "
+                f"FROM `{self.name}` GROUP BY bucket")
+
+    def select_query(self, where=""):
+        return f"SELECT {self.mysql_columns()}, {self.bucket_expression()} FROM `{self.name}` {where}"
+
+
+def load_schemas(mysql_connection):
+    """{tabulka: TableSchema} pro všechny tabulky snapshotu ve výchozí databázi spojení."""
+    cursor = mysql_connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE
+            FROM information_schema.COLUMNS c
+            JOIN information_schema.TABLES t
+              ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+            WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+            ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+        """)
+        schemas = {}
+        for table, column, data_type in cursor.fetchall():
+            table = as_text(table)
+            if is_snapshot_table(table):
+                schemas.setdefault(table, TableSchema(table)).columns.append((as_text(column), as_text(data_type)))
+        cursor.execute("""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'BTREE' AND COLUMN_NAME IS NOT NULL
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """)
+        for table, index, column in cursor.fetchall():
+            schema = schemas.get(as_text(table))
+            if schema is None:
+                continue
+            if as_text(index) == 'PRIMARY':
+                schema.primary_key.append(as_text(column))
+            else:
+                schema.indexes.setdefault(as_text(index), []).append(as_text(column))
+    finally:
+        cursor.close()
+    return schemas
+
+
+@contextmanager
+def transaction(connection):
+    """Explicitní transakce i pro CREATE/DROP, ať čtenáři nikdy nevidí tabulku napůl obnovenou."""
+    connection.execute("BEGIN")
+    try:
+        yield connection
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+
+
+def open_snapshot_for_writing(path):
+    connection = sqlite3.connect(path, isolation_level=None)
+    # WAL: editor může ze snapshotu číst i během obnovy
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(META_SCHEMA)
+    return connection
+
+
+def stream_rows(mysql_connection, query, params=None):
+    """Řádky dotazu po dávkách SNAPSHOT_CHUNK, bez načtení celé tabulky do paměti."""
+    cursor = mysql_connection.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(SNAPSHOT_CHUNK)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def fetch_buckets(mysql_connection, schema):
+    """{skupina: (počet řádků, součet CRC32 řádků)} tabulky v MySQL."""
+    cursor = mysql_connection.cursor()
+    try:
+        cursor.execute(schema.checksum_query())
+        return {int(bucket): (int(count), str(int(checksum))) for bucket, count, checksum in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+class SnapshotWriter:
+    """Kopíruje tabulky z MySQL do snapshotu a při obnově stahuje jen změněné řádky.
+
+    Řádky každé tabulky jsou rozdělené do SNAPSHOT_BUCKETS skupin podle
+    CRC32 primárního klíče. Snapshot si pamatuje počet řádků a součet CRC32
+    obsahu každé skupiny; obnova se zeptá MySQL jedním agregačním dotazem na
+    aktuální hodnoty a znovu stáhne jen skupiny, které se liší. Tím se
+    podchytí nové, změněné i smazané řádky i v tabulkách bez `updated_at`.
+    Data jsou v tabulce _snapshot_data_<název> a editor je čte přes pohled
+    se jménem původní tabulky, který sloupec se skupinou skrývá.
+    """
+
+    def __init__(self, mysql_connection, sqlite_connection):
+        self.mysql = mysql_connection
+        self.sqlite = sqlite_connection
+
+    def stored_signature(self, name):
+        row = self.sqlite.execute("SELECT columns FROM _snapshot_tables WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def stored_buckets(self, name):
+        rows = self.sqlite.execute(
+            "SELECT bucket, row_count, checksum FROM _snapshot_buckets WHERE name = ?", (name,))
+        return {bucket: (count, checksum) for bucket, count, checksum in rows}
+
+    def refresh_table(self, schema, full=False):
+        """Obnoví jednu tabulku v jedné transakci; vrací počet stažených řádků."""
+        # Otisk skupin se bere před daty: co se změní mezi tím, obnova příště stáhne znovu
+        buckets = fetch_buckets(self.mysql, schema)
+        with transaction(self.sqlite):
+            if full or self.stored_signature(schema.name) != schema.signature():
+                self.create_table(schema)
+                fetched = self.copy_rows(schema, schema.select_query())
+            else:
+                stored = self.stored_buckets(schema.name)
+                changed = sorted(bucket for bucket in set(buckets) | set(stored)
+                                 if buckets.get(bucket) != stored.get(bucket))
+                fetched = 0
+                for chunk in chunked(changed):
+                    placeholder = ", ".join(["?"] * len(chunk))
+                    self.sqlite.execute(
+                        f"DELETE FROM {quote_identifier(DATA_TABLE_PREFIX + schema.name)} "
+                        f"WHERE {BUCKET_COLUMN} IN ({placeholder})", chunk)
+                    fetched += self.copy_rows(
+                        schema, schema.select_query(f"WHERE {schema.bucket_expression()} IN "
+                                                    f"({', '.join(['%s'] * len(chunk))})"), tuple(chunk))
+            self.sqlite.execute("DELETE FROM _snapshot_buckets WHERE name = ?", (schema.name,))
+            self.sqlite.executemany(
+                "INSERT INTO _snapshot_buckets (name, bucket, row_count, checksum) VALUES (?, ?, ?, ?)",
+                [(schema.name, bucket, count, checksum) for bucket, (count, checksum) in buckets.items()])
+            self.sqlite.execute(
+                "INSERT OR REPLACE INTO _snapshot_tables (name, columns, row_count, refreshed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (schema.name, schema.signature(), sum(count for count, _ in buckets.values()), now_text()))
+        return fetched
+
+    def create_table(self, schema):
+        data_table = quote_identifier(DATA_TABLE_PREFIX + schema.name)
+        self.drop_table(schema.name)
+        columns = [f"{quote_identifier(column)} {sqlite_type(data_type)}" for column, data_type in schema.columns]
+        columns.append(f"{BUCKET_COLUMN} INTEGER NOT NULL")
+        if schema.primary_key:
+            columns.append(f"PRIMARY KEY ({', '.join(map(quote_identifier, schema.primary_key))})")
+        self.sqlite.execute(f"CREATE TABLE {data_table} ({', '.join(columns)})")
+        self.sqlite.execute(f"CREATE INDEX {quote_identifier(DATA_TABLE_PREFIX + schema.name + '__bucket')} "
+                            f"ON {data_table} ({BUCKET_COLUMN})")
+        for index, index_columns in schema.indexes.items():
+            self.sqlite.execute(
+                f"CREATE INDEX {quote_identifier(DATA_TABLE_PREFIX + schema.name + '__' + index)} "
+                f"ON {data_table} ({', '.join(map(quote_identifier, index_columns))})")
+        self.sqlite.execute(
+            f"CREATE VIEW {quote_identifier(schema.name)} AS SELECT "
+            f"{', '.join(quote_identifier(column) for column, _ in schema.columns)} FROM {data_table}")
+
+    def drop_table(self, name):
+        self.sqlite.execute(f"DROP VIEW IF EXISTS {quote_identifier(name)}")
+        self.sqlite.execute(f"DROP TABLE IF EXISTS {quote_identifier(DATA_TABLE_PREFIX + name)}")
+        self.sqlite.execute("DELETE FROM _snapshot_buckets WHERE name = ?", (name,))
+        self.sqlite.execute("DELETE FROM _snapshot_tables WHERE name = ?", (name,))
+
+    def copy_rows(self, schema, query, params=None):
+        columns = [column for column, _ in schema.columns] + [BUCKET_COLUMN]
+        insert = (f"INSERT OR REPLACE INTO {quote_identifier(DATA_TABLE_PREFIX + schema.name)} "
+                  f"({', '.join(map(quote_identifier, columns))}) VALUES ({', '.join(['?'] * len(columns))})")
+        copied = 0
+        for rows in stream_rows(self.mysql, query, params):
+            self.sqlite.executemany(insert, rows)
+            copied += len(rows)
+        return copied
+
+    def stored_tables(self):
+        return [name for name, in self.sqlite.execute("SELECT name FROM _snapshot_tables")]
+
+
+def refresh_snapshot(mysql_connection, path=DEFAULT_SNAPSHOT_PATH, full=False, progress=None, is_cancelled=None):
+    """Vytvoří nebo obnoví snapshot v souboru `path`; vrací slovník se statistikou.
+
+    `full=True` zkopíruje všechny tabulky celé. `progress(hotovo, celkem, tabulka)`
+    se volá po každé tabulce, `is_cancelled()` umožní obnovu přerušit
+    (hotové tabulky zůstanou obnovené, ostatní v předchozím stavu).
+    """
+    started = time.monotonic()
+    schemas = load_schemas(mysql_connection)
+    sqlite_connection = open_snapshot_for_writing(path)
+    writer = SnapshotWriter(mysql_connection, sqlite_connection)
+    stats = {'tables': len(schemas), 'fetched': 0, 'changed_tables': [], 'dropped': [], 'cancelled': False}
+    try:
+        # Tabulky, které v MySQL zmizely, nemají ve snapshotu co dělat
+        with transaction(sqlite_connection):
+            for name in writer.stored_tables():
+                if name not in schemas:
+                    writer.drop_table(name)
+                    stats['dropped'].append(name)
+        for done, schema in enumerate(sorted(schemas.values(), key=lambda schema: schema.name), start=1):
+            if is_cancelled and is_cancelled():
+                stats['cancelled'] = True
+                break
+            fetched = writer.refresh_table(schema, full)
+            if fetched:
+                stats['fetched'] += fetched
+                stats['changed_tables'].append(schema.name)
+            if progress:
+                progress(done, len(schemas), schema.name)
+        with transaction(sqlite_connection):
+            sqlite_connection.executemany(
+                "INSERT OR REPLACE INTO _snapshot_info (key, value) VALUES (?, ?)",
+                [('refreshed_at', now_text()),
+                 ('source', f"{mysql_connection.server_host}/{mysql_connection.database}")])
+    finally:
+        sqlite_connection.close()
+    stats['seconds'] = time.monotonic() - started
+    stats['report'] = (f"Tabulek: {stats['tables']}, změněno: {len(stats['changed_tables'])}, "
+                       f"staženo řádků: {stats['fetched']}, celkem {stats['seconds']:.1f} s."
+                       + (" Obnova přerušena." if stats['cancelled'] else ""))
+    return stats
+
+
+def snapshot_info(path=DEFAULT_SNAPSHOT_PATH):
+    """{'refreshed_at': ..., 'source': ...} snapshotu, prázdný slovník když soubor není."""
+    if not os.path.exists(path):
+        return {}
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return dict(connection.execute("SELECT key, value FROM _snapshot_info"))
+    except sqlite3.Error:
+        return {}
+    finally:
+        connection.close()
+
+
+class BitXor:
+    """Agregace BIT_XOR z MySQL (používá ji otisk tabulky receptů)."""
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= int(value)
+
+    def finalize(self):
+        return self.value
+
+
+def crc32(value):
+    if value is None:
+        return None
+    if not isinstance(value, bytes):
+        value = str(value).encode()
+    return zlib.crc32(value)
+
+
+def concat_ws(separator, *values):
+    return separator.join(str(value) for value in values if value is not None)
+
+
+def greatest(*values):
+    return None if None in values else max(values)
+
+
+def least(*values):
+    return None if None in values else min(values)
+
+
+def json_unquote(value):
+    # JSON_EXTRACT v SQLite vrací texty už bez uvozovek
+    if isinstance(value, str) and value.startswith('"'):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def open_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """SnapshotConnection nad souborem `path`; každé vlákno si otevře vlastní."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Snapshot {path} neexistuje, nejdřív ho vytvořte (python snapshot.py)")
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA query_only = ON")
+    # Funkce z MySQL, které používají dotazy editoru
+    connection.create_function('CRC32', 1, crc32, deterministic=True)
+    connection.create_function('CONCAT_WS', -1, concat_ws, deterministic=True)
+    connection.create_function('GREATEST', -1, greatest, deterministic=True)
+    connection.create_function('LEAST', -1, least, deterministic=True)
+    connection.create_function('JSON_UNQUOTE', 1, json_unquote, deterministic=True)
+    connection.create_function('NOW', 0, now_text)
+    connection.create_aggregate('BIT_XOR', 1, BitXor)
+    return SnapshotConnection(connection)
+
+
+class SnapshotConnection:
+    """Spojení se stejným rozhraním, jaké editor používá u mysql.connector, jen pro čtení."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SnapshotCursor(self.connection, dictionary)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def reconnect(self, attempts=1, delay=0):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.connection.close()
+
+
+class SnapshotCursor:
+    """Kurzor nad SQLite, který přijímá dotazy s parametry ve stylu mysql.connector (%s)."""
+
+    def __init__(self, connection, dictionary=False):
+        self.cursor = connection.cursor()
+        self.dictionary = dictionary
+        self.rowcount = -1
+        self.lastrowid = None
+
+    def execute(self, operation, params=None):
+        if not operation.lstrip().upper().startswith(SNAPSHOT_STATEMENTS):
+            raise SnapshotReadOnlyError(msg="Offline snapshot je jen pro čtení, změny nelze uložit")
+        if params is not None:
+            operation = translate_placeholders(operation)
+            if not isinstance(params, dict):
+                params = tuple(params)
+        try:
+            self.cursor.execute(operation, () if params is None else params)
+        except sqlite3.Error as err:
+            raise SnapshotReadOnlyError(msg=f"Dotaz nelze provést nad offline snapshotem: {err}") from err
+
+    def executemany(self, operation, seq_params):
+        raise SnapshotReadOnlyError(msg="Offline snapshot je jen pro čtení, změny nelze uložit")
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self.cursor.description or ())
+
+    @property
+    def with_rows(self):
+        return self.cursor.description is not None
+
+    def convert(self, rows):
+        if not self.dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        return None if row is None else self.convert([row])[0]
+
+    def fetchmany(self, size=1):
+        return self.convert(self.cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self.convert(self.cursor.fetchall())
+
+    def close(self):
+        self.cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Vytvoří nebo obnoví offline snapshot databáze editoru.")
+    parser.add_argument('--path', default=DEFAULT_SNAPSHOT_PATH, help="soubor snapshotu (SQLite)")
+    parser.add_argument('--full', action='store_true', help="zkopírovat všechny tabulky celé")
+    args = parser.parse_args()
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    print("Connecting to database...")
+    try:
+        connection = mysql.connector.connect(
+            host=config['mysql']['host'],
+            user=config['mysql']['user'],
+            password=config['mysql']['password'],
+            database=config['mysql']['database']
+        )
+    except mysql.connector.Error as err:
+        print(f"Error connecting to database: {err}")
+        sys.exit(1)
+
+    stats = refresh_snapshot(connection, args.path, args.full,
+                             progress=lambda done, total, name: print(f"[{done}/{total}] {name}"))
+    print(stats['report'])
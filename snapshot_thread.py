@@ -0,0 +1,47 @@
+# snapshot_thread.py
+# Obnovení offline snapshotu databáze z editoru mimo GUI thread.
+import sqlite3
+
+import mysql.connector
+from PyQt5 import QtCore
+
+from snapshot import refresh_snapshot
+
+
+class SnapshotRefreshThread(QtCore.QThread):
+    """Spustí refresh_snapshot mimo GUI thread a hlásí průběh signálem.
+
+    K MySQL se připojí vlastním spojením (mimo pool), takže obnova
+    funguje i v offline režimu, jakmile je server zase dostupný.
+    """
+    progress = QtCore.pyqtSignal(int, int, str)
+    refreshed = QtCore.pyqtSignal(dict)
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, mysql_config, path, full=False, parent=None):
+        super().__init__(parent)
+        self.mysql_config = mysql_config
+        self.path = path
+        self.full = full
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            connection = mysql.connector.connect(
+                host=self.mysql_config['host'],
+                user=self.mysql_config['user'],
+                password=self.mysql_config['password'],
+                database=self.mysql_config['database']
+            )
+            try:
+                stats = refresh_snapshot(connection, self.path, self.full,
+                                         progress=self.progress.emit, is_cancelled=lambda: self.cancelled)
+            finally:
+                connection.close()
+        except (mysql.connector.Error, sqlite3.Error, OSError) as err:
+            self.failed.emit(str(err))
+            return
+        self.refreshed.emit(stats)
@@ -11,16 +11,30 @@ from item_manager import ItemSelectionDialog
 
 # Importujeme StoreManagerStoresDialog z nového souboru
 from store_manager_stores import StoreManagerStoresDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
+from unit_of_work import UnitOfWork
+from reference_data import ReferenceData
+from price_changes import (PRICE_SET, PRICE_PERCENT, PRICE_MULTIPLY, PRICE_ADD, PriceChange,
+                           update_prices, fetch_prices, to_decimal)
 
 # Importujeme potřebné třídy
 from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
 
+PENDING_FLUSH_DELAY = 3000  # ms od poslední úpravy buňky do automatického uložení
+PENDING_COLOR = QtGui.QColor(255, 243, 196)
+
 class StoreManagerDialog(QtWidgets.QDialog):
     def __init__(self, connection):
         super().__init__()
         self.connection = connection
         self.setWindowTitle("Správa Obchodů")
         self.resize(1000, 600)
+        # Úpravy buněk (kategorie položek) se ukládají dávkově, viz save_pending_edits
+        self.unit_of_work = UnitOfWork(self.connection)
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(PENDING_FLUSH_DELAY)
+        self.flush_timer.timeout.connect(self.auto_save_pending_edits)
         self.init_ui()
 
     def init_ui(self):
@@ -73,6 +87,10 @@ class StoreManagerDialog(QtWidgets.QDialog):
         self.items_table.setHorizontalHeaderLabels(['ID', 'Item', 'Kategorie', 'Cena Nákup', 'Cena Prodej', 'Akce'])
         self.items_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.items_table.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)  # Povolit výběr více řádků
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.items_action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_item, delete=self.delete_item), self.items_table)
+        self.items_table.setItemDelegateForColumn(5, self.items_action_delegate)
         self.items_table.setEditTriggers(QtWidgets.QAbstractItemView.SelectedClicked)
         self.items_table.setSortingEnabled(True)
         content_layout.addWidget(self.items_table)
@@ -102,7 +120,17 @@ class StoreManagerDialog(QtWidgets.QDialog):
         buttons_layout.addWidget(refresh_button)
         buttons_layout.addWidget(bulk_price_b_button)
         buttons_layout.addWidget(bulk_price_s_button)
+
+        # Neuložené úpravy kategorií v tabulce
+        buttons_layout.addStretch()
+        self.save_edits_button = QtWidgets.QPushButton("Uložit změny")
+        self.save_edits_button.clicked.connect(self.save_pending_edits)
+        self.discard_edits_button = QtWidgets.QPushButton("Zahodit změny")
+        self.discard_edits_button.clicked.connect(self.discard_pending_edits)
+        buttons_layout.addWidget(self.save_edits_button)
+        buttons_layout.addWidget(self.discard_edits_button)
         main_layout.addLayout(buttons_layout)
+        self.update_pending_buttons()
 
         self.load_categories()  # Načteme kategorie do seznamu kategorií
         self.load_items()
@@ -111,17 +139,15 @@ class StoreManagerDialog(QtWidgets.QDialog):
         self.update_category_delegate()
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT id, name FROM aprts_store_item_categories ORDER BY name")
-        categories = cursor.fetchall()
+        categories = ReferenceData.instance().rows(self.connection, 'store_categories')
         self.category_list_widget.clear()
         # Přidáme položku "Všechny Kategorie"
         all_item = QtWidgets.QListWidgetItem("Všechny Kategorie")
         all_item.setData(QtCore.Qt.UserRole, None)
         self.category_list_widget.addItem(all_item)
-        for category in categories:
-            item = QtWidgets.QListWidgetItem(category['name'])
-            item.setData(QtCore.Qt.UserRole, category['id'])
+        for category_id, category_name in categories:
+            item = QtWidgets.QListWidgetItem(category_name)
+            item.setData(QtCore.Qt.UserRole, category_id)
             self.category_list_widget.addItem(item)
 
         # Aktualizujeme seznam kategorií pro delegate
@@ -131,6 +157,8 @@ class StoreManagerDialog(QtWidgets.QDialog):
         self.load_items()
 
     def load_items(self):
+        # Před načtením z DB uložíme čekající úpravy; když to nejde, zůstanou ve frontě a znovu se zobrazí
+        self.save_pending_edits(quiet=True)
         search_text = self.item_search_edit.text().strip()
         selected_item = self.category_list_widget.currentItem()
         selected_category_id = selected_item.data(QtCore.Qt.UserRole) if selected_item else None
@@ -173,30 +201,96 @@ class StoreManagerDialog(QtWidgets.QDialog):
             self.items_table.setItem(row_number, 4, price_s_item)
 
             # Akční tlačítka
-            action_widget = self.create_item_action_buttons(item['id'])
-            self.items_table.setCellWidget(row_number, 5, action_widget)
+            self.items_table.setItem(row_number, 5, action_item(item['id']))
 
+        self.show_pending_edits()
         self.items_table.resizeColumnsToContents()
         # Nastavení pevné šířky sloupce 'Kategorie'
         self.items_table.setColumnWidth(2, 150)
 
-    def create_item_action_buttons(self, item_id):
-        widget = QtWidgets.QWidget()
-        layout = QtWidgets.QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.clicked.connect(lambda: self.edit_item(item_id))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        layout.addWidget(edit_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.clicked.connect(lambda: self.delete_item(item_id))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        layout.addWidget(delete_button)
+    def category_names(self):
+        return dict(getattr(self, 'category_list', []))
+
+    def set_pending_mark(self, cell, pending):
+        font = cell.font()
+        font.setItalic(pending)
+        cell.setFont(font)
+        cell.setBackground(PENDING_COLOR if pending else QtGui.QBrush())
+        cell.setToolTip("Neuloženo" if pending else "")
+
+    def show_pending_edits(self):
+        """Vyznačí v tabulce buňky s neuloženou kategorií (a po obnovení tabulky jim vrátí hodnotu)."""
+        names = self.category_names()
+        for row in range(self.items_table.rowCount()):
+            item_id = int(self.items_table.item(row, 0).text())
+            cell = self.items_table.item(row, 2)
+            pending = self.unit_of_work.is_pending('aprts_store_items', 'category_id', item_id)
+            if pending:
+                category_id = self.unit_of_work.pending_value('aprts_store_items', 'category_id', item_id)
+                if cell.data(QtCore.Qt.UserRole) != category_id:
+                    cell.setData(QtCore.Qt.UserRole, category_id)
+                    cell.setText(names.get(category_id, ''))
+            self.set_pending_mark(cell, pending)
+
+    def update_pending_buttons(self):
+        count = len(self.unit_of_work)
+        self.save_edits_button.setText(f"Uložit změny ({count})" if count else "Uložit změny")
+        self.save_edits_button.setEnabled(bool(count))
+        self.discard_edits_button.setEnabled(bool(count))
+
+    def pending_edits_changed(self):
+        self.show_pending_edits()
+        self.update_pending_buttons()
+        if len(self.unit_of_work):
+            self.flush_timer.start()
+        else:
+            self.flush_timer.stop()
 
-        widget.setLayout(layout)
-        return widget
+    def save_pending_edits(self, quiet=False):
+        """Uloží všechny čekající úpravy jednou transakcí; vrací False, pokud se to nepovedlo."""
+        self.flush_timer.stop()
+        try:
+            self.unit_of_work.flush()
+        except mysql.connector.Error as err:
+            if not quiet:
+                QtWidgets.QMessageBox.critical(self, "Chyba",
+                                               f"Změny se nepodařilo uložit, zůstávají neuložené: {err}")
+            else:
+                print(f"Změny se nepodařilo uložit, zůstávají neuložené: {err}")
+            return False
+        finally:
+            self.show_pending_edits()
+            self.update_pending_buttons()
+        return True
+
+    def auto_save_pending_edits(self):
+        # Po chybě se znovu zkusí až s další úpravou nebo tlačítkem, časovač už nespouštíme
+        self.save_pending_edits()
+
+    def discard_pending_edits(self):
+        self.flush_timer.stop()
+        original = self.unit_of_work.discard()
+        names = self.category_names()
+        for row in range(self.items_table.rowCount()):
+            item_id = int(self.items_table.item(row, 0).text())
+            key = ('aprts_store_items', 'category_id', item_id)
+            if key in original:
+                cell = self.items_table.item(row, 2)
+                cell.setData(QtCore.Qt.UserRole, original[key])
+                cell.setText(names.get(original[key], ''))
+        self.show_pending_edits()
+        self.update_pending_buttons()
+
+    def done(self, result):
+        # Při zavření okna uložíme, co čeká ve frontě
+        if len(self.unit_of_work) and not self.save_pending_edits():
+            confirm = QtWidgets.QMessageBox.question(self, "Neuložené změny",
+                                                     "Změny se nepodařilo uložit. Zavřít okno a zahodit je?",
+                                                     QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
+            if confirm != QtWidgets.QMessageBox.Yes:
+                return
+            self.unit_of_work.discard()
+        super().done(result)
 
     def add_item(self):
         dialog = StoreItemDialog(self.connection)
@@ -213,10 +307,14 @@ class StoreManagerDialog(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat tuto položku?",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_store_items WHERE id = %s", (item_id,))
-            self.connection.commit()
-            self.load_items()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_store_items WHERE id = %s", (item_id,))
+                self.connection.commit()
+                self.load_items()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def init_categories_tab(self):
         layout = QtWidgets.QVBoxLayout()
@@ -243,6 +341,9 @@ class StoreManagerDialog(QtWidgets.QDialog):
         self.categories_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.categories_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.categories_table.setSortingEnabled(True)  # Povolit řazení
+        self.categories_action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_category, delete=self.delete_category), self.categories_table)
+        self.categories_table.setItemDelegateForColumn(2, self.categories_action_delegate)
         layout.addWidget(self.categories_table)
 
         # Tlačítka
@@ -258,51 +359,25 @@ class StoreManagerDialog(QtWidgets.QDialog):
         self.load_categories_tab()
 
     def load_categories_tab(self):
-        search_text = self.category_search_edit.text().strip()
-        cursor = self.connection.cursor(dictionary=True)
-        query = """
-            SELECT id, name
-            FROM aprts_store_item_categories
-            WHERE name LIKE %s
-            ORDER BY name
-        """
-        search_pattern = f"%{search_text}%"
-        cursor.execute(query, (search_pattern,))
-        categories = cursor.fetchall()
+        search_text = self.category_search_edit.text().strip().lower()
+        categories = [(category_id, name)
+                      for category_id, name in ReferenceData.instance().rows(self.connection, 'store_categories')
+                      if search_text in name.lower()]
         self.categories_table.setRowCount(0)
-        for row_number, category in enumerate(categories):
+        for row_number, (category_id, category_name) in enumerate(categories):
             self.categories_table.insertRow(row_number)
 
-            id_item = QtWidgets.QTableWidgetItem(str(category['id']))
+            id_item = QtWidgets.QTableWidgetItem(str(category_id))
             self.categories_table.setItem(row_number, 0, id_item)
 
-            name_item = QtWidgets.QTableWidgetItem(category['name'])
+            name_item = QtWidgets.QTableWidgetItem(category_name)
             self.categories_table.setItem(row_number, 1, name_item)
 
             # Akční tlačítka
-            action_widget = self.create_category_action_buttons(category['id'])
-            self.categories_table.setCellWidget(row_number, 2, action_widget)
+            self.categories_table.setItem(row_number, 2, action_item(category_id))
 
         self.categories_table.resizeColumnsToContents()
 
-    def create_category_action_buttons(self, category_id):
-        widget = QtWidgets.QWidget()
-        layout = QtWidgets.QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.clicked.connect(lambda: self.edit_category(category_id))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        layout.addWidget(edit_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.clicked.connect(lambda: self.delete_category(category_id))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        layout.addWidget(delete_button)
-
-        widget.setLayout(layout)
-        return widget
-
     def add_category(self):
         dialog = StoreCategoryDialog(self.connection)
         if dialog.exec_():
@@ -324,15 +399,20 @@ class StoreManagerDialog(QtWidgets.QDialog):
                                                  "Opravdu chcete smazat tuto kategorii? Položky v této kategorii budou ztraceny.",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_store_item_categories WHERE id = %s", (category_id,))
-            # Nastavíme category_id na NULL pro položky s touto kategorií
-            cursor.execute("UPDATE aprts_store_items SET category_id = NULL WHERE category_id = %s", (category_id,))
-            self.connection.commit()
-            self.load_categories_tab()
-            self.load_categories()  # Aktualizujeme seznam kategorií
-            self.load_items()
-            self.update_category_delegate()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_store_item_categories WHERE id = %s", (category_id,))
+                # Nastavíme category_id na NULL pro položky s touto kategorií
+                cursor.execute("UPDATE aprts_store_items SET category_id = NULL WHERE category_id = %s", (category_id,))
+                self.connection.commit()
+                ReferenceData.instance().invalidate('store_categories')
+                self.load_categories_tab()
+                self.load_categories()  # Aktualizujeme seznam kategorií
+                self.load_items()
+                self.update_category_delegate()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
     def update_category_delegate(self):
         # Aktualizujeme seznam kategorií pro delegate
@@ -348,7 +428,8 @@ class StoreManagerDialog(QtWidgets.QDialog):
             self.category_delegate.categories = self.category_list
         else:
             # Vytvoříme delegate pro sloupec "Kategorie" (index 2)
-            self.category_delegate = CategoryDelegate(self.items_table, self.category_list, self.connection)
+            self.category_delegate = CategoryDelegate(self.items_table, self.category_list, self.unit_of_work)
+            self.category_delegate.edited.connect(self.pending_edits_changed)
             self.items_table.setItemDelegateForColumn(2, self.category_delegate)
 
     def bulk_change_price_b(self):
@@ -364,27 +445,143 @@ class StoreManagerDialog(QtWidgets.QDialog):
             return
 
         price_label = "Cena Nákup" if price_type == 'price_b' else "Cena Prodej"
-        price, ok = QtWidgets.QInputDialog.getDouble(self, "Hromadná Změna", f"Zadejte novou hodnotu pro {price_label}:", decimals=2)
-        if ok:
-            cursor = self.connection.cursor()
-            for index in selected_items:
-                row = index.row()
-                item_id = int(self.items_table.item(row, 0).text())
-                query = f"UPDATE aprts_store_items SET {price_type} = %s WHERE id = %s"
-                cursor.execute(query, (price, item_id))
-                # Aktualizujeme hodnotu v tabulce
-                if price_type == 'price_b':
-                    self.items_table.item(row, 3).setText(f"{price:.2f}")
-                else:
-                    self.items_table.item(row, 4).setText(f"{price:.2f}")
-            self.connection.commit()
-            QtWidgets.QMessageBox.information(self, "Úspěch", f"{price_label} byla úspěšně změněna pro vybrané položky.")
+        price_column = 3 if price_type == 'price_b' else 4
+        selected = {int(self.items_table.item(index.row(), 0).text()): self.items_table.item(index.row(), 1).text()
+                    for index in selected_items}
+        try:
+            # Náhled počítáme z uložených cen, ne z textu tabulky zaokrouhleného na 2 místa
+            old_prices = fetch_prices(self.connection, price_type, selected)
+        except mysql.connector.Error as err:
+            QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při načítání cen: {err}")
+            return
+        rows = [(item_id, item_code, old_prices[item_id])  # (id, item, stará cena)
+                for item_id, item_code in selected.items() if item_id in old_prices]
+
+        dialog = BulkPriceDialog(price_label, rows, self)
+        if not dialog.exec_():
+            return
+        item_ids = [item_id for item_id, old_price, new_price in dialog.changed_rows()]
+        if not item_ids:
+            return
+        try:
+            update_prices(self.connection, price_type, item_ids, dialog.price_change())
+            prices = fetch_prices(self.connection, price_type, item_ids)
+        except mysql.connector.Error as err:
+            QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při změně cen: {err}")
+            return
+
+        # Aktualizujeme hodnoty v tabulce podle DB; řazení vypneme, aby se řádky při přepisu nepřeházely
+        self.items_table.setSortingEnabled(False)
+        for row in range(self.items_table.rowCount()):
+            item_id = int(self.items_table.item(row, 0).text())
+            if item_id in prices:
+                self.items_table.item(row, price_column).setText(f"{prices[item_id]:.2f}")
+        self.items_table.setSortingEnabled(True)
+        QtWidgets.QMessageBox.information(self, "Úspěch", f"{price_label} byla změněna u {len(item_ids)} položek.")
+
+
+class BulkPriceDialog(QtWidgets.QDialog):
+    """Nastavení hromadné změny ceny s náhledem staré a nové ceny před uložením."""
+    MODES = [
+        (PRICE_SET, "Nastavit na"),
+        (PRICE_PERCENT, "Změnit o procenta (+/-)"),
+        (PRICE_MULTIPLY, "Vynásobit"),
+        (PRICE_ADD, "Přičíst částku (+/-)"),
+    ]
+
+    def __init__(self, price_label, rows, parent=None):
+        super().__init__(parent)
+        self.rows = rows  # [(id, item, stará cena z DB)]
+        self.preview_rows = []
+        self.setWindowTitle(f"Hromadná Změna - {price_label}")
+        self.resize(700, 500)
+        self.init_ui()
+        self.update_preview()
+
+    def init_ui(self):
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+
+        form_layout = QtWidgets.QFormLayout()
+        self.mode_combo = QtWidgets.QComboBox()
+        for mode, label in self.MODES:
+            self.mode_combo.addItem(label, mode)
+        self.value_edit = QtWidgets.QDoubleSpinBox()
+        self.value_edit.setRange(-9999999, 9999999)
+        self.value_edit.setDecimals(2)
+        self.round_edit = QtWidgets.QDoubleSpinBox()
+        self.round_edit.setRange(0, 10000)
+        self.round_edit.setDecimals(2)
+        self.round_edit.setSingleStep(0.05)
+        self.round_edit.setSpecialValueText("Nezaokrouhlovat")
+        form_layout.addRow("Způsob:", self.mode_combo)
+        form_layout.addRow("Hodnota:", self.value_edit)
+        form_layout.addRow("Zaokrouhlit na:", self.round_edit)
+        layout.addLayout(form_layout)
+
+        self.summary_label = QtWidgets.QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.preview_table = QtWidgets.QTableWidget(0, 5)
+        self.preview_table.setHorizontalHeaderLabels(["ID", "Item", "Stará cena", "Nová cena", "Rozdíl"])
+        self.preview_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.preview_table.verticalHeader().setVisible(False)
+        self.preview_table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.preview_table)
+
+        self.mode_combo.currentIndexChanged.connect(self.update_preview)
+        self.value_edit.valueChanged.connect(self.update_preview)
+        self.round_edit.valueChanged.connect(self.update_preview)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel,
+            QtCore.Qt.Horizontal, self)
+        buttons.button(QtWidgets.QDialogButtonBox.Ok).setText("Uložit změny")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def price_change(self):
+        return PriceChange(self.mode_combo.currentData(), round(self.value_edit.value(), 2),
+                           round(self.round_edit.value(), 2))
+
+    def changed_rows(self):
+        """[(id, stará cena, nová cena)] jen pro položky, jejichž cena se opravdu změní."""
+        return [(item_id, old_price, new_price) for item_id, item_code, old_price, new_price in self.preview_rows
+                if old_price != new_price]
+
+    def update_preview(self):
+        change = self.price_change()
+        self.preview_rows = []
+        for item_id, item_code, old_price in self.rows:
+            old_price = to_decimal(old_price)
+            self.preview_rows.append((item_id, item_code, old_price, change.apply(old_price)))
+
+        self.preview_table.setUpdatesEnabled(False)
+        self.preview_table.setRowCount(len(self.preview_rows))
+        for row_number, (item_id, item_code, old_price, new_price) in enumerate(self.preview_rows):
+            diff = new_price - old_price
+            values = [str(item_id), item_code, f"{old_price:.2f}", f"{new_price:.2f}", f"{diff:+.2f}"]
+            for column, value in enumerate(values):
+                cell = QtWidgets.QTableWidgetItem(value)
+                if column != 1:
+                    cell.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.preview_table.setItem(row_number, column, cell)
+        self.preview_table.setUpdatesEnabled(True)
+
+        changed = len(self.changed_rows())
+        total = sum(new_price - old_price for item_id, item_code, old_price, new_price in self.preview_rows)
+        self.summary_label.setText(f"Změní se {changed} z {len(self.preview_rows)} položek, "
+                                   f"celkový rozdíl {total:+.2f}")
 
 class CategoryDelegate(QtWidgets.QStyledItemDelegate):
-    def __init__(self, parent, categories, connection):
+    # Změnu kategorie jen zařadí do fronty; uloží ji StoreManagerDialog.save_pending_edits
+    edited = QtCore.pyqtSignal()
+
+    def __init__(self, parent, categories, unit_of_work):
         super().__init__(parent)
         self.categories = categories  # Seznam kategorií ve formátu [(id, name), ...]
-        self.connection = connection
+        self.unit_of_work = unit_of_work
 
     def createEditor(self, parent, option, index):
         combo = QComboBox(parent)
@@ -401,18 +598,15 @@ class CategoryDelegate(QtWidgets.QStyledItemDelegate):
     def setModelData(self, editor, model, index):
         category_id = editor.currentData()
         category_name = editor.currentText()
-        model.setData(index, category_name, QtCore.Qt.DisplayRole)
-        model.setData(index, category_id, QtCore.Qt.UserRole)
-        # Získáme ID položky z modelu
+        # ID položky a původní kategorii čteme dřív, než setData řádek případně přeřadí
         id_index = model.index(index.row(), 0, index.parent())  # Sloupec 0 je ID
-        item_id = model.data(id_index, QtCore.Qt.DisplayRole)
-        self.update_category_in_db(item_id, category_id)
-
-    def update_category_in_db(self, item_id, category_id):
-        cursor = self.connection.cursor()
-        query = "UPDATE aprts_store_items SET category_id = %s WHERE id = %s"
-        cursor.execute(query, (category_id, item_id))
-        self.connection.commit()
+        item_id = int(model.data(id_index, QtCore.Qt.DisplayRole))
+        original_id = index.data(QtCore.Qt.UserRole)
+        cell = QtCore.QPersistentModelIndex(index)
+        model.setData(QtCore.QModelIndex(cell), category_id, QtCore.Qt.UserRole)
+        model.setData(QtCore.QModelIndex(cell), category_name, QtCore.Qt.DisplayRole)
+        self.unit_of_work.register('aprts_store_items', 'category_id', item_id, category_id, original_id)
+        self.edited.emit()
 
 class StoreItemDialog(QtWidgets.QDialog):
     def __init__(self, connection, item_id=None):
@@ -471,12 +665,9 @@ class StoreItemDialog(QtWidgets.QDialog):
                 self.item_code_edit.setText(selected_item['item'])
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT id, name FROM aprts_store_item_categories ORDER BY name")
-        categories = cursor.fetchall()
         self.category_combo.clear()
-        for category in categories:
-            self.category_combo.addItem(category['name'], category['id'])
+        for category_id, category_name in ReferenceData.instance().rows(self.connection, 'store_categories'):
+            self.category_combo.addItem(category_name, category_id)
 
     def load_item(self):
         cursor = self.connection.cursor(dictionary=True)
@@ -582,6 +773,7 @@ class StoreCategoryDialog(QtWidgets.QDialog):
         try:
             cursor.execute(query, params)
             self.connection.commit()
+            ReferenceData.instance().invalidate('store_categories')
             self.accept()
         except mysql.connector.Error as err:
             QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při ukládání: {err}")
@@ -2,6 +2,7 @@ import re
 from PyQt5 import QtWidgets, QtGui, QtCore
 import mysql.connector
 import os
+from reference_data import ReferenceData
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 class StoreDialog(QtWidgets.QDialog):
@@ -128,9 +129,8 @@ class StoreDialog(QtWidgets.QDialog):
                 self.npc_combo.setCurrentIndex(index)
 
     def load_categories(self):
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("SELECT id, name FROM aprts_store_item_categories")
-        self.all_categories = cursor.fetchall()
+        self.all_categories = [{'id': category_id, 'name': name} for category_id, name
+                               in ReferenceData.instance().rows(self.connection, 'store_categories')]
         self.populate_categories_table()
 
     def populate_categories_table(self):
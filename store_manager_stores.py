@@ -9,6 +9,7 @@ import mysql.connector
 import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 from store_manager_storedialog import StoreDialog
+from table_delegates import ActionButtonsDelegate, standard_action_buttons, action_item
 
 class StoreManagerStoresDialog(QtWidgets.QWidget):
     def __init__(self, connection):
@@ -44,6 +45,10 @@ class StoreManagerStoresDialog(QtWidgets.QWidget):
         self.stores_table.setHorizontalHeaderLabels(['ID', 'Název', 'Blip', 'Souřadnice', 'NPC', 'Akce'])
         self.stores_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.stores_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        # Tlačítka akcí kreslí delegát, řádky nemají vlastní widgety
+        self.action_delegate = ActionButtonsDelegate(standard_action_buttons(
+            edit=self.edit_store, delete=self.delete_store), self.stores_table)
+        self.stores_table.setItemDelegateForColumn(5, self.action_delegate)
         layout.addWidget(self.stores_table)
 
         # Tlačítka
@@ -93,29 +98,10 @@ class StoreManagerStoresDialog(QtWidgets.QWidget):
             self.stores_table.setItem(row_number, 4, npc_item)
 
             # Akční tlačítka
-            action_widget = self.create_store_action_buttons(store['id'])
-            self.stores_table.setCellWidget(row_number, 5, action_widget)
+            self.stores_table.setItem(row_number, 5, action_item(store['id']))
 
         self.stores_table.resizeColumnsToContents()
 
-    def create_store_action_buttons(self, store_id):
-        widget = QtWidgets.QWidget()
-        layout = QtWidgets.QHBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-
-        edit_button = QtWidgets.QPushButton("Upravit")
-        edit_button.clicked.connect(lambda: self.edit_store(store_id))
-        edit_button.setStyleSheet("background-color: #5cb85c; color: white;")
-        layout.addWidget(edit_button)
-
-        delete_button = QtWidgets.QPushButton("Smazat")
-        delete_button.clicked.connect(lambda: self.delete_store(store_id))
-        delete_button.setStyleSheet("background-color: #d9534f; color: white;")
-        layout.addWidget(delete_button)
-
-        widget.setLayout(layout)
-        return widget
-
     def add_store(self):
         dialog = StoreDialog(self.connection)
         if dialog.exec_():
@@ -131,11 +117,15 @@ class StoreManagerStoresDialog(QtWidgets.QWidget):
                                                  "Opravdu chcete smazat tento obchod? Tato akce je nevratná.",
                                                  QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
         if confirm == QtWidgets.QMessageBox.Yes:
-            cursor = self.connection.cursor()
-            cursor.execute("DELETE FROM aprts_stores WHERE id = %s", (store_id,))
-            # Smažeme také přiřazené kategorie a NPC
-            cursor.execute("DELETE FROM aprts_store_categories WHERE store_id = %s", (store_id,))
-            cursor.execute("DELETE FROM aprts_store_npc WHERE store_id = %s", (store_id,))
-            self.connection.commit()
-            self.load_stores()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("DELETE FROM aprts_stores WHERE id = %s", (store_id,))
+                # Smažeme také přiřazené kategorie a NPC
+                cursor.execute("DELETE FROM aprts_store_categories WHERE store_id = %s", (store_id,))
+                cursor.execute("DELETE FROM aprts_store_npc WHERE store_id = %s", (store_id,))
+                self.connection.commit()
+                self.load_stores()
+            except mysql.connector.Error as err:
+                self.connection.rollback()
+                QtWidgets.QMessageBox.critical(self, "Chyba", f"Nastala chyba při mazání záznamu: {err}")
 
@@ -0,0 +1,128 @@
+# table_delegates.py
+# Delegáty sdílené tabulkami manažerů.
+from PyQt5 import QtWidgets, QtGui, QtCore
+
+BUTTON_HEIGHT = 26
+BUTTON_SPACING = 4
+
+EDIT_COLOR = "#5cb85c"
+COPY_COLOR = "#5bc0de"
+DELETE_COLOR = "#d9534f"
+
+
+class ActionButtonsDelegate(QtWidgets.QStyledItemDelegate):
+    """Vykreslí do buňky řadu tlačítek (Upravit/Kopírovat/Smazat...) bez živých widgetů.
+
+    `buttons` je seznam (text, barva, callback); callback dostane hodnotu
+    `Qt.UserRole` buňky, typicky ID záznamu (viz action_item). Signál
+    `clicked` se vyšle před každým callbackem (např. pro zvuk kliknutí).
+    Rodičem má být tabulka, ve které delegát kreslí.
+    """
+    clicked = QtCore.pyqtSignal()
+
+    def __init__(self, buttons, parent=None):
+        super().__init__(parent)
+        self.buttons = buttons
+        self.pressed = None  # (index, pořadí tlačítka) právě stisknutého tlačítka
+        if isinstance(parent, QtWidgets.QAbstractItemView):
+            # Dvojklik na tlačítko nesmí tabulce ohlásit doubleClicked (otevření editace řádku)
+            parent.viewport().installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.MouseButtonDblClick:
+            view = self.parent()
+            index = view.indexAt(event.pos())
+            if (index.isValid() and view.itemDelegateForColumn(index.column()) is self
+                    and self.button_at(view.visualRect(index), event.pos()) is not None):
+                return True
+        return super().eventFilter(watched, event)
+
+    def button_rects(self, rect):
+        count = len(self.buttons)
+        width = (rect.width() - BUTTON_SPACING * (count + 1)) / count
+        height = min(BUTTON_HEIGHT, rect.height() - 2 * BUTTON_SPACING)
+        top = rect.top() + (rect.height() - height) // 2
+        return [QtCore.QRect(round(rect.left() + BUTTON_SPACING + i * (width + BUTTON_SPACING)), top,
+                             int(width), height)
+                for i in range(count)]
+
+    def button_at(self, rect, pos):
+        for number, button_rect in enumerate(self.button_rects(rect)):
+            if button_rect.contains(pos):
+                return number
+        return None
+
+    def paint(self, painter, option, index):
+        # Pozadí buňky (včetně zvýrazněného výběru) kreslí styl
+        opt = QtWidgets.QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        widget = option.widget
+        style = widget.style() if widget else QtWidgets.QApplication.style()
+        style.drawControl(QtWidgets.QStyle.CE_ItemViewItem, opt, painter, widget)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        metrics = painter.fontMetrics()
+        for number, ((text, color, _), rect) in enumerate(zip(self.buttons, self.button_rects(option.rect))):
+            background = QtGui.QColor(color)
+            if self.pressed == (QtCore.QPersistentModelIndex(index), number):
+                background = background.darker(120)
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.setBrush(background)
+            painter.drawRoundedRect(rect, 3, 3)
+            painter.setPen(QtGui.QColor("white"))
+            painter.drawText(rect, QtCore.Qt.AlignCenter,
+                             metrics.elidedText(text, QtCore.Qt.ElideRight, rect.width() - 4))
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        metrics = option.fontMetrics
+        width = sum(metrics.horizontalAdvance(text) + 16 for text, _, _ in self.buttons)
+        return QtCore.QSize(width + BUTTON_SPACING * (len(self.buttons) + 1), BUTTON_HEIGHT + 2 * BUTTON_SPACING)
+
+    def editorEvent(self, event, model, option, index):
+        event_type = event.type()
+        if event_type not in (QtCore.QEvent.MouseButtonPress, QtCore.QEvent.MouseButtonRelease):
+            return super().editorEvent(event, model, option, index)
+        if event.button() != QtCore.Qt.LeftButton:
+            return False
+
+        number = self.button_at(option.rect, event.pos())
+        if event_type == QtCore.QEvent.MouseButtonPress:
+            if number is None:
+                return False
+            self.pressed = (QtCore.QPersistentModelIndex(index), number)
+        else:
+            if self.pressed is None:
+                return False
+            pressed, self.pressed = self.pressed, None
+            if pressed == (QtCore.QPersistentModelIndex(index), number):
+                self.clicked.emit()
+                record_id = index.data(QtCore.Qt.UserRole)
+                callback = self.buttons[number][2]
+                # Callback může tabulku přenačíst, proto ho spustíme až mimo obsluhu události
+                QtCore.QTimer.singleShot(0, lambda: callback(record_id))
+        if option.widget is not None:
+            option.widget.viewport().update(option.rect)
+        return True
+
+
+def standard_action_buttons(edit=None, copy=None, delete=None):
+    """Seznam tlačítek Upravit/Kopírovat/Smazat pro ActionButtonsDelegate (None = tlačítko vynechat)."""
+    buttons = []
+    if edit:
+        buttons.append(("Upravit", EDIT_COLOR, edit))
+    if copy:
+        buttons.append(("Kopírovat", COPY_COLOR, copy))
+    if delete:
+        buttons.append(("Smazat", DELETE_COLOR, delete))
+    return buttons
+
+
+def action_item(record_id):
+    """Buňka pro sloupec s ActionButtonsDelegate; nese hodnotu, kterou dostanou callbacky tlačítek."""
+    item = QtWidgets.QTableWidgetItem()
+    item.setFlags(item.flags() & ~QtCore.Qt.ItemIsEditable)
+    item.setData(QtCore.Qt.UserRole, record_id)
+    return item
@@ -0,0 +1,6 @@
+# conftest.py
+# Testy importují moduly z kořene repozitáře.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,110 @@
+# test_db.py
+# Obnovení spojení v ReconnectingCursor po výpadku serveru (spojení jen simulované).
+import pytest
+from mysql.connector import errorcode, errors
+
+from db import Database
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self.rows = []
+
+    def execute(self, operation, params=None):
+        if self.connection.gone_on_execute:
+            self.connection.gone_on_execute = False
+            self.connection.connected = False
+            raise errors.OperationalError(msg="MySQL server has gone away", errno=errorcode.CR_SERVER_GONE_ERROR)
+        if operation.startswith("BROKEN"):
+            raise errors.ProgrammingError(msg="You have an error in your SQL syntax", errno=1064)
+        self.connection.executed.append((operation, params))
+        self.rows = [(1,)]
+        self.rowcount = 1
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Spojení, které server může „zavřít“ jako po wait_timeout."""
+
+    def __init__(self):
+        self.connected = True
+        self.gone_on_execute = False
+        self.reconnects = 0
+        self.executed = []
+
+    def cursor(self, *args, **kwargs):
+        # Stejně jako mysql.connector: zavřené spojení selže už při vytvoření kurzoru
+        if not self.connected:
+            raise errors.OperationalError("MySQL Connection not available")
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return self.connected
+
+    def reconnect(self, attempts=1, delay=0):
+        self.reconnects += 1
+        self.connected = True
+
+
+@pytest.fixture
+def database():
+    database = Database()
+    database.local.connection = FakeConnection()
+    database.local.dirty = False
+    return database
+
+
+def queries(connection):
+    return [operation for operation, params in connection.executed]
+
+
+def test_dropped_connection_is_reopened_before_cursor(database):
+    connection = database.local.connection
+    connection.connected = False
+    with database.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.fetchall() == [(1,)]
+    assert connection.reconnects == 1
+    assert queries(connection)[-1] == "SELECT 1"
+
+
+def test_cursor_from_thread_connection_survives_idle_timeout(database):
+    cursor = database.connection().cursor()  # Vytvořen před výpadkem, jako v manažerech
+    database.local.connection.connected = False
+    cursor.execute("SELECT 1")
+    assert database.local.connection.reconnects == 1
+
+
+def test_server_gone_during_execute_is_retried(database):
+    connection = database.local.connection
+    connection.gone_on_execute = True
+    with database.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    assert connection.reconnects == 1
+    assert queries(connection)[-1] == "SELECT 1"
+
+
+def test_uncommitted_writes_are_not_replayed(database):
+    connection = database.local.connection
+    with database.cursor() as cursor:
+        cursor.execute("UPDATE items SET label = %s WHERE id = %s", ("x", 1))
+    connection.connected = False
+    with pytest.raises(errors.OperationalError):
+        with database.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    assert connection.reconnects == 1
+    assert not database.is_dirty()
+
+
+def test_other_errors_are_raised_without_reconnect(database):
+    with pytest.raises(errors.ProgrammingError):
+        with database.cursor() as cursor:
+            cursor.execute("BROKEN SQL")
+    assert database.local.connection.reconnects == 0
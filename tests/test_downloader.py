@@ -0,0 +1,138 @@
+# test_downloader.py
+# HttpDownloader proti lokálnímu HTTP serveru: keep-alive, opakování 5xx, 404 a podmíněný GET.
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import downloader
+from downloader import DownloadError, HttpDownloader
+
+ETAG = '"abc123"'
+IMAGE = b"\x89PNG fake image data"
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, dokud klient spojení nezavře
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        name = self.path.rsplit('/', 1)[-1]
+        if name == "missing.png":
+            self.reply(404, b"not found")
+        elif name == "flaky.png" and hits <= 2:
+            self.reply(503, b"busy")
+        elif self.headers.get('If-None-Match') == ETAG:
+            self.reply(304, b"")
+        else:
+            self.reply(200, IMAGE, {'ETag': ETAG, 'Last-Modified': "Sat, 01 Jan 2022 00:00:00 GMT"})
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.hits = {}
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(downloader.time, 'sleep', delays.append)
+    return delays
+
+
+def make_downloader(server, **kwargs):
+    host, port = server.server_address
+    return HttpDownloader(f"http://{host}:{port}/storage/items/", **kwargs)
+
+
+def test_keep_alive_connection_is_reused(server):
+    client = make_downloader(server)
+    try:
+        for name in ("a.png", "b.png", "c.png", "a.png"):
+            assert client.fetch(name) == IMAGE
+    finally:
+        client.close()
+    stats = client.stats()
+    assert stats['connections_opened'] == 1
+    assert stats['requests'] == 4 and stats['failures'] == 0
+    assert stats['bytes'] == 4 * len(IMAGE)
+
+
+def test_server_error_is_retried_with_backoff(server, sleeps):
+    client = make_downloader(server, retries=3, backoff=0.5)
+    try:
+        assert client.fetch("flaky.png") == IMAGE
+    finally:
+        client.close()
+    assert sleeps == [0.5, 1.0]
+    assert server.hits["/storage/items/flaky.png"] == 3
+    assert client.stats()['retries'] == 2
+
+
+def test_server_error_gives_up_after_retries(server, sleeps):
+    client = make_downloader(server, retries=1, backoff=0.1)
+    try:
+        with pytest.raises(DownloadError) as error:
+            client.fetch("flaky.png")
+    finally:
+        client.close()
+    assert error.value.status == 503
+    assert sleeps == [0.1]
+    assert client.stats()['failures'] == 1
+
+
+def test_not_found_is_not_retried(server, sleeps):
+    client = make_downloader(server)
+    try:
+        with pytest.raises(DownloadError) as error:
+            client.fetch("missing.png")
+    finally:
+        client.close()
+    assert error.value.status == 404
+    assert sleeps == []
+    assert server.hits["/storage/items/missing.png"] == 1
+
+
+def test_fetch_if_modified_handles_not_modified(server):
+    client = make_downloader(server)
+    try:
+        first = client.fetch_if_modified("a.png")
+        again = client.fetch_if_modified("a.png", etag=first.etag, last_modified=first.last_modified)
+    finally:
+        client.close()
+    assert first.status == 200 and first.data == IMAGE and first.etag == ETAG
+    assert again.status == 304 and again.data == b""
+    assert client.stats()['connections_opened'] == 1
+
+
+def test_file_name_is_quoted(server):
+    client = make_downloader(server)
+    try:
+        client.fetch("with space.png")
+    finally:
+        client.close()
+    assert "/storage/items/with%20space.png" in server.hits
@@ -0,0 +1,53 @@
+# test_image_store.py
+# Ukládání manifestu DiskImageCache z více threadů a při chybě zápisu.
+import json
+import os
+import threading
+
+from image_store import DiskImageCache
+
+
+def test_concurrent_saves_keep_manifest_valid(tmp_path):
+    cache = DiskImageCache(str(tmp_path))
+    errors = []
+
+    def worker(thread_index):
+        try:
+            for i in range(50):
+                cache.store(f"img_{thread_index}_{i}.png", f"{thread_index}-{i}".encode())
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.save()
+
+    assert errors == []
+    with open(cache.manifest_path, encoding='utf-8') as f:
+        assert len(json.load(f)['images']) == 8 * 50
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_failed_save_keeps_changes_for_next_save(tmp_path, monkeypatch):
+    cache = DiskImageCache(str(tmp_path))
+
+    replace = os.replace
+
+    def broken_replace(src, dst):
+        if dst == cache.manifest_path:
+            raise OSError("disk full")
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', broken_replace)
+    cache.store("a.png", b"data")  # store() nesmí kvůli manifestu selhat
+    cache.save()
+    assert cache.dirty
+    monkeypatch.undo()
+
+    cache.save()
+    assert not cache.dirty
+    assert DiskImageCache(str(tmp_path)).path_for_image("a.png")
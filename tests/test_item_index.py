@@ -0,0 +1,78 @@
+# test_item_index.py
+# Řazení výsledků a návrhy s překlepy v ItemSearchIndex.
+import pytest
+
+from item_index import ItemSearchIndex, max_typos, substring_distance
+from records import ItemRecord
+
+
+@pytest.fixture
+def index():
+    items = {code: ItemRecord(code, label) for code, label in [
+        ("coffee", "Káva"),
+        ("consumable_coffee", "Hrnek kávy"),
+        ("coffee_beans", "Kávová zrna"),
+        ("iced_coffee", "Ledová káva"),
+        ("bread", "Chléb"),
+        ("leather", "Kůže"),
+    ]}
+    index = ItemSearchIndex()
+    index.build(items)
+    return index
+
+
+def codes(index, rows):
+    return [index.records[row].item for row in rows]
+
+
+def test_search_ranks_exact_then_prefix_then_substring(index):
+    found = codes(index, index.search("coffee"))
+    assert found[0] == "coffee"
+    assert found[1] == "coffee_beans"
+    assert set(found[2:]) == {"consumable_coffee", "iced_coffee"}
+
+
+def test_search_matches_label_case_insensitively(index):
+    assert codes(index, index.search("  KÁVA ")) == ["coffee", "iced_coffee"]
+
+
+def test_empty_query_returns_everything_sorted_by_label(index):
+    labels = [record.label.lower() for record in index.records]
+    assert index.search("") == list(range(len(index)))
+    assert labels == sorted(labels)
+
+
+def test_longer_query_narrows_previous_result(index):
+    assert set(codes(index, index.search("co"))) >= set(codes(index, index.search("cof")))
+    assert codes(index, index.search("coffee_b")) == ["coffee_beans"]
+
+
+def test_suggest_finds_typo(index):
+    assert index.search("cofee") == []
+    assert codes(index, index.suggest("cofee"))[0] == "coffee"
+
+
+def test_suggest_skips_excluded_and_short_queries(index):
+    exclude = set(index.search("leather"))
+    assert index.suggest("leather", exclude=exclude) == []
+    assert index.suggest("cof") == []
+
+
+def test_for_items_reuses_index_until_items_change():
+    items = {"bread": ItemRecord("bread", "Chléb")}
+    index = ItemSearchIndex.for_items(items)
+    assert ItemSearchIndex.for_items(items) is index
+    assert ItemSearchIndex.for_items(dict(items)) is not index
+
+
+def test_max_typos_grows_with_query_length():
+    assert [max_typos("a" * length) for length in (3, 4, 8, 9)] == [0, 1, 1, 2]
+
+
+@pytest.mark.parametrize("query, text, limit, expected", [
+    ("coffee", "iced_coffee", 1, 0),
+    ("cofee", "iced_coffee", 1, 1),
+    ("cafe", "bread", 1, None),
+])
+def test_substring_distance(query, text, limit, expected):
+    assert substring_distance(query, text, limit) == expected
@@ -0,0 +1,41 @@
+# test_price_changes.py
+# Zaokrouhlení v PriceChange a shoda náhledu s výrazem pro UPDATE.
+from decimal import Decimal
+
+import pytest
+
+from price_changes import (PRICE_ADD, PRICE_MULTIPLY, PRICE_PERCENT, PRICE_SET, PriceChange)
+
+
+@pytest.mark.parametrize("mode, value, round_to, price, expected", [
+    (PRICE_PERCENT, 10, '0.05', 12.345, '13.60'),
+    (PRICE_PERCENT, -50, 0, '0.05', '0.03'),
+    (PRICE_MULTIPLY, '1.5', 1, '2.99', '4.00'),
+    (PRICE_ADD, '0.005', 0, '1.00', '1.01'),
+    (PRICE_SET, '7.499', 0, None, '7.50'),
+    (PRICE_ADD, -5, 0, '3.20', '0.00'),
+])
+def test_apply_rounds_half_up(mode, value, round_to, price, expected):
+    assert PriceChange(mode, value, round_to).apply(price) == Decimal(expected)
+
+
+def test_apply_uses_decimal_value_of_float_price():
+    # 0.285 jako float je 0.28499999...; cena se bere tak, jak ji vrací str()
+    assert PriceChange(PRICE_MULTIPLY, 1).apply(0.285) == Decimal('0.29')
+
+
+def test_sql_expression_passes_rounded_params():
+    expression, params = PriceChange(PRICE_PERCENT, 10, '0.05').sql_expression('price_b')
+    assert expression.count("%s") == len(params) == 3
+    assert params == ['10.000000', '0.050000', '0.050000']
+    assert "CAST(price_b AS DECIMAL(20, 6))" in expression
+
+
+def test_sql_expression_rejects_unknown_column():
+    with pytest.raises(ValueError):
+        PriceChange(PRICE_SET, 1).sql_expression('id')
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        PriceChange('divide', 2)
@@ -0,0 +1,60 @@
+# test_snapshot.py
+# Převod placeholderů mysql.connector na sqlite3 v SnapshotCursor.
+import sqlite3
+
+import pytest
+
+from snapshot import SnapshotCursor, SnapshotReadOnlyError, translate_placeholders
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE items (id INTEGER, item TEXT, label TEXT)")
+    connection.executemany("INSERT INTO items VALUES (?, ?, ?)",
+                           [(1, "coffee", "Káva"), (2, "bread", "Chléb"), (3, "100%_juice", "Džus")])
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("operation, expected", [
+    ("SELECT * FROM items WHERE id = %s", "SELECT * FROM items WHERE id = ?"),
+    ("SELECT * FROM items WHERE id = %(id)s AND item = %(item)s",
+     "SELECT * FROM items WHERE id = :id AND item = :item"),
+    ("SELECT * FROM items WHERE item LIKE 'co%%' AND id > %s", "SELECT * FROM items WHERE item LIKE 'co%' AND id > ?"),
+    ("SELECT '100%%' || %s", "SELECT '100%' || ?"),
+])
+def test_translate_placeholders(operation, expected):
+    assert translate_placeholders(operation) == expected
+
+
+def test_positional_params(connection):
+    cursor = SnapshotCursor(connection)
+    cursor.execute("SELECT item FROM items WHERE id IN (%s, %s) ORDER BY id", [1, 2])
+    assert cursor.fetchall() == [("coffee",), ("bread",)]
+
+
+def test_named_params_with_dictionary_rows(connection):
+    cursor = SnapshotCursor(connection, dictionary=True)
+    cursor.execute("SELECT id, label FROM items WHERE item = %(item)s", {'item': "bread"})
+    assert cursor.fetchone() == {'id': 2, 'label': "Chléb"}
+
+
+def test_escaped_percent_with_params(connection):
+    cursor = SnapshotCursor(connection)
+    cursor.execute("SELECT item FROM items WHERE item LIKE 'co%%' OR item LIKE %s", ("100%",))
+    assert sorted(cursor.fetchall()) == [("100%_juice",), ("coffee",)]
+
+
+def test_percent_left_alone_without_params(connection):
+    cursor = SnapshotCursor(connection)
+    cursor.execute("SELECT item FROM items WHERE item LIKE 'co%'")
+    assert cursor.fetchall() == [("coffee",)]
+
+
+def test_writes_are_rejected(connection):
+    cursor = SnapshotCursor(connection)
+    with pytest.raises(SnapshotReadOnlyError):
+        cursor.execute("DELETE FROM items WHERE id = %s", (1,))
+    with pytest.raises(SnapshotReadOnlyError):
+        cursor.executemany("INSERT INTO items VALUES (%s, %s, %s)", [(4, "x", "y")])
@@ -0,0 +1,97 @@
+# test_unit_of_work.py
+# Seskupení čekajících úprav do dotazů a transakce v UnitOfWork.
+import pytest
+
+from unit_of_work import UnitOfWork
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query, params):
+        if self.connection.fail:
+            raise RuntimeError("zápis selhal")
+        self.connection.executed.append((query, params))
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.executed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_statements_group_rows_by_table_column_and_value():
+    work = UnitOfWork(FakeConnection())
+    work.register('aprts_store_items', 'category', 1, 5, original=2)
+    work.register('aprts_store_items', 'category', 2, 5, original=3)
+    work.register('aprts_store_items', 'category', 3, 6, original=3)
+    work.register('aprts_store_items', 'price_b', 1, 5, original=1)
+    assert work.statements() == [
+        ("UPDATE aprts_store_items SET category = %s WHERE id IN (%s, %s)", (5, 1, 2)),
+        ("UPDATE aprts_store_items SET category = %s WHERE id IN (%s)", (6, 3)),
+        ("UPDATE aprts_store_items SET price_b = %s WHERE id IN (%s)", (5, 1)),
+    ]
+
+
+def test_statements_chunk_long_id_lists():
+    work = UnitOfWork(FakeConnection())
+    for row_id in range(2500):
+        work.register('items', 'category', row_id, 1, original=0)
+    assert [len(params) - 1 for query, params in work.statements()] == [1000, 1000, 500]
+
+
+def test_reverting_to_original_unqueues_edit():
+    work = UnitOfWork(FakeConnection())
+    work.register('items', 'label', 1, "Nový", original="Starý")
+    work.register('items', 'label', 1, "Novější", original="Nový")
+    assert work.pending_value('items', 'label', 1) == "Novější"
+    work.register('items', 'label', 1, "Starý")
+    assert len(work) == 0
+    assert not work.is_pending('items', 'label', 1)
+
+
+def test_invalid_identifier_is_rejected():
+    with pytest.raises(ValueError):
+        UnitOfWork(FakeConnection()).register('items; DROP', 'label', 1, "x")
+
+
+def test_flush_commits_once_and_clears_queue():
+    connection = FakeConnection()
+    work = UnitOfWork(connection)
+    work.register('items', 'label', 1, "a", original="b")
+    work.register('items', 'label', 2, "a", original="c")
+    assert work.flush() == 2
+    assert connection.commits == 1 and len(connection.executed) == 1
+    assert len(work) == 0 and work.flush() == 0
+
+
+def test_failed_flush_rolls_back_and_keeps_queue():
+    connection = FakeConnection(fail=True)
+    work = UnitOfWork(connection)
+    work.register('items', 'label', 1, "a", original="b")
+    with pytest.raises(RuntimeError):
+        work.flush()
+    assert connection.rollbacks == 1 and connection.commits == 0
+    assert work.is_pending('items', 'label', 1)
+
+
+def test_discard_returns_original_values():
+    work = UnitOfWork(FakeConnection())
+    work.register('items', 'label', 1, "a", original="b")
+    assert work.discard() == {('items', 'label', 1): "b"}
+    assert len(work) == 0
@@ -58,9 +58,7 @@ class TreasureManagerDialog(QtWidgets.QDialog):
     # Metoda pro vykonávání a logování SQL dotazů
     # ==========================================
     def execute_query(self, query, params=None, dictionary=True):
-        logging.debug(f"Executing SQL: {query}")
-        if params:
-            logging.debug(f"With params: {params}")
+        # Čas a počty dotazů měří QueryStats (okno Statistiky SQL v editoru)
         try:
             cursor = self.connection.cursor(dictionary=dictionary)
             cursor.execute(query, params)
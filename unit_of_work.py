@@ -0,0 +1,85 @@
+# unit_of_work.py
+# Fronta neuložených úprav buněk v tabulkách, uložená najednou v jedné transakci (bez závislosti na Qt).
+from collections import OrderedDict
+
+from image_store import chunked
+
+
+class UnitOfWork:
+    """Sbírá úpravy (tabulka, sloupec, id) -> nová hodnota a ukládá je dávkově.
+
+    Úprava se do DB nezapíše hned, ale počká na flush(). Ten pošle pro každou
+    kombinaci tabulky, sloupce a hodnoty jeden UPDATE ... WHERE id IN (...),
+    takže přeřazení stovek řádků do stejné kategorie je pár dotazů a jeden commit.
+    Když zápis selže, transakce se vrátí a úpravy zůstanou ve frontě.
+
+    Tabulky a sloupce zadává kód, ne uživatel; hodnoty jdou vždy jako parametry.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.pending = OrderedDict()  # (tabulka, sloupec, id) -> nová hodnota
+        self.original = {}  # (tabulka, sloupec, id) -> hodnota před první úpravou
+
+    def __len__(self):
+        return len(self.pending)
+
+    def register(self, table, column, row_id, value, original=None):
+        """Zařadí úpravu; návrat na původní hodnotu úpravu z fronty zase vyřadí."""
+        if not (table.isidentifier() and column.isidentifier()):
+            raise ValueError(f"Neplatný název tabulky nebo sloupce: {table}.{column}")
+        key = (table, column, row_id)
+        self.original.setdefault(key, original)
+        if value == self.original[key]:
+            self.pending.pop(key, None)
+            del self.original[key]
+            return
+        self.pending[key] = value
+
+    def is_pending(self, table, column, row_id):
+        return (table, column, row_id) in self.pending
+
+    def pending_value(self, table, column, row_id, default=None):
+        return self.pending.get((table, column, row_id), default)
+
+    def statements(self):
+        """[(dotaz, parametry)] pro všechny čekající úpravy."""
+        groups = OrderedDict()  # (tabulka, sloupec, hodnota) -> [id]
+        for (table, column, row_id), value in self.pending.items():
+            groups.setdefault((table, column, value), []).append(row_id)
+        statements = []
+        for (table, column, value), row_ids in groups.items():
+            for chunk in chunked(row_ids):
+                placeholder = ", ".join(["%s"] * len(chunk))
+                statements.append((f"UPDATE {table} SET {column} = %s WHERE id IN ({placeholder})",
+                                   (value, *chunk)))
+        return statements
+
+    def flush(self):
+        """Zapíše všechny úpravy v jedné transakci a vrátí jejich počet.
+
+        Při chybě zavolá rollback, výjimku předá dál a fronta zůstane beze změny.
+        """
+        if not self.pending:
+            return 0
+        cursor = self.connection.cursor()
+        try:
+            for query, params in self.statements():
+                cursor.execute(query, params)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        count = len(self.pending)
+        self.pending.clear()
+        self.original.clear()
+        return count
+
+    def discard(self):
+        """Zahodí frontu; vrací {(tabulka, sloupec, id): původní hodnota} pro obnovení zobrazení."""
+        original = {key: self.original[key] for key in self.pending}
+        self.pending.clear()
+        self.original.clear()
+        return original